@@ -0,0 +1,160 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    fixture_server.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Local HTTP server standing in for Wikipedia. /wiki/<title> serves
+# <title lowercased>.html from the fixture directory with ETag and
+# Last-Modified headers and answers conditional requests with 304. Latency
+# and periodic 503s can be added to exercise the fetcher's concurrency and
+# retries.
+#
+#   python benchmarks/fixture_server.py --port 8765 --latency 0.2
+#   WC_WIKIPEDIA_BASE=http://127.0.0.1:8765/wiki/ python src/snapshot.py
+
+# import libraries
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import threading
+import argparse
+import hashlib
+import time
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _page(self, title):
+        directory = self.server.directory
+        for name in (title.lower(), self.server.fallback):
+            path = os.path.join(directory, f"{name}.html") if name else None
+            if path and os.path.isfile(path):
+                return path
+        return None
+
+    def _fail(self):
+        # every `fail_every`-th request gets a 503
+        server = self.server
+        if not server.fail_every:
+            return False
+        with server.lock:
+            server.requests += 1
+            return server.requests % server.fail_every == 0
+
+    def do_GET(self):
+        self.server.count(self.path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self._fail():
+            self.send_response(503)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if not self.path.startswith('/wiki/'):
+            self.send_error(404)
+            return
+        path = self._page(unquote(self.path[len('/wiki/'):].split('?')[0]))
+        if path is None:
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        mtime = int(os.path.getmtime(path))
+
+        if self._not_modified(etag, mtime):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(mtime, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag, mtime):
+        # If-None-Match wins over If-Modified-Since (RFC 9110)
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in (tag.strip() for tag in if_none_match.split(','))
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory=FIXTURE_DIR, latency=0.0, fail_every=0,
+                 fallback=None, verbose=False):
+        super().__init__(address, FixtureHandler)
+        self.directory = directory
+        self.latency = latency
+        self.fail_every = fail_every
+        self.fallback = fallback
+        self.verbose = verbose
+        self.requests = 0
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def count(self, path):
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/wiki/"
+
+# start a server on a free port in a background thread (for benchmarks);
+# call .shutdown() when done
+
+
+def start_server(**kwargs):
+    server = FixtureServer(('127.0.0.1', 0), **kwargs)
+    threading.Thread(target=server.serve_forever, name='fixture-server',
+                     daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serve the benchmark fixtures as a local stand-in for Wikipedia')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dir', default=FIXTURE_DIR, help='fixture directory')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds to wait before answering each request')
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='answer every n-th request with a 503')
+    parser.add_argument('--fallback',
+                        help='fixture (file name without .html) served for unknown titles')
+    args = parser.parse_args()
+
+    server = FixtureServer(('127.0.0.1', args.port), args.dir, args.latency,
+                           args.fail_every, args.fallback, verbose=True)
+    print(f"Serving {args.dir} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
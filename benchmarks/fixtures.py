@@ -0,0 +1,122 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    fixtures.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Builds offline stand-ins for the "List of FIFA World Cup finals" Wikipedia
+# page from the seed snapshot in src/data, optionally with every table row
+# repeated `scale` times for scaling benchmarks (`--filler` scales only the
+# unrelated tables the scraper has to skip).
+#
+#   python benchmarks/fixtures.py            # rewrite the saved fixture
+#   python benchmarks/fixtures.py --scale 100 --out /tmp/finals_100x.html
+
+# import libraries
+import argparse
+import html
+import ast
+import csv
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_DIR = os.path.join(ROOT, 'src', 'data')
+FIXTURE_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+FIXTURE = os.path.join(FIXTURE_DIR, 'list_of_fifa_world_cup_finals.html')
+
+# the page lists teams under the names they played as
+NATION_NAMES = {'United Kingdom': 'England', 'Czech Republic': 'Czechoslovakia'}
+
+
+def _read_seed(name):
+    with open(os.path.join(SEED_DIR, name), encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _table(caption, header, rows):
+    head = ''.join(f"<th>{html.escape(h)}</th>" for h in header)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape(str(c))}</td>" for c in row) + '</tr>'
+                   for row in rows)
+    return (f'<table class="wikitable sortable"><caption>{html.escape(caption)}</caption>'
+            f'<tbody><tr>{head}</tr>{body}</tbody></table>\n')
+
+
+def _finals_rows(scale):
+    rows = []
+    for row in _read_seed('world_cup_finals.csv'):
+        # West Germany played the finals before reunification
+        year = int(row['Year'])
+        rename = {'Germany': 'West Germany'} if year < 1991 else {}
+        rows.append([
+            row['Year'],
+            rename.get(row['Winners'], row['Winners']),
+            row['Score'],
+            rename.get(row['Runners-up'], row['Runners-up']),
+            row['Venue'],
+            row['Location'],
+            f"{int(float(row['Attendance'])):,}",
+            f"[{len(rows) + 1}]"
+        ])
+    return rows * scale
+
+
+def _nation_rows(scale):
+    rows = []
+    for row in _read_seed('world_country_stats.csv'):
+        won = ast.literal_eval(row['YearsWon'])
+        runner_up = ast.literal_eval(row['YearsRunnerUp'])
+        rows.append([
+            NATION_NAMES.get(row['Country'], row['Country']),
+            row['Wins'],
+            row['RunnerUps'],
+            row['TotalFinals'],
+            ', '.join(map(str, won)) or '—',
+            ', '.join(map(str, runner_up)) or '—'
+        ])
+    return rows * scale
+
+
+def _filler(scale):
+    # other tables and prose on the page that the scraper has to skip over
+    confederations = [['UEFA', 12, 19, 31], ['CONMEBOL', 10, 5, 15]] * scale
+    stats = [[f"Record {i}", f"Value {i}", f"Note {i}"]
+             for i in range(20 * scale)]
+    prose = '<p>' + 'The FIFA World Cup final is the last match of the competition. ' * 40 + '</p>\n'
+    return (_table('Results by confederation', ['Confederation', 'Winners', 'Runners-up', 'Total'],
+                   confederations) +
+            prose * 5 +
+            _table('Records', ['Record', 'Value', 'Notes'], stats))
+
+
+def build_page(scale=1, filler=None):
+    finals = _table('List of FIFA World Cup finals',
+                    ['Year', 'Winners', 'Score', 'Runners-up',
+                        'Venue', 'Location', 'Attendance', 'Ref.'],
+                    _finals_rows(scale))
+    nations = _table('Results by nation',
+                     ['Team', 'Winners', 'Runners-up', 'Total finals',
+                         'Years won', 'Years runners-up'],
+                     _nation_rows(scale))
+    return ('<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            '<title>List of FIFA World Cup finals - Wikipedia</title></head><body>\n'
+            f"{finals}{_filler(scale if filler is None else filler)}{nations}</body></html>\n")
+
+
+def write_page(path, scale=1, filler=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(build_page(scale, filler))
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Write an offline fixture of the World Cup finals page')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='repeat every table row this many times')
+    parser.add_argument('--filler', type=int,
+                        help='scale of the non-target tables (defaults to --scale)')
+    parser.add_argument('--out', default=FIXTURE, help='output path')
+    args = parser.parse_args()
+    print(write_page(args.out, args.scale, args.filler))
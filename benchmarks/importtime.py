@@ -0,0 +1,133 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    importtime.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Import-time profile of the dashboard, based on `python -X importtime`.
+# Imports a module in a fresh interpreter (offline, against a throwaway
+# snapshot cache) and reports the slowest imports and top-level packages.
+#
+#   python benchmarks/importtime.py                          # import app
+#   python benchmarks/importtime.py --module fast_start      # fast-start entry point
+#   python benchmarks/importtime.py --json importtime.json   # save the report
+#   python benchmarks/importtime.py --compare importtime.json  # exit 1 on regressions
+
+# import libraries
+import subprocess
+import argparse
+import tempfile
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT, 'src')
+
+########################################################
+# Profiling
+########################################################
+
+# run `import <module>` under -X importtime and return the parsed lines and
+# the wall time of the whole interpreter
+
+
+def profile_import(module, cache_dir):
+    env = dict(os.environ, WC_OFFLINE='1', WC_CACHE_DIR=cache_dir,
+               WC_REFRESH_INTERVAL='0', PYTHONDONTWRITEBYTECODE='1')
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r}); import {module}"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            env=env, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append({'name': name.strip(), 'depth': (len(name) - len(name.lstrip())) // 2,
+                        'self': int(self_us) / 1e6, 'cumulative': int(cumulative_us) / 1e6})
+    return imports, wall
+
+
+def summarize(imports, wall, top):
+    # top-level packages by the time spent importing all of their modules
+    packages = {}
+    for imp in imports:
+        package = imp['name'].split('.')[0]
+        packages[package] = packages.get(package, 0) + imp['self']
+
+    return {
+        'wall': wall,
+        'imports': len(imports),
+        'total': sum(imp['self'] for imp in imports),
+        'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:top]),
+        'slowest': sorted(imports, key=lambda imp: -imp['self'])[:top]
+    }
+
+########################################################
+# Reporting
+########################################################
+
+
+def print_report(module, report):
+    print(f"import {module}: {report['total'] * 1000:.0f}ms in {report['imports']} modules "
+          f"(interpreter wall time {report['wall'] * 1000:.0f}ms)")
+    print()
+    print(f"{'package':<40}{'self':>12}")
+    for package, seconds in report['packages'].items():
+        print(f"{package:<40}{seconds * 1000:>10.1f}ms")
+    print()
+    print(f"{'module':<60}{'self':>12}{'cumulative':>14}")
+    for imp in report['slowest']:
+        print(f"{imp['name']:<60}{imp['self'] * 1000:>10.1f}ms{imp['cumulative'] * 1000:>12.1f}ms")
+
+
+def compare(report, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    ratio = report['total'] / baseline['total']
+    flag = '  REGRESSION' if ratio > threshold else ''
+    print(f"total import time {baseline['total'] * 1000:.0f}ms -> "
+          f"{report['total'] * 1000:.0f}ms ({ratio:.2f}x){flag}")
+    return ratio > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Import-time profile of the dashboard (python -X importtime)')
+    parser.add_argument('--module', default='app', help='module to import from src/')
+    parser.add_argument('--top', type=int, default=15, help='rows per table')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs to take the fastest of (warm filesystem cache)')
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--compare', help='baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio of the total that counts as a regression')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [profile_import(args.module, cache_dir) for _ in range(args.repeat)]
+    report = min((summarize(imports, wall, args.top) for imports, wall in runs),
+                 key=lambda r: r['total'])
+    report['module'] = args.module
+
+    print_report(args.module, report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        print()
+        if compare(report, args.compare, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    loadtest.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Load generator for the dashboard. Virtual users replay browser sessions
+# against the real Dash endpoints: the page, /_dash-layout and
+# /_dash-dependencies, the initial callbacks, then a sequence of
+# country-dropdown/year-dropdown changes, each posting every server-side
+# callback that depends on the changed dropdown to /_dash-update-component.
+# Throughput, latency percentiles and error rates are reported for each
+# concurrency level (and each worker count when the harness starts the
+# server itself).
+#
+#   python benchmarks/loadtest.py --serve --workers 1,2 --concurrency 1,4,16
+#   python benchmarks/loadtest.py --serve --server-env WC_CALLBACK_CACHE=off
+#   python benchmarks/loadtest.py --url http://127.0.0.1:8050 --duration 30
+#   python benchmarks/loadtest.py --serve --json load.json   # save the report
+#   python benchmarks/loadtest.py --serve --compare load.json  # exit 1 on regressions
+
+# import libraries
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import subprocess
+import argparse
+import tempfile
+import requests
+import random
+import socket
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DROPDOWNS = ('country-dropdown', 'year-dropdown')
+
+# what a user does after the page has loaded: pick a country, pick a year,
+# or clear one of the two dropdowns
+ACTIONS = (('country', 0.55), ('year', 0.35), ('clear', 0.10))
+
+########################################################
+# Local server
+########################################################
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+# gunicorn with the production config, offline and without the background
+# refresh, against a throwaway snapshot cache
+
+
+def start_server(workers, threads, env_overrides, cache_dir, timeout=120):
+    port = _free_port()
+    env = dict(os.environ, WC_OFFLINE='1', WC_REFRESH_INTERVAL='0',
+               WC_CACHE_DIR=cache_dir, WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads), **env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f"127.0.0.1:{port}", '--log-level', 'warning'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited:\n{process.stderr.read().decode()[-2000:]}")
+        try:
+            if requests.get(f"{url}/readyz", timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+########################################################
+# Sessions
+########################################################
+
+
+def _find(node, component_id):
+    # component props by id in the /_dash-layout tree
+    if isinstance(node, list):
+        for child in node:
+            found = _find(child, component_id)
+            if found is not None:
+                return found
+    elif isinstance(node, dict):
+        props = node.get('props', {})
+        if props.get('id') == component_id:
+            return props
+        return _find(props.get('children'), component_id)
+    return None
+
+
+def _zipf_weights(n, s=1.1):
+    # a few popular countries/years get most of the traffic
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+# what every session needs to know about the app: the server-side callbacks
+# (clientside ones never reach the server) and the dropdown options
+
+
+class Workload:
+    def __init__(self, url):
+        layout = requests.get(f"{url}/_dash-layout", timeout=30).json()
+        dependencies = requests.get(f"{url}/_dash-dependencies", timeout=30).json()
+
+        self.callbacks = [dep for dep in dependencies if not dep.get('clientside_function')]
+        self.options = {}
+        for dropdown in DROPDOWNS:
+            props = _find(layout, dropdown) or {}
+            self.options[dropdown] = [opt['value'] for opt in props.get('options', [])]
+        self.weights = {key: _zipf_weights(len(values)) for key, values in self.options.items()}
+
+    def request(self, dependency, values):
+        # the body Dash posts for one callback
+        component, prop = dependency['output'].rsplit('.', 1)
+        return {
+            'output': dependency['output'],
+            'outputs': {'id': component, 'property': prop},
+            'inputs': [dict(i, value=values.get(i['id'])) for i in dependency['inputs']],
+            'changedPropIds': [f"{i['id']}.{i['property']}" for i in dependency['inputs']
+                               if i['id'] in values],
+            'state': [dict(s, value=values.get(s['id'])) for s in dependency['state']]
+        }
+
+    def next_values(self, rng, values):
+        # one dropdown change; returns the new values and the changed id
+        action = rng.choices([a for a, _ in ACTIONS], [w for _, w in ACTIONS])[0]
+        if action == 'clear':
+            changed = rng.choice(DROPDOWNS)
+            return dict(values, **{changed: None}), changed
+        changed = DROPDOWNS[0] if action == 'country' else DROPDOWNS[1]
+        if not self.options[changed]:
+            return values, changed
+        value = rng.choices(self.options[changed], self.weights[changed])[0]
+        return dict(values, **{changed: value}), changed
+
+# one virtual user: keeps its own connection pool and replays sessions until
+# the deadline; every request is recorded as (label, seconds, ok)
+
+
+def run_user(url, workload, deadline, interactions, think, seed):
+    rng = random.Random(seed)
+    session = requests.Session()
+    records = []
+    sessions = 0
+
+    def call(label, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url + path, timeout=30, **kwargs)
+            ok = response.status_code in (200, 204)
+            response.content
+        except requests.RequestException:
+            ok = False
+        records.append((label, time.perf_counter() - start, ok))
+
+    def fire(values, changed=None):
+        for dependency in workload.callbacks:
+            if changed is None and dependency.get('prevent_initial_call'):
+                continue
+            if changed is not None and changed not in (i['id'] for i in dependency['inputs']):
+                continue
+            call(dependency['output'], 'POST', '/_dash-update-component',
+                 json=workload.request(dependency, values))
+
+    while time.time() < deadline:
+        call('page', 'GET', '/')
+        call('layout', 'GET', '/_dash-layout')
+        call('dependencies', 'GET', '/_dash-dependencies')
+        values = {dropdown: None for dropdown in DROPDOWNS}
+        fire(values)
+        for _ in range(interactions):
+            if time.time() >= deadline:
+                break
+            if think:
+                time.sleep(rng.expovariate(1 / think))
+            values, changed = workload.next_values(rng, values)
+            fire(values, changed)
+        sessions += 1
+    return records, sessions
+
+########################################################
+# Reporting
+########################################################
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def summarize(records, elapsed):
+    times = [seconds for _, seconds, _ in records]
+    errors = sum(1 for _, _, ok in records if not ok)
+    return {
+        'requests': len(records),
+        'throughput': len(records) / elapsed if elapsed else 0.0,
+        'error_rate': errors / len(records) if records else 0.0,
+        'mean': statistics.fmean(times) if times else 0.0,
+        'p50': _percentile(times, 0.50),
+        'p90': _percentile(times, 0.90),
+        'p99': _percentile(times, 0.99),
+        'max': max(times, default=0.0)
+    }
+
+
+def run_level(url, workload, concurrency, duration, interactions, think, seed):
+    deadline = time.time() + duration
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='user') as pool:
+        futures = [pool.submit(run_user, url, workload, deadline, interactions,
+                               think, seed + user) for user in range(concurrency)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    records = [record for user_records, _ in results for record in user_records]
+    labels = sorted({label for label, _, _ in records})
+    return {
+        'concurrency': concurrency,
+        'sessions': sum(sessions for _, sessions in results),
+        'elapsed': elapsed,
+        'total': summarize(records, elapsed),
+        'endpoints': {label: summarize([r for r in records if r[0] == label], elapsed)
+                      for label in labels}
+    }
+
+
+def print_level(workers, level, show_endpoints):
+    total = level['total']
+    print(f"{workers:>7} {level['concurrency']:>6} {level['sessions']:>8} {total['requests']:>9} "
+          f"{total['throughput']:>9.1f} {total['error_rate'] * 100:>7.2f}% "
+          f"{total['p50'] * 1000:>8.1f} {total['p90'] * 1000:>8.1f} {total['p99'] * 1000:>8.1f} "
+          f"{total['max'] * 1000:>8.1f}")
+    if show_endpoints:
+        for label, stats in level['endpoints'].items():
+            print(f"{'':>16}{label:<26}{stats['requests']:>8} {stats['throughput']:>9.1f} "
+                  f"{stats['error_rate'] * 100:>7.2f}% {stats['p50'] * 1000:>8.1f} "
+                  f"{stats['p90'] * 1000:>8.1f} {stats['p99'] * 1000:>8.1f} {stats['max'] * 1000:>8.1f}")
+
+
+def compare(report, baseline_path, threshold):
+    # a level regressed when its throughput dropped or its p99 grew by more
+    # than the threshold ratio
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    base = {(run['workers'], level['concurrency']): level['total']
+            for run in baseline['runs'] for level in run['levels']}
+
+    regressions = []
+    print(f"{'workers':>7} {'users':>6} {'req/s':>12} {'p99':>12}")
+    for run in report['runs']:
+        for level in run['levels']:
+            key = (run['workers'], level['concurrency'])
+            if key not in base:
+                continue
+            old, new = base[key], level['total']
+            throughput = old['throughput'] / new['throughput'] if new['throughput'] else float('inf')
+            p99 = new['p99'] / old['p99'] if old['p99'] else 1.0
+            flag = '  REGRESSION' if max(throughput, p99) > threshold else ''
+            print(f"{key[0]:>7} {key[1]:>6} {1 / throughput if throughput else 0:>11.2f}x "
+                  f"{p99:>11.2f}x{flag}")
+            if flag:
+                regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay dashboard sessions against /_dash-update-component')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='already running server')
+    target.add_argument('--serve', action='store_true',
+                        help='start gunicorn locally (offline) for each worker count')
+    parser.add_argument('--workers', default='1',
+                        help='comma separated gunicorn worker counts (with --serve)')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--server-env', action='append', default=[],
+                        help='KEY=VALUE for the started server, e.g. WC_CALLBACK_CACHE=off')
+    parser.add_argument('--concurrency', default='1,4,16',
+                        help='comma separated numbers of virtual users')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level')
+    parser.add_argument('--interactions', type=int, default=10,
+                        help='dropdown changes per session')
+    parser.add_argument('--think', type=float, default=0.0,
+                        help='mean think time between changes (seconds)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--endpoints', action='store_true', help='per-endpoint breakdown')
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--compare', help='baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='throughput/p99 ratio that counts as a regression')
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+    env_overrides = dict(item.split('=', 1) for item in args.server_env)
+    report = {'created': time.time(), 'server_env': env_overrides,
+              'duration': args.duration, 'interactions': args.interactions,
+              'think': args.think, 'runs': []}
+
+    print(f"{'workers':>7} {'users':>6} {'sessions':>8} {'requests':>9} {'req/s':>9} "
+          f"{'errors':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    worker_counts = [int(w) for w in args.workers.split(',') if w] if args.serve else ['-']
+    for workers in worker_counts:
+        process = None
+        with tempfile.TemporaryDirectory() as cache_dir:
+            try:
+                if args.serve:
+                    process, url = start_server(workers, args.threads, env_overrides, cache_dir)
+                else:
+                    url = args.url.rstrip('/')
+                workload = Workload(url)
+                run = {'workers': workers, 'levels': []}
+                for concurrency in levels:
+                    level = run_level(url, workload, concurrency, args.duration,
+                                      args.interactions, args.think, args.seed)
+                    run['levels'].append(level)
+                    print_level(workers, level, args.endpoints)
+                report['runs'].append(run)
+            finally:
+                if process is not None:
+                    stop_server(process)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        print()
+        if compare(report, args.compare, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    memory.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Memory benchmark of the served data: the original representation (python
+# str cells and one frozen dict per row, benchmarks/reference.py) against the
+# compact one (arrow-backed columns and record views, src/compact.py). The
+# seed snapshot is scaled up, written as an Arrow snapshot file and loaded in
+# a fresh interpreter per representation, which then forks workers like
+# gunicorn does (after gc.freeze()) and lets each of them read every record.
+#
+#   python benchmarks/memory.py
+#   python benchmarks/memory.py --scales 1,1000 --workers 4 --json memory.json
+
+# import libraries
+import subprocess
+import argparse
+import tempfile
+import json
+import time
+import sys
+import gc
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+MODES = ('records', 'compact')
+
+########################################################
+# Inputs
+########################################################
+
+# the seed tables with every row repeated `scale` times under unique
+# country names and years, so the lookup indexes grow with the tables
+
+
+def write_scaled(directory, scale):
+    from snapshot import SEED_FINALS, SEED_NATIONS
+    from storage import FINALS_SCHEMA, NATIONS_SCHEMA, read_csv_tables, write_table
+    import pandas as pd
+
+    finals_df, nation_df = read_csv_tables(SEED_FINALS, SEED_NATIONS)
+    finals_df = pd.concat([finals_df] * scale, ignore_index=True)
+    finals_df['Year'] = range(1930, 1930 + len(finals_df))
+
+    copies = []
+    for k in range(scale):
+        copy = nation_df.copy()
+        if k:
+            copy['Country'] = copy['Country'].astype(str) + f" {k}"
+            copy['ISO_Code'] = copy['ISO_Code'].astype(str) + f"{k}"
+        copies.append(copy)
+    nation_df = pd.concat(copies, ignore_index=True)
+
+    paths = (os.path.join(directory, f"finals_{scale}x.arrow"),
+             os.path.join(directory, f"nations_{scale}x.arrow"))
+    write_table(finals_df, paths[0], FINALS_SCHEMA)
+    write_table(nation_df, paths[1], NATIONS_SCHEMA)
+    return paths
+
+########################################################
+# Measurement (runs in a fresh interpreter)
+########################################################
+
+
+def _proc_kb(path, fields):
+    values = {}
+    with open(path) as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in fields:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def rss_kb():
+    return _proc_kb('/proc/self/status', ('VmRSS',))['VmRSS']
+
+
+def smaps_kb():
+    # proportional and private (unique to this process) memory
+    values = _proc_kb('/proc/self/smaps_rollup', ('Pss', 'Private_Clean', 'Private_Dirty'))
+    return values['Pss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+def load(mode, finals_path, nations_path):
+    # the tables plus their lookup indexes, as the serving path holds them
+    if mode == 'records':
+        from reference import legacy_read_table, legacy_records
+        finals_df, nation_df = legacy_read_table(finals_path), legacy_read_table(nations_path)
+        indexes = legacy_records(finals_df, nation_df)
+        return (finals_df, nation_df, indexes), indexes['by_country'], indexes['by_year']
+
+    from compact import CompactTable, RecordIndex
+    from storage import read_table
+    finals_df, nation_df = read_table(finals_path), read_table(nations_path)
+    nation_table = CompactTable.from_pandas(nation_df)
+    finals_table = CompactTable.from_pandas(finals_df)
+    by_country = RecordIndex(nation_table, {c: i for i, c in
+                                            enumerate(nation_df['Country'].astype(str))})
+    by_year = RecordIndex(finals_table, {int(y): i for i, y in enumerate(finals_df['Year'])})
+    # like WorldCupData, keep the arrow tables and not the DataFrames
+    return (finals_table, nation_table, by_country, by_year), by_country, by_year
+
+
+def serve(by_country, by_year):
+    # what the callbacks do with a record, for every record
+    for index in (by_country, by_year):
+        for key in index:
+            record = index[key]
+            [record[name] for name in record]
+
+
+def child(mode, finals_path, nations_path, workers):
+    import pandas  # noqa: F401  (imports are not part of the measurement)
+    import storage  # noqa: F401
+    import compact  # noqa: F401
+    import reference  # noqa: F401
+
+    gc.collect()
+    base_rss, base_objects = rss_kb(), len(gc.get_objects())
+    start = time.perf_counter()
+    dataset, by_country, by_year = load(mode, finals_path, nations_path)
+    load_seconds = time.perf_counter() - start
+    gc.collect()
+    result = {'mode': mode, 'load': load_seconds, 'rss': rss_kb() - base_rss,
+              'objects': len(gc.get_objects()) - base_objects, 'workers': []}
+
+    start = time.perf_counter()
+    serve(by_country, by_year)
+    result['serve'] = time.perf_counter() - start
+
+    # fork like gunicorn with a preloaded app, one worker at a time
+    gc.freeze()
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            before = smaps_kb()[1]
+            serve(by_country, by_year)
+            pss, uss = smaps_kb()
+            os.write(write_fd, json.dumps({'pss': pss, 'uss': uss,
+                                           'copied': uss - before}).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            result['workers'].append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    print(json.dumps(result))
+
+########################################################
+# Reporting
+########################################################
+
+
+def measure(mode, paths, workers):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode,
+                             *paths, '--workers', str(workers)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def print_results(results):
+    print(f"{'scale':>6} {'mode':<9} {'load':>9} {'serve':>9} {'data RSS':>10} "
+          f"{'objects':>9} {'worker USS':>11} {'copied':>9}")
+    for r in results:
+        uss = sorted(w['uss'] for w in r['workers'])
+        copied = sorted(w['copied'] for w in r['workers'])
+        print(f"{r['scale']:>5}x {r['mode']:<9} {r['load'] * 1000:>7.1f}ms {r['serve'] * 1000:>7.1f}ms "
+              f"{r['rss'] / 1024:>8.1f}MB {r['objects']:>9,} "
+              f"{uss[len(uss) // 2] / 1024 if uss else 0:>9.1f}MB "
+              f"{copied[len(copied) // 2] / 1024 if copied else 0:>7.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Memory use of the served data, original records vs compact')
+    parser.add_argument('--scales', default='1,100,1000',
+                        help='comma separated row multipliers of the seed tables')
+    parser.add_argument('--workers', type=int, default=4, help='forked workers per run')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'FINALS', 'NATIONS'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.workers)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in [int(s) for s in args.scales.split(',') if s]:
+            paths = write_scaled(tmp, scale)
+            for mode in MODES:
+                results.append(dict(measure(mode, paths, args.workers), scale=scale))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.time(), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    payload_size.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Measures the size of update_map responses from /_dash-update-component with
+# full figures versus Dash Patch partial updates, and of the finals timeline
+# as delta frames versus full frames and a plotly express animation.
+#
+#   python benchmarks/payload_size.py
+
+# import libraries
+import statistics
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+# never scrape the live page while benchmarking
+os.environ.setdefault('WC_OFFLINE', '1')
+# measure what the callbacks produce, not cached responses from the other mode
+os.environ.setdefault('WC_CALLBACK_CACHE', 'off')
+
+import app  # noqa: E402
+import reference  # noqa: E402
+from timeline import get_timeline  # noqa: E402
+
+
+def map_request(selected_country, selected_year):
+    return {
+        'output': 'world-map.figure',
+        'outputs': {'id': 'world-map', 'property': 'figure'},
+        'inputs': [
+            {'id': 'country-dropdown', 'property': 'value', 'value': selected_country},
+            {'id': 'year-dropdown', 'property': 'value', 'value': selected_year}
+        ],
+        'changedPropIds': ['country-dropdown.value']
+    }
+
+
+def full_frames(timeline):
+    # the timeline payload with every country's totals in every frame
+    # instead of the changes only
+    payload = timeline.payload(figure=False)
+    payload['frames'] = [dict(frame, changes=[[i, wins, runner_ups] for i, (wins, runner_ups)
+                                              in enumerate(state)])
+                         for frame, (_, state) in zip(timeline.frames, timeline.states())]
+    return payload
+
+
+def encoded_sizes(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return len(raw), len(gzip.compress(raw, compresslevel=9, mtime=0))
+
+
+def measure(client, selections):
+    sizes = []
+    for country, year in selections:
+        response = client.post('/_dash-update-component',
+                               json=map_request(country, year))
+        assert response.status_code == 200, response.status_code
+        sizes.append(len(response.data))
+    return sizes
+
+
+if __name__ == '__main__':
+    client = app.server.test_client()
+    selections = [(country, year)
+                  for country in (None,) + app.data.countries
+                  for year in (None,) + app.data.years]
+
+    results = {}
+    for label, patch in [('full figure', False), ('patch', True)]:
+        app.MAP_PATCH = patch
+        results[label] = measure(client, selections)
+
+    print(f"{len(selections)} selections")
+    for label, sizes in results.items():
+        print(f"{label:>12}: mean {statistics.mean(sizes):>9,.0f} B, "
+              f"median {statistics.median(sizes):>9,.0f} B, max {max(sizes):>9,} B")
+
+    timeline = get_timeline(app.data)
+    animation = reference.animated_figure(app.data.finals_df, app.data.nation_df)
+    print(f"\ntimeline, {len(timeline.frames)} frames x {len(timeline.countries)} countries")
+    for label, payload in [('delta frames', timeline.payload(figure=False)),
+                           ('full frames', full_frames(timeline)),
+                           ('store', timeline.payload()),
+                           ('px animation', json.loads(animation.to_json()))]:
+        raw, compressed = encoded_sizes(payload)
+        print(f"{label:>12}: {raw:>9,} B, gzip {compressed:>9,} B")
@@ -0,0 +1,170 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    reference.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# The original row-at-a-time cleaning from scraper.py, kept as the baseline
+# the vectorized pipeline is benchmarked (and checked) against, and the
+# original per-row record indexes of datastore.py for the memory benchmark,
+# and a plotly express animation of the finals timeline (every frame
+# re-aggregated from scratch and shipped in full) for the timeline benchmarks.
+
+# import libraries
+from types import MappingProxyType
+import plotly.express as px
+import pyarrow as pa
+import pandas as pd
+import pycountry
+import re
+
+
+def clean_score(score):
+    if pd.isna(score):
+        return None, None
+
+    notes = []
+    # extract extra time or penalties
+    if '(a.e.t.)' in score:
+        notes.append('extra time')
+        score = score.replace('(a.e.t.)', '')
+
+    # extract penalty scores using regex
+    pen_match = re.search(r'\((\d+[–-]\d+)\s*pen\.\)', score)
+    if pen_match:
+        notes.append(f"({pen_match.group(1)} pen.)")
+        score = re.sub(r'\(\d+[–-]\d+\s*pen\.\)', '', score)
+
+    # remove any references like [n 3]
+    score = re.sub(r'\[.*?\]', '', score)
+
+    # if no notes were found, set to None instead of empty list
+    return score.strip(), notes if notes else None
+
+
+def parse_years(val):
+    if pd.isna(val):
+        return []
+    return [int(y.strip()) for y in val.split(',') if y.strip().isdigit()]
+
+
+# display names the scraper gives renamed teams before the lookup
+NAME_FIXES = {
+    'West Germany': 'Germany',
+    'Soviet Union': 'Russia',
+    'Czechoslovakia': 'Czech Republic',
+    'Yugoslavia': 'Serbia',
+    'England': 'United Kingdom'
+}
+
+
+def get_country_code(name):
+    try:
+        return pycountry.countries.lookup(name).alpha_3
+    except LookupError:
+        overrides = {
+            'Germany': 'DEU',
+            'Russia': 'RUS',
+            'Czech Republic': 'CZE',
+            'Serbia': 'SRB',
+            'United Kingdom': 'GBR'
+        }
+        return overrides.get(name, None)
+
+# the three per-row steps exactly as get_world_cup_data() used to run them
+
+
+def clean_scores(score):
+    return score.apply(lambda x: pd.Series(clean_score(x)))
+
+
+def clean_years(years):
+    return years.replace('—', None).apply(parse_years)
+
+
+def country_codes(countries):
+    return countries.apply(get_country_code)
+
+# cell values as plain python for comparing the two pipelines: list cells
+# (python lists or arrow-backed) as lists, every kind of missing value as None
+
+
+def plain_values(values):
+    if isinstance(values, pd.DataFrame):
+        return list(zip(*(plain_values(values[column]) for column in values.columns)))
+    return pa.array(values, from_pandas=True).to_pylist()
+
+
+# served tables as they used to be loaded: python str objects for every
+# string cell, one frozen dict per row and tuples of appearance years
+
+
+def legacy_types_mapper(arrow_type):
+    if pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    if arrow_type == pa.int32():
+        return pd.Int32Dtype()
+    return None
+
+
+def legacy_read_table(path):
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas(types_mapper=legacy_types_mapper)
+
+
+def _freeze(record):
+    return MappingProxyType({key: tuple(val) if isinstance(val, list) else val
+                             for key, val in record.items()})
+
+
+def legacy_records(finals_df, nation_df):
+    nation_records = [_freeze(r) for r in nation_df.to_dict('records')]
+    final_records = [_freeze(r) for r in finals_df.to_dict('records')]
+
+    years_by_country = {}
+    countries_by_year = {}
+    for r in nation_records:
+        years = tuple(sorted(r['YearsWon'] + r['YearsRunnerUp']))
+        years_by_country[r['Country']] = years
+        for year in years:
+            countries_by_year.setdefault(int(year), []).append(r['Country'])
+
+    return {
+        'by_country': MappingProxyType({r['Country']: r for r in nation_records}),
+        'by_year': MappingProxyType({int(r['Year']): r for r in final_records}),
+        'by_iso': MappingProxyType({r['ISO_Code']: r for r in nation_records if r['ISO_Code']}),
+        'years_by_country': MappingProxyType(years_by_country),
+        'countries_by_year': MappingProxyType({y: tuple(c) for y, c in countries_by_year.items()})
+    }
+
+# the finals timeline as a plain animation_frame figure: for every year the
+# finals up to that year are filtered and counted again, and every frame
+# carries every country
+
+
+def animated_frames(finals_df, nation_df):
+    from matches import team_names
+
+    iso_by_country = dict(zip(nation_df['Country'].astype(str), nation_df['ISO_Code']))
+    rows = []
+    for year in sorted(finals_df['Year'].unique()):
+        played = finals_df[finals_df['Year'] <= year]
+        winners = team_names(played['Winners'].astype(str), nation_df)
+        runners_up = team_names(played['Runners-up'].astype(str), nation_df)
+        wins = winners.value_counts()
+        finals = pd.concat([winners, runners_up]).value_counts()
+        for country, iso in iso_by_country.items():
+            rows.append({'Year': int(year), 'Country': country, 'ISO_Code': iso,
+                         'Wins': int(wins.get(country, 0)),
+                         'RunnerUps': int(finals.get(country, 0) - wins.get(country, 0)),
+                         'TotalFinals': int(finals.get(country, 0))})
+    return pd.DataFrame(rows)
+
+
+def animated_figure(finals_df, nation_df):
+    frames = animated_frames(finals_df, nation_df)
+    return px.choropleth(frames, locations='ISO_Code', locationmode='ISO-3',
+                         color='TotalFinals', range_color=(0, frames['TotalFinals'].max()),
+                         animation_frame='Year', scope='world', hover_name='Country',
+                         custom_data=['Wins', 'RunnerUps', 'TotalFinals'])
@@ -0,0 +1,467 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    run.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Benchmark suite for the scraper pipeline and the Dash callbacks. Runs fully
+# offline against the saved HTML fixture and synthetic scaled-up copies.
+#
+#   python benchmarks/run.py                         # everything
+#   python benchmarks/run.py --only scraper          # one benchmark group
+#   python benchmarks/run.py --json results.json     # save results
+#   python benchmarks/run.py --compare results.json  # fail on regressions
+
+# import libraries
+import statistics
+import argparse
+import tracemalloc
+import tempfile
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# never scrape the live page while benchmarking
+os.environ.setdefault('WC_OFFLINE', '1')
+
+import fixtures  # noqa: E402
+
+SCALES = (10, 100, 1000)
+
+########################################################
+# Timing helpers
+########################################################
+
+
+def measure(function, repeat=5, warmup=1):
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def peak_memory(function):
+    # peak python heap allocated while running the function once
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(name, times, peak=None):
+    ordered = sorted(times)
+    return {
+        'name': name,
+        'runs': len(times),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+        'peak_mb': None if peak is None else peak / 2 ** 20
+    }
+
+########################################################
+# Benchmark cases
+########################################################
+
+
+def bench_scraper(scaled_pages):
+    from scraper import get_world_cup_data
+
+    pages = {1: fixtures.FIXTURE, **scaled_pages}
+    for scale, path in pages.items():
+        repeat = 5 if scale < 1000 else 1
+        yield summarize(f"scraper/get_world_cup_data[{scale}x]",
+                        measure(lambda: get_world_cup_data(path),
+                                repeat=repeat, warmup=int(scale == 1)),
+                        peak_memory(lambda: get_world_cup_data(path)))
+
+
+def bench_tables(scaled_pages, tmp):
+    # locating the two target tables on pages with more and more unrelated
+    # tables, streamed with lxml versus pandas parsing every table
+    from scraper import find_tables
+    from io import StringIO
+    import pandas as pd
+
+    for filler in (1,) + tuple(scaled_pages):
+        path = fixtures.write_page(os.path.join(tmp, f"filler_{filler}x.html"), 1, filler)
+        with open(path, 'rb') as f:
+            page = f.read()
+
+        def targeted():
+            return [pd.read_html(StringIO(html))[0] for html in find_tables(page).values()]
+
+        def all_tables():
+            return pd.read_html(StringIO(page.decode('utf-8')))
+
+        repeat = 5 if filler < 1000 else 1
+        yield summarize(f"tables/find_tables[filler {filler}x]",
+                        measure(targeted, repeat=repeat), peak_memory(targeted))
+        yield summarize(f"tables/read_html_all[filler {filler}x]",
+                        measure(all_tables, repeat=repeat), peak_memory(all_tables))
+
+
+def bench_cleaning(scaled_pages):
+    # the per-row apply() cleaning (benchmarks/reference.py) against the
+    # vectorized pipeline on the raw scraped columns repeated `scale` times;
+    # both must produce the same values
+    from scraper import fetch_page, find_tables, parse_years
+    from countries import iso3_codes
+    from derived import parse_scores
+    from io import StringIO
+    import pandas as pd
+    import reference
+
+    tables = find_tables(fetch_page(fixtures.FIXTURE))
+    score = pd.read_html(StringIO(tables['finals']))[0]['Score']
+    nations = pd.read_html(StringIO(tables['nations']))[0]
+
+    cases = (
+        ('score', score, reference.clean_scores,
+         lambda s: parse_scores(s)[['CleanedScore', 'Notes']]),
+        ('years', nations['Years won'], reference.clean_years,
+         lambda s: parse_years(s.replace('—', None))),
+        ('iso_codes', nations['Team'].replace(reference.NAME_FIXES), reference.country_codes, iso3_codes)
+    )
+
+    for scale in (1,) + tuple(scaled_pages):
+        repeat = 5 if scale < 1000 else 1
+        for name, column, per_row, vectorized in cases:
+            column = pd.concat([column] * scale, ignore_index=True)
+            expected, actual = per_row(column), vectorized(column)
+            if reference.plain_values(expected) != reference.plain_values(actual):
+                raise AssertionError(f"vectorized {name} differs from the per-row version")
+
+            yield summarize(f"cleaning/{name}[apply, {scale}x]",
+                            measure(lambda: per_row(column), repeat=repeat, warmup=0))
+            yield summarize(f"cleaning/{name}[vectorized, {scale}x]",
+                            measure(lambda: vectorized(column), repeat=repeat, warmup=0))
+
+
+def bench_fetch(tmp):
+    # the finals, every tournament page and the top scorers page from the
+    # local fixture server with 50ms of latency per request: one at a time,
+    # through the pooled thread pool, and again as conditional requests
+    from fetcher import FINALS_PAGE, TOP_SCORERS_PAGE, Fetcher, page_url, tournament_page
+    import fixture_server
+
+    server = fixture_server.start_server(latency=0.05, fallback=os.path.splitext(
+        os.path.basename(fixtures.FIXTURE))[0])
+    flaky = fixture_server.start_server(latency=0.05, fail_every=5, fallback=server.fallback)
+    titles = ([FINALS_PAGE, TOP_SCORERS_PAGE] +
+              [tournament_page(year) for year in range(1930, 2023, 4) if year not in (1942, 1946)])
+    urls = [page_url(title, server.base_url) for title in titles]
+
+    def fetch_all(fetcher, urls):
+        results, errors = fetcher.fetch_all(urls)
+        assert not errors, errors
+        return results
+
+    try:
+        sequential = Fetcher(workers=1)
+        concurrent = Fetcher(workers=8)
+        cached = Fetcher(os.path.join(tmp, 'pages'), workers=8)
+        fetch_all(cached, urls)
+        retrying = Fetcher(workers=8, backoff=0.01)
+        flaky_urls = [page_url(title, flaky.base_url) for title in titles]
+
+        yield summarize(f"fetch/sequential[{len(urls)} pages]",
+                        measure(lambda: [sequential.fetch(url) for url in urls], repeat=3))
+        yield summarize(f"fetch/concurrent[{len(urls)} pages]",
+                        measure(lambda: fetch_all(concurrent, urls), repeat=3))
+        assert all(r.not_modified for r in fetch_all(cached, urls).values())
+        yield summarize(f"fetch/conditional_304[{len(urls)} pages]",
+                        measure(lambda: fetch_all(cached, urls), repeat=3))
+        yield summarize(f"fetch/concurrent_503_every_5th[{len(urls)} pages]",
+                        measure(lambda: fetch_all(retrying, flaky_urls), repeat=3))
+    finally:
+        server.shutdown()
+        flaky.shutdown()
+
+
+def bench_pipeline(scaled_pages):
+    # normalizing, indexing and deriving statistics after a scrape
+    from scraper import get_world_cup_data
+    from storage import normalize_tables
+    from datastore import WorldCupData
+
+    pages = {1: fixtures.FIXTURE, **scaled_pages}
+    for scale, path in pages.items():
+        raw = get_world_cup_data(path)
+        repeat = 5 if scale < 1000 else 1
+        yield summarize(f"pipeline/normalize_tables[{scale}x]",
+                        measure(lambda: normalize_tables(*raw), repeat=repeat, warmup=0))
+        tables = normalize_tables(*raw)
+        yield summarize(f"pipeline/WorldCupData.build[{scale}x]",
+                        measure(lambda: WorldCupData.build(*tables, 'bench'), repeat=repeat, warmup=0))
+
+
+def synthetic_matches(tournaments=22, teams=80, seed=0):
+    # roughly a full match history: 16-32 teams per tournament, round-robin
+    # groups of four and a knockout bracket (about 1,000 matches in total)
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    names = [f"Team {i:02d}" for i in range(teams)]
+    rows = []
+    for t in range(tournaments):
+        year = 1930 + 4 * t
+        entrants = list(rng.choice(names, size=16 if t < 12 else 32, replace=False))
+        for g in range(0, len(entrants), 4):
+            group = entrants[g:g + 4]
+            rows += [(year, 'Group stage', a, b) for i, a in enumerate(group) for b in group[i + 1:]]
+        bracket = entrants[::2]
+        for stage in ('Round of 16', 'Quarter-finals', 'Semi-finals', 'Final')[-int(np.log2(len(bracket))):]:
+            rows += [(year, stage, a, b) for a, b in zip(bracket[::2], bracket[1::2])]
+            bracket = bracket[::2]
+
+    matches = pd.DataFrame(rows, columns=['Year', 'Stage', 'Team1', 'Team2'])
+    matches['Goals1'] = rng.poisson(1.4, len(matches))
+    matches['Goals2'] = rng.poisson(1.1, len(matches))
+    matches['ExtraTime'] = False
+    matches['Penalties1'] = pd.array([pd.NA] * len(matches), dtype='Int16')
+    matches['Penalties2'] = pd.array([pd.NA] * len(matches), dtype='Int16')
+    return matches
+
+
+def bench_matches():
+    # building the country x year x stage cube, and answering filters from
+    # it versus filtering/grouping the per-team match rows on every request
+    from matches import MatchCube, team_rows
+
+    matches = synthetic_matches()
+    rows = team_rows(matches)
+    cube = MatchCube.build(matches)
+    filters = [(country, year, stage)
+               for country in (None,) + cube.countries[:10]
+               for year in (None,) + cube.years
+               for stage in (None,) + cube.stages]
+
+    def pandas_filter():
+        for country, year, stage in filters:
+            selected = rows
+            if country is not None:
+                selected = selected[selected['Country'] == country]
+            if year is not None:
+                selected = selected[selected['Year'] == year]
+            if stage is not None:
+                selected = selected[selected['Stage'] == stage]
+            selected.groupby('Country')[['GoalsFor', 'GoalsAgainst']].sum()
+
+    def cube_slices():
+        for country, year, stage in filters:
+            cube.totals(country, year, stage)
+            cube.by_country(year, stage)
+
+    yield summarize(f"matches/MatchCube.build[{len(matches)} matches]",
+                    measure(lambda: MatchCube.build(matches), repeat=5))
+    yield summarize(f"matches/pandas_filter[{len(filters)} filters]",
+                    measure(pandas_filter, repeat=3))
+    yield summarize(f"matches/cube_slices[{len(filters)} filters]",
+                    measure(cube_slices, repeat=3))
+
+
+def bench_timeline():
+    # the finals timeline frames: one incremental pass with delta frames
+    # versus re-aggregating every year's finals and animating every country
+    # in every frame (plotly express animation_frame), on the seed finals and
+    # on copies repeated under later years
+    import app
+    import reference
+    from timeline import Timeline, TimelineCache, cumulative_frames
+    import pandas as pd
+
+    data = app.data
+    for scale in (1, 10):
+        finals_df = pd.concat([data.finals_df] * scale, ignore_index=True)
+        finals_df['Year'] = range(1930, 1930 + 4 * len(finals_df), 4)
+        yield summarize(f"timeline/cumulative_frames[{len(finals_df)} finals]",
+                        measure(lambda: cumulative_frames(finals_df, data.nation_df,
+                                                          list(data.countries)), repeat=10))
+        yield summarize(f"timeline/re-aggregated frames[{len(finals_df)} finals]",
+                        measure(lambda: reference.animated_frames(finals_df, data.nation_df),
+                                repeat=3))
+
+    yield summarize('timeline/Timeline[build + json]',
+                    measure(lambda: json.dumps(Timeline(data).payload()), repeat=5))
+    yield summarize('timeline/px animation[build + json]',
+                    measure(lambda: reference.animated_figure(data.finals_df,
+                                                              data.nation_df).to_json(), repeat=3))
+    cache = TimelineCache()
+    cache.get(data)
+    yield summarize('timeline/TimelineCache.get[hit]',
+                    measure(lambda: cache.get(data), repeat=100))
+
+
+def update_request(output, country, year):
+    # the body Dash posts to /_dash-update-component for a dropdown change
+    component, prop = output.split('.')
+    return {
+        'output': output,
+        'outputs': {'id': component, 'property': prop},
+        'inputs': [{'id': 'country-dropdown', 'property': 'value', 'value': country},
+                   {'id': 'year-dropdown', 'property': 'value', 'value': year}],
+        'changedPropIds': ['country-dropdown.value'],
+        'state': []
+    }
+
+
+def bench_callbacks(tmp):
+    import app
+    import callback_cache
+
+    selections = [(country, year)
+                  for country in (None,) + app.data.countries
+                  for year in (None,) + app.data.years]
+
+    def per_selection(function):
+        times = []
+        for country, year in selections:
+            start = time.perf_counter()
+            function(country, year)
+            times.append(time.perf_counter() - start)
+        return times
+
+    map_patch = app.MAP_PATCH
+    try:
+        app.MAP_PATCH = True
+        yield summarize('callbacks/update_map[patch]', per_selection(app.update_map))
+
+        app.MAP_PATCH = False
+        app.figure_cache.clear()
+        yield summarize('callbacks/update_map[full, cold cache]',
+                        per_selection(app.update_map))
+        yield summarize('callbacks/update_map[full, warm cache]',
+                        per_selection(app.update_map))
+    finally:
+        app.MAP_PATCH = map_patch
+
+    yield summarize('callbacks/update_stats', per_selection(app.update_stats))
+
+    # full /_dash-update-component round trips through the Flask test
+    # client, with every response computed and with every response cached
+    if app.callback_responses:
+        client = app.server.test_client()
+        cache = app.callback_responses
+        backend, local = cache.backend, cache.local
+
+        def post(output):
+            def request(country, year):
+                response = client.post('/_dash-update-component',
+                                       json=update_request(output, country, year))
+                assert response.status_code == 200
+            return request
+
+        backends = {'memory': (callback_cache.MemoryBackend(), None),
+                    'sqlite': (callback_cache.SQLiteBackend(os.path.join(tmp, 'callbacks.sqlite')),
+                               None)}
+        try:
+            for name, (cache.backend, cache.local) in backends.items():
+                for output in ('world-map.figure', 'stats-panel.children'):
+                    yield summarize(f"callbacks/http[{output}, {name}, miss]",
+                                    per_selection(post(output)))
+                    yield summarize(f"callbacks/http[{output}, {name}, hit]",
+                                    per_selection(post(output)))
+        finally:
+            cache.backend, cache.local = backend, local
+    yield summarize('callbacks/update_historical_summary',
+                    measure(app.update_historical_summary, repeat=20))
+
+
+BENCHMARKS = {
+    'scraper': bench_scraper,
+    'tables': bench_tables,
+    'cleaning': bench_cleaning,
+    'fetch': bench_fetch,
+    'pipeline': bench_pipeline,
+    'matches': bench_matches,
+    'timeline': bench_timeline,
+    'callbacks': bench_callbacks
+}
+
+########################################################
+# Reporting
+########################################################
+
+
+def print_results(results):
+    print(f"{'benchmark':<48}{'runs':>6}{'min':>12}{'median':>12}{'p95':>12}{'max':>12}{'peak mem':>12}")
+    for r in results:
+        peak = f"{r['peak_mb']:>10.1f}MB" if r.get('peak_mb') is not None else f"{'-':>12}"
+        print(f"{r['name']:<48}{r['runs']:>6}" +
+              ''.join(f"{r[k] * 1000:>10.2f}ms" for k in ('min', 'median', 'p95', 'max')) + peak)
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {r['name']: r for r in json.load(f)['results']}
+
+    regressions = []
+    for r in results:
+        base = baseline.get(r['name'])
+        if base and base['median'] > 0:
+            ratio = r['median'] / base['median']
+            flag = '  REGRESSION' if ratio > threshold else ''
+            print(f"{r['name']:<48}{ratio:>8.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append(r['name'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the scraper pipeline and Dash callbacks')
+    parser.add_argument('--only', action='append', default=[], choices=sorted(BENCHMARKS),
+                        help='only run this benchmark group (repeatable)')
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)),
+                        help='comma separated synthetic scale factors')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='median slowdown ratio that counts as a regression')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        scaled_pages = {scale: fixtures.write_page(os.path.join(tmp, f"finals_{scale}x.html"), scale)
+                        for scale in scales}
+
+        for group, bench in BENCHMARKS.items():
+            if args.only and group not in args.only:
+                continue
+            extra = {'callbacks': (tmp,), 'matches': (), 'timeline': (), 'fetch': (tmp,),
+                     'tables': (scaled_pages, tmp)}
+            for result in bench(*extra.get(group, (scaled_pages,))):
+                results.append(result)
+                print(f"  {result['name']}: median {result['median'] * 1000:.2f}ms")
+
+    print()
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.time(), 'results': results}, f, indent=2)
+
+    if args.compare:
+        print()
+        if compare(results, args.compare, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
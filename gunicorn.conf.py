@@ -0,0 +1,118 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    gunicorn.conf.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Production server configuration:
+#
+#   gunicorn --config gunicorn.conf.py
+#
+# The app is preloaded in the master process, so the World Cup data is
+# loaded once and shared copy-on-write with the forked workers.
+
+# import libraries
+import multiprocessing
+import tempfile
+import shutil
+import gc
+import os
+
+# fast startup: bind right away and load the dashboard in the background of
+# each worker, serving a loading page until it is ready (see fast_start.py)
+FAST_START = os.environ.get(
+    'WC_FAST_START', '0').lower() in ('1', 'true', 'yes')
+
+# the workers share /metrics through per-process files in this directory
+# (see metrics.py). the default temp dir belongs to this server and is
+# removed on exit; from a directory the operator chose, only the files of
+# this server's processes are removed
+OWN_METRICS_DIR = 'WC_METRICS_DIR' not in os.environ
+os.environ.setdefault('WC_METRICS_DIR', os.path.join(
+    tempfile.gettempdir(), f"wc-metrics-{os.getpid()}"))
+
+# every worker appends to the same log file, so size-based rotation is left
+# to an external tool such as logrotate (see log_config.py)
+os.environ.setdefault('WC_LOG_ROTATION', 'external')
+
+# the dashboard modules import each other from src/
+pythonpath = 'src'
+wsgi_app = 'fast_start:application' if FAST_START else 'app:server'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8050)}"
+
+# load data and build the layout once, before forking
+# (preloading would block binding the port, so fast startup turns it off)
+preload_app = os.environ.get(
+    'GUNICORN_PRELOAD', '0' if FAST_START else '1').lower() in ('1', 'true', 'yes')
+
+# callbacks are short and mostly release the GIL on I/O, so a few processes
+# with a small thread pool each handle concurrent dropdown traffic well
+workers = int(os.environ.get('WEB_CONCURRENCY',
+                             min(multiprocessing.cpu_count() * 2 + 1, 4)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# worker recycling is opt-in: set GUNICORN_MAX_REQUESTS (and a jitter so
+# the workers do not restart together) to bound memory growth. it is off by
+# default because a recycled worker under WC_FAST_START reloads the data
+# and serves the loading page meanwhile
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # move everything allocated while preloading into the permanent
+    # generation so the garbage collector does not touch (and copy) those
+    # pages in every worker
+    if preload_app:
+        gc.freeze()
+        server.log.info(
+            f"Froze {gc.get_freeze_count()} preloaded objects before forking")
+
+
+def post_worker_init(worker):
+    # threads do not survive fork, so each worker runs its own data
+    # refresher; they share the snapshot cache, so only a stale snapshot is
+    # re-scraped and the other workers pick the new one up from disk
+    if FAST_START:
+        # the background load starts the refresher once the app is imported
+        import fast_start
+        fast_start.application.start()
+    else:
+        import app
+        app.start_refresher()
+
+
+# pids of this server's exited workers (and the master itself)
+_server_pids = {os.getpid()}
+
+
+def child_exit(server, worker):
+    _server_pids.add(worker.pid)
+
+
+def on_exit(server):
+    metrics_dir = os.environ['WC_METRICS_DIR']
+    if OWN_METRICS_DIR:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        return
+    try:
+        names = os.listdir(metrics_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith('.json') and name.split('-', 1)[0] in {str(p) for p in _server_pids}:
+            try:
+                os.remove(os.path.join(metrics_dir, name))
+            except OSError:
+                pass
@@ -0,0 +1,236 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    api.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Read-only JSON API over the loaded data, served next to the Dash UI:
+#
+#   /api                        index of the endpoints and the data version
+#   /api/finals                 every final
+#   /api/finals/<year>          one final
+#   /api/nations                every nation
+#   /api/nations/<country>      one nation (name or ISO Alpha-3 code)
+#   /api/stats                  tournament-wide aggregates
+#   /api/stats/decades          finals, goals and attendance per decade
+#   /api/stats/stages           matches, results and goals per stage
+#   /api/matches                every match the match engine knows about
+#   /api/timeline               cumulative finals per country, one delta per final
+#
+# Every body is serialized (and gzip/brotli compressed) once per data
+# version; requests only pick a representation and check the ETag.
+
+# import libraries
+from derived import add_score_columns
+from timeline import get_timeline
+from urllib.parse import quote
+from versioned import VersionedCache
+import logging
+import hashlib
+import pandas as pd
+import gzip
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# brotli is optional; without it responses are offered as gzip only
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# configuration (overridable through environment variables)
+API_MAX_AGE = int(os.environ.get('WC_API_MAX_AGE', 300))
+
+# bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+########################################################
+# Pre-serialized responses
+########################################################
+
+
+def _plain(value):
+    # json-ready python values from DataFrame cells
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, 'tolist'):
+        return _plain(value.tolist())
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _records(df):
+    return [{key: _plain(val) for key, val in row.items()}
+            for row in df.to_dict('records')]
+
+
+class Body:
+    # one response body in every encoding we offer, with its validators
+    def __init__(self, payload, version):
+        self.identity = json.dumps(payload, ensure_ascii=False,
+                                   separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(self.identity).hexdigest()[:16]
+        self.etag = f"{version}-{digest}"
+
+        self.encoded = {}
+        if len(self.identity) >= MIN_COMPRESS_SIZE:
+            self.encoded['gzip'] = gzip.compress(self.identity, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.encoded['br'] = brotli.compress(self.identity, quality=11)
+
+    def etag_for(self, encoding):
+        # one strong etag per representation
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+# every api response for one data version
+
+
+class ApiResponses:
+    def __init__(self, data):
+        self.version = data.version
+        finals = add_score_columns(data.finals_df).drop(columns=['Penalties'])
+        finals_records = _records(finals)
+        nation_records = _records(data.nation_df)
+        stats = data.stats
+
+        def body(payload):
+            return Body(payload, self.version)
+
+        self.bodies = {
+            '/api/finals': body({'version': self.version, 'finals': finals_records}),
+            '/api/nations': body({'version': self.version, 'nations': nation_records}),
+            '/api/stats': body({
+                'version': self.version,
+                'total_finals': stats['total_finals'],
+                'total_countries': stats['total_countries'],
+                'avg_goals': stats['avg_goals'],
+                'extra_time_finals': stats['extra_time_finals'],
+                'penalty_finals': stats['penalty_finals'],
+                'host_wins': stats['host_wins'],
+                'avg_attendance': stats['avg_attendance'],
+                'highest_attendance': {'year': stats['highest_attendance'][0],
+                                       'attendance': stats['highest_attendance'][1]},
+                'top_countries': _records(stats['top_countries'])
+            }),
+            '/api/stats/decades': body({'version': self.version,
+                                        'decades': _records(stats['by_decade'])}),
+            '/api/stats/stages': body({'version': self.version, 'stages': [
+                dict(stage=stage, **data.cube.totals(stage=stage)) for stage in data.cube.stages]}),
+            '/api/matches': body({'version': self.version, 'matches': _records(data.matches)}),
+            '/api/timeline': body(get_timeline(data).payload(figure=False))
+        }
+        for record in finals_records:
+            self.bodies[f"/api/finals/{record['Year']}"] = body(record)
+
+        # nations are reachable by name and by ISO code, case-insensitively
+        self.nation_keys = {}
+        for record in nation_records:
+            path = f"/api/nations/{quote(record['Country'])}"
+            self.bodies[path] = body(record)
+            for key in (record['Country'], record['ISO_Code']):
+                if key:
+                    self.nation_keys[key.casefold()] = path
+
+        self.bodies['/api'] = body({
+            'version': self.version,
+            'endpoints': sorted(self.bodies) + ['/api']
+        })
+
+    def get(self, path):
+        return self.bodies.get(path)
+
+    def nation(self, key):
+        path = self.nation_keys.get(key.casefold())
+        return self.bodies.get(path) if path else None
+
+# responses for the current data version and the one before it (see
+# versioned.py)
+
+
+class ApiCache(VersionedCache):
+    def build(self, data):
+        responses = ApiResponses(data)
+        logger.info(f"Built {len(responses.bodies)} API responses for {data.version}")
+        return responses
+
+########################################################
+# Flask integration
+########################################################
+
+
+def _choose_encoding(request, body):
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in body.encoded and accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+def _not_modified(request, etag):
+    # only the etag of the representation being sent validates a cached copy
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return if_none_match.star_tag or if_none_match.contains(etag)
+
+
+def send_body(body):
+    import flask
+
+    request = flask.request
+    encoding = _choose_encoding(request, body)
+    etag = body.etag_for(encoding)
+
+    if _not_modified(request, etag):
+        response = flask.Response(status=304)
+    else:
+        response = flask.Response(body.encoded[encoding] if encoding else body.identity,
+                                  mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={API_MAX_AGE}"
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _not_found(message):
+    import flask
+    return flask.Response(json.dumps({'error': message}), status=404,
+                          mimetype='application/json')
+
+
+def init_app(server, get_data, cache=None):
+    # get_data returns the dataset currently being served
+    cache = cache or ApiCache()
+
+    @server.route('/api')
+    @server.route('/api/finals')
+    @server.route('/api/nations')
+    @server.route('/api/stats')
+    @server.route('/api/stats/decades')
+    @server.route('/api/stats/stages')
+    @server.route('/api/matches')
+    @server.route('/api/timeline')
+    def api_collection():
+        import flask
+        return send_body(cache.get(get_data()).get(flask.request.path.rstrip('/')))
+
+    @server.route('/api/finals/<int:year>')
+    def api_final(year):
+        body = cache.get(get_data()).get(f"/api/finals/{year}")
+        return send_body(body) if body else _not_found(f"No final in {year}")
+
+    @server.route('/api/nations/<country>')
+    def api_nation(country):
+        body = cache.get(get_data()).nation(country)
+        return send_body(body) if body else _not_found(f"Unknown country '{country}'")
+
+    return cache
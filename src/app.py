@@ -8,32 +8,26 @@
 ## Deployment URL : https://fifa-world-cup-dashboard-production.up.railway.app/
 
 # import libraries
-from scraper import get_world_cup_data
+from snapshot import load_world_cup_data
+from datastore import WorldCupData
+from figures import FigureCache, build_map_patch, MAP_PATCH, WARM_FIGURES
+from static_site import StaticPayloads, payload_key
+from refresher import DataRefresher
+from timeline import get_timeline, timeline_cache, TIMELINE_INTERVAL
+from log_config import setup_logging
+import callback_cache
+import metrics
+import api
 import dash
+import flask
 from dash import html, dcc
-import plotly.express as px
-import pandas as pd
-import numpy as np
 import logging
+import time
 import os
-import sys
-
-# Configure logging before importing scraper
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
-os.makedirs(log_dir, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.WARNING,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'app.log')),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 
-# suppress scraper logs
-logging.getLogger('scraper').setLevel(logging.WARNING)
-logging.getLogger('app').setLevel(logging.INFO)
+# logging goes through a queue to a background writer (rotating file +
+# stdout); per-module levels come from log_config.DEFAULT_LEVELS/WC_LOG_LEVELS
+setup_logging('app.log')
 logger = logging.getLogger('app')
 
 # initialize the dash app
@@ -93,169 +87,225 @@ app.index_string = '''
 # load the data
 try:
     logger.info("Loading World Cup data...")
-    finals_df, nation_df = get_world_cup_data()
+    finals_df, nation_df, snapshot = load_world_cup_data()
+    data = WorldCupData.build(finals_df, nation_df, snapshot['version'])
     logger.info(
-        f"Successfully loaded data. Finals shape: {finals_df.shape}, Nations shape: {nation_df.shape}")
+        f"Successfully loaded data (snapshot {snapshot['version']}, source: {snapshot['source']}). Finals shape: {finals_df.shape}, Nations shape: {nation_df.shape}")
 except Exception as e:
     logger.error(f"Error loading data: {str(e)}")
     raise
 
-# define the layout
-app.layout = html.Div([
-    html.H1('FIFA World Cup Dashboard',
-            style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
-
-    # choropleth map
-    html.Div([
-        dcc.Graph(id='world-map')
-    ], style={'width': '100%', 'height': '60vh'}),
+# static mode: answer callbacks from payloads exported by static_site.py
+STATIC_DIR = os.environ.get('WC_STATIC_DIR')
+static_payloads = StaticPayloads(
+    STATIC_DIR, data.version) if STATIC_DIR else None
+
+# cache of serialized map figures
+figure_cache = FigureCache()
+if WARM_FIGURES:
+    figure_cache.warm(data)
+
+# clientside mode: ship the compact dataset to the browser once
+CLIENTSIDE = os.environ.get(
+    'WC_CLIENTSIDE', '0').lower() in ('1', 'true', 'yes')
+
+
+# liveness: the process is up and serving requests
+@server.route('/healthz')
+def healthz():
+    return flask.jsonify({'status': 'ok'})
+
+
+# readiness: the data is loaded and the layout can be served
+@server.route('/readyz')
+def readyz():
+    dataset = data
+    return flask.jsonify({
+        'status': 'ready',
+        'version': dataset.version,
+        'source': snapshot['source'],
+        'finals': len(dataset.years),
+        'countries': len(dataset.countries),
+        'refresh': refresher.stats()
+    })
+
+
+@server.route('/cache/stats')
+def cache_stats():
+    return flask.jsonify({'figures': figure_cache.stats(),
+                          'callbacks': callback_responses.stats() if callback_responses else None,
+                          'api': {'builds': api_cache.builds},
+                          'timeline': {'builds': timeline_cache.builds}})
+
+
+# read-only JSON API (/api/...) over the same data as the dashboard
+api_cache = api.init_app(server, lambda: data)
+
+# callback/scraper timings, payload sizes and cache statistics on /metrics
+metrics.init_app(server)
+metrics.gauge('figure_cache_requests', 'Figure cache lookups by result',
+              lambda: [({'result': 'hit'}, figure_cache.stats()['hits']),
+                       ({'result': 'miss'}, figure_cache.stats()['misses'])])
+metrics.gauge('figure_cache_hit_ratio', 'Figure cache hit ratio',
+              lambda: [({}, figure_cache.stats()['hit_ratio'])])
+metrics.gauge('figure_cache_size', 'Figures held in the figure cache',
+              lambda: [({}, figure_cache.stats()['size'])])
+
+# serialized map/statistics callback responses (shared by the workers with
+# the sqlite and redis backends); hits never reach the Dash callbacks
+callback_responses = callback_cache.make_cache() if not CLIENTSIDE else None
+if callback_responses:
+    callback_cache.init_app(server, callback_responses, lambda: data.version,
+                            {'world-map.figure', 'stats-panel.children'},
+                            variant=f"patch={MAP_PATCH},static={bool(STATIC_DIR)}")
+    metrics.gauge('callback_cache_requests', 'Callback response cache lookups by result',
+                  lambda: [({'result': 'hit'}, callback_responses.hits),
+                           ({'result': 'miss'}, callback_responses.misses)])
+    metrics.gauge('callback_cache_hit_ratio', 'Callback response cache hit ratio',
+                  lambda: [({}, callback_responses.stats()['hit_ratio'])])
+
+# build the page for a data snapshot; the result (including the historical
+# summary) is reused for every page load until the next data swap
+
+
+def build_layout(dataset):
+    timeline = get_timeline(dataset)
+    layout = html.Div([
+        html.H1('FIFA World Cup Dashboard',
+                style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
+
+        # dataset for the clientside callbacks (only filled in clientside mode)
+        dcc.Store(id='data-store',
+                  data=dict(dataset.client_payload(), figure=figure_cache.get(dataset)) if CLIENTSIDE else None),
+
+        # choropleth map
+        # (with partial updates the base figure ships with the layout)
+        html.Div([
+            dcc.Graph(id='world-map',
+                      figure=figure_cache.get(dataset) if MAP_PATCH else None)
+        ], style={'width': '100%', 'height': '60vh'}),
 
-    # controls
-    html.Div([
+        # controls
         html.Div([
-            html.Label('Select Country:'),
-            dcc.Dropdown(
-                id='country-dropdown',
-                options=[{'label': country, 'value': country}
-                         for country in nation_df['Country'].unique()],
-                value=None
-            )
-        ], style={'width': '30%', 'display': 'inline-block', 'marginRight': '20px'}),
+            html.Div([
+                html.Label('Select Country:'),
+                dcc.Dropdown(
+                    id='country-dropdown',
+                    options=[{'label': country, 'value': country}
+                             for country in dataset.countries],
+                    value=None
+                )
+            ], style={'width': '30%', 'display': 'inline-block', 'marginRight': '20px'}),
 
+            html.Div([
+                html.Label('Select Year:'),
+                dcc.Dropdown(
+                    id='year-dropdown',
+                    options=[{'label': str(year), 'value': year}
+                             for year in dataset.years],
+                    value=None
+                )
+            ], style={'width': '30%', 'display': 'inline-block'})
+        ], style={'marginTop': '20px', 'marginBottom': '20px'}),
+
+        # statistics panel
         html.Div([
-            html.Label('Select Year:'),
-            dcc.Dropdown(
-                id='year-dropdown',
-                options=[{'label': year, 'value': year}
-                         for year in sorted(finals_df['Year'].unique())],
-                value=None
-            )
-        ], style={'width': '30%', 'display': 'inline-block'})
-    ], style={'marginTop': '20px', 'marginBottom': '20px'}),
-
-    # statistics panel
-    html.Div([
-        html.H3('Statistics', style={'color': '#2c3e50'}),
-        html.Div(id='stats-panel',
-                 style={'display': 'flex', 'flexWrap': 'wrap', 'gap': '20px'})
-    ], style={'marginTop': '20px', 'padding': '20px', 'border': '1px solid #ddd', 'borderRadius': '5px'}),
-
-    # historical summary
-    html.Div([
-        html.H3('Historical Summary', style={
-                'color': '#2c3e50', 'marginBottom': '20px'}),
+            html.H3('Statistics', style={'color': '#2c3e50'}),
+            html.Div(id='stats-panel',
+                     style={'display': 'flex', 'flexWrap': 'wrap', 'gap': '20px'})
+        ], style={'marginTop': '20px', 'padding': '20px', 'border': '1px solid #ddd', 'borderRadius': '5px'}),
+
+        # historical summary
         html.Div([
+            html.H3('Historical Summary', style={
+                    'color': '#2c3e50', 'marginBottom': '20px'}),
             html.Div([
-                html.H4('Most Successful Countries',
-                        style={'color': '#2c3e50'}),
-                html.Div(id='top-countries')
-            ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
-                      'backgroundColor': '#f8f9fa', 'borderRadius': '5px', 'marginRight': '20px'}),
+                html.Div([
+                    html.H4('Most Successful Countries',
+                            style={'color': '#2c3e50'}),
+                    html.Div(id='top-countries')
+                ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
+                          'backgroundColor': '#f8f9fa', 'borderRadius': '5px', 'marginRight': '20px'}),
 
+                html.Div([
+                    html.H4('Tournament Facts', style={'color': '#2c3e50'}),
+                    html.Div(id='tournament-facts')
+                ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
+                          'backgroundColor': '#f8f9fa', 'borderRadius': '5px'}),
+
+                html.Div([
+                    html.H4('Finals by Decade', style={'color': '#2c3e50'}),
+                    html.Div(id='decade-summary')
+                ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
+                          'backgroundColor': '#f8f9fa', 'borderRadius': '5px'})
+            ], style={'display': 'flex', 'flexWrap': 'wrap', 'gap': '20px'})
+        ], style={'marginTop': '20px', 'padding': '20px', 'border': '1px solid #ddd', 'borderRadius': '5px'}),
+
+        # finals timeline (frames are built once per data version and played
+        # in the browser, see assets/clientside.js)
+        html.Div([
+            html.H3('Finals Timeline', style={'color': '#2c3e50'}),
+            dcc.Store(id='timeline-store', data=timeline.payload()),
+            dcc.Graph(id='timeline-map', style={'height': '60vh'}),
             html.Div([
-                html.H4('Tournament Facts', style={'color': '#2c3e50'}),
-                html.Div(id='tournament-facts')
-            ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
-                      'backgroundColor': '#f8f9fa', 'borderRadius': '5px'})
-        ], style={'display': 'flex', 'flexWrap': 'wrap', 'gap': '20px'})
-    ], style={'marginTop': '20px', 'padding': '20px', 'border': '1px solid #ddd', 'borderRadius': '5px'})
-])
-
-
-@app.callback(
-    dash.Output('world-map', 'figure'),
-    dash.Input('country-dropdown', 'value'),
-    dash.Input('year-dropdown', 'value')
-)
+                html.Button('Play', id='timeline-play', n_clicks=0,
+                            style={'marginRight': '20px', 'padding': '5px 20px'}),
+                html.Div([
+                    dcc.Slider(
+                        id='timeline-year',
+                        min=0,
+                        max=len(timeline.frames) - 1,
+                        step=1,
+                        value=len(timeline.frames) - 1,
+                        marks={i: str(frame['year']) for i, frame in enumerate(timeline.frames)
+                               if i % 2 == 0 or i == len(timeline.frames) - 1},
+                        updatemode='drag'
+                    )
+                ], style={'flex': '1'})
+            ], style={'display': 'flex', 'alignItems': 'center'}),
+            dcc.Interval(id='timeline-interval', interval=TIMELINE_INTERVAL, disabled=True)
+        ], style={'marginTop': '20px', 'padding': '20px', 'border': '1px solid #ddd', 'borderRadius': '5px'})
+    ])
+
+    top_countries_content, tournament_facts_content, decade_content = \
+        update_historical_summary(dataset=dataset)
+    layout['top-countries'].children = top_countries_content
+    layout['tournament-facts'].children = tournament_facts_content
+    layout['decade-summary'].children = decade_content
+    return layout
+
+
+@metrics.timed_callback('update_map')
 def update_map(selected_country, selected_year):
+    dataset = data
     try:
-        logger.info(
-            f"Updating map with country: {selected_country}, year: {selected_year}")
-
-        # create choropleth data
-        map_data = nation_df.copy()
+        logger.debug("Updating map with country: %s, year: %s",
+                     selected_country, selected_year)
 
-        # filter data based on selection
-        if selected_country:
-            map_data = map_data[map_data['Country'] == selected_country]
-        if selected_year:
-            year_data = finals_df[finals_df['Year'] == selected_year]
-            map_data = map_data[map_data['Country'].isin(
-                [year_data['Winners'].iloc[0], year_data['Runners-up'].iloc[0]])]
-
-        # create hover text with both wins and runner-up appearances
-        map_data['hover_text'] = map_data.apply(
-            lambda row: f"Country: {row['Country']}<br>" +
-            f"World Cup Wins: {row['Wins']}<br>" +
-            f"Runner-up Appearances: {row['RunnerUps']}<br>" +
-            f"Total Finals: {row['TotalFinals']}",
-            axis=1
-        )
-
-        fig = px.choropleth(
-            map_data,
-            locations='Country',
-            locationmode='country names',
-            color='TotalFinals',
-            color_continuous_scale=[
-                [0, 'lightgrey'],     # For countries with no appearances
-                [0.2, '#ffffcc'],     # Light yellow for few appearances
-                [0.4, '#a1dab4'],     # Light green
-                [0.6, '#41b6c4'],     # Turquoise
-                [0.8, '#2c7fb8'],     # Blue
-                [1.0, '#253494']      # Dark blue for most appearances
-            ],
-            scope='world',
-            hover_name='Country',
-            custom_data=['Wins', 'RunnerUps', 'TotalFinals']
-        )
+        if static_payloads:
+            fig = static_payloads.get(
+                'map', payload_key(dataset, selected_country, selected_year))
+            if fig is not None:
+                return fig
 
-        fig.update_layout(
-            title={
-                'text': 'FIFA World Cup Final Appearances by Country (1930-2022)',
-                'y': 0.95,
-                'x': 0.5,
-                'xanchor': 'center',
-                'yanchor': 'top',
-                'font': {'size': 24}
-            },
-            geo=dict(
-                showframe=False,
-                showcoastlines=True,
-                projection_type='equirectangular',
-                showland=True,
-                landcolor='lightgray',
-                showocean=True,
-                oceancolor='aliceblue'
-            ),
-            coloraxis_colorbar=dict(
-                title='Finals Appearances',
-                ticksuffix='',
-                len=0.75,
-                title_font={'size': 14},
-                tickfont={'size': 12}
-            ),
-            margin=dict(l=0, r=0, t=50, b=0)
-        )
+        # only send the changed arrays; the browser keeps the base figure
+        if MAP_PATCH:
+            return build_map_patch(dataset, selected_country, selected_year)
 
-        # update hover template to show country first and avoid duplicates
-        fig.update_traces(
-            hovertemplate="<b>%{hovertext}</b><br><br>" +
-            "World Cup Wins: %{customdata[0]}<br>" +
-            "Runner-up Appearances: %{customdata[1]}<br>" +
-            "Total Finals: %{customdata[2]}" +
-            "<extra></extra>"
-        )
+        # figures are built once per selection and data version
+        fig = figure_cache.get(dataset, selected_country, selected_year)
 
-        logger.info("Map updated successfully")
+        logger.debug("Map updated successfully")
         return fig
 
     except Exception as e:
         logger.error(f"Error updating map: {str(e)}")
+        callback_cache.skip()
         # return a basic map in case of error
+        import plotly.express as px
         fig = px.choropleth(
-            locations=['BR'],
-            locationmode='country names',
+            locations=['BRA'],
+            locationmode='ISO-3',
             color=[1],
             color_continuous_scale='Viridis',
             scope='world'
@@ -263,21 +313,23 @@ def update_map(selected_country, selected_year):
         return fig
 
 
-@app.callback(
-    dash.Output('stats-panel', 'children'),
-    dash.Input('country-dropdown', 'value'),
-    dash.Input('year-dropdown', 'value')
-)
+@metrics.timed_callback('update_stats')
 def update_stats(selected_country, selected_year):
+    dataset = data
     try:
+        if static_payloads:
+            stats = static_payloads.get(
+                'stats', payload_key(dataset, selected_country, selected_year))
+            if stats is not None:
+                return stats['children']
+
         if not selected_country and not selected_year:
             return html.Div("Select a country or year to view statistics")
 
         stats_components = []
 
         if selected_country:
-            country_stats = nation_df[nation_df['Country']
-                                      == selected_country].iloc[0]
+            country_stats = dataset.country(selected_country)
 
             # create country statistics cards
             stats_components.extend([
@@ -301,7 +353,7 @@ def update_stats(selected_country, selected_year):
             ])
 
         if selected_year:
-            year_data = finals_df[finals_df['Year'] == selected_year].iloc[0]
+            year_data = dataset.final(selected_year)
 
             # create year statistics card
             stats_components.append(
@@ -321,7 +373,7 @@ def update_stats(selected_country, selected_year):
                                style={'fontSize': '1.2em'}),
                         html.P(f"Attendance: {int(year_data['Attendance']):,}",
                                style={'fontSize': '1.2em'}),
-                        html.P(f"Notes: {year_data['Notes'] if year_data['Notes'] else 'None'}",
+                        html.P(f"Notes: {list(year_data['Notes']) if year_data['Notes'] else 'None'}",
                                style={'fontSize': '1.2em'})
                     ])
                 ], style={'flex': '1', 'minWidth': '300px', 'padding': '15px',
@@ -332,30 +384,63 @@ def update_stats(selected_country, selected_year):
 
     except Exception as e:
         logger.error(f"Error updating statistics: {str(e)}")
+        callback_cache.skip()
         return html.Div("Error loading statistics")
 
 
-@app.callback(
-    [dash.Output('top-countries', 'children'),
-     dash.Output('tournament-facts', 'children')],
-    # Dummy input to initialize the callback
-    [dash.Input('country-dropdown', 'value')]
+# the map and statistics callbacks run in the browser in clientside mode
+# (see assets/clientside.js); the python versions are the fallback
+if CLIENTSIDE:
+    for output, function in [(dash.Output('world-map', 'figure'), 'update_map'),
+                             (dash.Output('stats-panel', 'children'), 'update_stats')]:
+        app.clientside_callback(
+            dash.ClientsideFunction(namespace='worldcup',
+                                    function_name=function),
+            output,
+            dash.Input('country-dropdown', 'value'),
+            dash.Input('year-dropdown', 'value'),
+            dash.State('data-store', 'data')
+        )
+else:
+    for output, function in [(dash.Output('world-map', 'figure'), update_map),
+                             (dash.Output('stats-panel', 'children'), update_stats)]:
+        app.callback(
+            output,
+            dash.Input('country-dropdown', 'value'),
+            dash.Input('year-dropdown', 'value')
+        )(function)
+
+# the timeline always runs in the browser: play/pause, advancing the slider
+# and drawing a frame from the cached deltas
+app.clientside_callback(
+    dash.ClientsideFunction(namespace='worldcup', function_name='timeline_play'),
+    dash.Output('timeline-interval', 'disabled'),
+    dash.Output('timeline-play', 'children'),
+    dash.Input('timeline-play', 'n_clicks')
 )
-def update_historical_summary(dummy):
+app.clientside_callback(
+    dash.ClientsideFunction(namespace='worldcup', function_name='timeline_step'),
+    dash.Output('timeline-year', 'value'),
+    dash.Input('timeline-interval', 'n_intervals'),
+    dash.State('timeline-year', 'value'),
+    dash.State('timeline-store', 'data')
+)
+app.clientside_callback(
+    dash.ClientsideFunction(namespace='worldcup', function_name='timeline_frame'),
+    dash.Output('timeline-map', 'figure'),
+    dash.Input('timeline-year', 'value'),
+    dash.Input('timeline-store', 'data')
+)
+
+
+# render the historical summary from the derived statistics computed at load
+# time; it never depends on the dropdowns
+
+
+@metrics.timed_callback('update_historical_summary')
+def update_historical_summary(dummy=None, dataset=None):
     try:
-        # top countries by wins
-        top_winners = nation_df.nlargest(
-            5, 'Wins')[['Country', 'Wins', 'RunnerUps']]
-
-        # calculate interesting statistics
-        total_finals = len(finals_df)
-        total_countries = len(nation_df)
-        avg_goals = finals_df['CleanedScore'].apply(
-            lambda x: sum(map(int, x.split('–')))).mean()
-        extra_time_matches = finals_df['Notes'].str.contains(
-            'extra time', na=False).sum()
-        penalty_matches = finals_df['Notes'].str.contains(
-            'pen.', na=False).sum()
+        stats = (dataset or data).stats
 
         # create top countries table
         top_countries_content = [
@@ -372,28 +457,123 @@ def update_historical_summary(dummy):
                         html.Td(row['Country']),
                         html.Td(row['Wins']),
                         html.Td(row['RunnerUps'])
-                    ]) for _, row in top_winners.iterrows()
+                    ]) for row in stats['top_countries'].to_dict('records')
                 ])
             ], style={'width': '100%', 'borderCollapse': 'collapse'})
         ]
 
         # create tournament facts
+        year, attendance = stats['highest_attendance']
         tournament_facts_content = [
-            html.P(f"Total World Cups: {total_finals}"),
-            html.P(f"Participating Countries in Finals: {total_countries}"),
-            html.P(f"Average Goals in Finals: {avg_goals:.2f}"),
-            html.P(f"Finals with Extra Time: {extra_time_matches}"),
-            html.P(f"Finals Decided by Penalties: {penalty_matches}")
+            html.P(f"Total World Cups: {stats['total_finals']}"),
+            html.P(
+                f"Participating Countries in Finals: {stats['total_countries']}"),
+            html.P(f"Average Goals in Finals: {stats['avg_goals']:.2f}"),
+            html.P(f"Finals with Extra Time: {stats['extra_time_finals']}"),
+            html.P(f"Finals Decided by Penalties: {stats['penalty_finals']}"),
+            html.P(
+                f"Finals Won by the Host Nation: {len(stats['host_wins'])} ({', '.join(map(str, stats['host_wins']))})"),
+            html.P(f"Average Attendance: {stats['avg_attendance']:,.0f}"),
+            html.P(f"Highest Attendance: {attendance:,} ({year})")
+        ]
+
+        # create finals by decade table
+        decade_content = [
+            html.Table([
+                html.Thead(
+                    html.Tr([
+                        html.Th('Decade'),
+                        html.Th('Finals'),
+                        html.Th('Goals'),
+                        html.Th('Goals per Final'),
+                        html.Th('Avg. Attendance')
+                    ])
+                ),
+                html.Tbody([
+                    html.Tr([
+                        html.Td(f"{row['Decade']}s"),
+                        html.Td(row['Finals']),
+                        html.Td(row['Goals']),
+                        html.Td(f"{row['GoalsPerFinal']:.2f}"),
+                        html.Td(f"{row['AvgAttendance']:,.0f}")
+                    ]) for row in stats['by_decade'].to_dict('records')
+                ])
+            ], style={'width': '100%', 'borderCollapse': 'collapse'})
         ]
 
-        return top_countries_content, tournament_facts_content
+        return top_countries_content, tournament_facts_content, decade_content
 
     except Exception as e:
         logger.error(f"Error updating historical summary: {str(e)}")
-        return html.Div("Error loading data"), html.Div("Error loading data")
+        return html.Div("Error loading data"), html.Div("Error loading data"), html.Div("Error loading data")
+
+
+current_layout = build_layout(data)
+
+
+def serve_layout():
+    return current_layout
+
+
+app.layout = serve_layout
+
+########################################################
+# Background refresh
+########################################################
+
+# build everything for a new snapshot off the request path, then publish it
+# with plain reference assignments; callbacks take a single reference to
+# `data` per call, so in-flight requests finish on the snapshot they started
+# with
+
+
+def swap_data(finals_df, nation_df, manifest):
+    global data, snapshot, static_payloads, current_layout
+
+    new_data = WorldCupData.build(finals_df, nation_df, manifest['version'])
+    new_static = StaticPayloads(
+        STATIC_DIR, new_data.version) if STATIC_DIR else None
+    new_layout = build_layout(new_data)
+    api_cache.get(new_data)
+
+    static_payloads = new_static
+    data = new_data
+    snapshot = manifest
+    current_layout = new_layout
+    logger.info(
+        f"Serving snapshot {manifest['version']} (source: {manifest['source']}). Finals shape: {finals_df.shape}, Nations shape: {nation_df.shape}")
+
+    if callback_responses:
+        callback_responses.purge(new_data.version)
+    if WARM_FIGURES:
+        figure_cache.warm(new_data)
+
+
+def touch_snapshot(manifest):
+    # a refresh found the same data; only the snapshot age changes
+    global snapshot
+    snapshot = manifest
+
+
+refresher = DataRefresher(data.version, swap_data, touch_snapshot)
+
+# the refresher thread is started per serving process (gunicorn starts it in
+# each worker after forking, see gunicorn.conf.py)
+
+
+def start_refresher():
+    return refresher.start()
+
+
+metrics.gauge('data_snapshot_age_seconds', 'Age of the served World Cup data snapshot',
+              lambda: [({'version': data.version}, time.time() - snapshot.get('created', 0))])
+metrics.gauge('data_refresh_last_success_timestamp_seconds',
+              'Unix time of the last successful data refresh check',
+              lambda: [({}, refresher.last_success)])
 
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8050))
     logger.info("Starting the Dash application...")
+    start_refresher()
     app.run_server(debug=False, host='0.0.0.0', port=port)
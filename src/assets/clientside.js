@@ -0,0 +1,149 @@
+// --------------------------------------------------
+// Clientside callbacks
+// update_map and update_stats (enabled with WC_CLIENTSIDE=1) mirror the
+// callbacks in app.py using the dataset shipped once in the 'data-store'
+// dcc.Store, so dropdown changes never hit the server.
+// The timeline callbacks always run here: 'timeline-store' holds one delta
+// per final (the countries whose totals changed) and every frame is rebuilt
+// from those once, then reused while the timeline plays or is scrubbed.
+// --------------------------------------------------
+
+(function () {
+    const html = (type, props) => ({type: type, namespace: 'dash_html_components', props: props});
+    const line = (text, color, extra) =>
+        html('P', {children: text, style: Object.assign({fontSize: '1.2em'}, color ? {color: color} : {}, extra || {})});
+    const card = (title, lines) => html('Div', {
+        children: [html('H4', {children: title, style: {color: '#2c3e50'}}), html('Div', {children: lines})],
+        style: {flex: '1', minWidth: '300px', padding: '15px', backgroundColor: '#f8f9fa', borderRadius: '5px'}
+    });
+    // python list repr, e.g. ['extra time', '(3–2 pen.)']
+    const pyList = (items) => '[' + items.map((i) => "'" + i + "'").join(', ') + ']';
+
+    // cumulative [wins, runner-ups] per country after each frame, for the
+    // data version currently in the store; frames are filled in on demand,
+    // each from the one before it plus its delta
+    let timeline = {version: null, states: []};
+    const timelineState = (store, index) => {
+        if (timeline.version !== store.version) {
+            timeline = {version: store.version, states: []};
+        }
+        const states = timeline.states;
+        for (let k = states.length; k <= index; k++) {
+            const state = k ? states[k - 1].slice() : store.countries.map(() => [0, 0]);
+            store.frames[k].changes.forEach(([i, wins, runnerUps]) => {
+                state[i] = [wins, runnerUps];
+            });
+            states.push(state);
+        }
+        return states[index];
+    };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        worldcup: {
+            update_map: function (selectedCountry, selectedYear, store) {
+                const figure = store.figure;
+                if (!selectedCountry && !selectedYear) {
+                    return figure;
+                }
+
+                let allowed = selectedCountry ? [selectedCountry] : Object.keys(store.countries);
+                if (selectedYear) {
+                    const inFinal = store.countries_by_year[String(selectedYear)] || [];
+                    allowed = allowed.filter((c) => inFinal.includes(c));
+                }
+                // the map locations are ISO Alpha-3 codes
+                allowed = allowed.filter((c) => store.countries[c]).map((c) => store.countries[c].ISO_Code);
+
+                // keep only the highlighted countries in every per-location array
+                const data = figure.data.map((trace) => {
+                    const keep = [];
+                    trace.locations.forEach((loc, i) => {
+                        if (allowed.includes(loc)) {
+                            keep.push(i);
+                        }
+                    });
+                    const size = trace.locations.length;
+                    const filtered = Object.assign({}, trace);
+                    Object.keys(trace).forEach((key) => {
+                        if (Array.isArray(trace[key]) && trace[key].length === size) {
+                            filtered[key] = keep.map((i) => trace[key][i]);
+                        }
+                    });
+                    return filtered;
+                });
+                return {data: data, layout: figure.layout};
+            },
+
+            update_stats: function (selectedCountry, selectedYear, store) {
+                if (!selectedCountry && !selectedYear) {
+                    return html('Div', {children: 'Select a country or year to view statistics'});
+                }
+
+                const components = [];
+                if (selectedCountry) {
+                    const stats = store.countries[selectedCountry];
+                    if (!stats) {
+                        return html('Div', {children: 'Error loading statistics'});
+                    }
+                    components.push(card(selectedCountry + ' Statistics', [
+                        line('Total World Cup Wins: ' + stats.Wins, '#27ae60'),
+                        line('Runner-up Appearances: ' + stats.RunnerUps, '#e74c3c'),
+                        line('Total Finals Appearances: ' + stats.TotalFinals, '#3498db'),
+                        line(stats.YearsWon.length ? 'Years Won: ' + stats.YearsWon.join(', ') : 'No wins yet'),
+                        line(stats.YearsRunnerUp.length ? 'Runner-up Years: ' + stats.YearsRunnerUp.join(', ')
+                            : 'No runner-up appearances')
+                    ]));
+                }
+
+                if (selectedYear) {
+                    const final = store.finals[String(selectedYear)];
+                    if (!final) {
+                        return html('Div', {children: 'Error loading statistics'});
+                    }
+                    components.push(card(selectedYear + ' World Cup Final', [
+                        line('Winner: ' + final.Winners, '#27ae60'),
+                        line('Runner-up: ' + final['Runners-up'], '#e74c3c'),
+                        line('Score: ' + final.CleanedScore, null, {fontWeight: 'bold'}),
+                        line('Venue: ' + final.Venue),
+                        line('Location: ' + final.Location),
+                        line('Attendance: ' + Number(final.Attendance).toLocaleString('en-US')),
+                        line('Notes: ' + (final.Notes.length ? pyList(final.Notes) : 'None'))
+                    ]));
+                }
+                return components;
+            },
+
+            timeline_play: function (clicks) {
+                const playing = (clicks || 0) % 2 === 1;
+                return [!playing, playing ? 'Pause' : 'Play'];
+            },
+
+            timeline_step: function (intervals, index, store) {
+                // loop back to the first final after the last one
+                return index === null || index === undefined || index >= store.frames.length - 1
+                    ? 0 : index + 1;
+            },
+
+            timeline_frame: function (index, store) {
+                if (!store || !store.frames.length) {
+                    return window.dash_clientside.no_update;
+                }
+                index = Math.min(Math.max(index || 0, 0), store.frames.length - 1);
+                const state = timelineState(store, index);
+                const frame = store.frames[index];
+                const trace = Object.assign({}, store.figure.data[0], {
+                    z: state.map(([wins, runnerUps]) => wins + runnerUps),
+                    customdata: state.map(([wins, runnerUps]) => [wins, runnerUps, wins + runnerUps])
+                });
+                const layout = Object.assign({}, store.figure.layout, {
+                    title: Object.assign({}, store.figure.layout.title, {
+                        text: 'FIFA World Cup Finals Appearances up to ' + frame.year +
+                            '<br><sup>' + frame.year + ' final: ' + frame.winner + ' beat ' +
+                            frame.runner_up + '</sup>'
+                    })
+                });
+                return {data: [trace].concat(store.figure.data.slice(1)), layout: layout};
+            }
+        }
+    });
+})();
@@ -0,0 +1,402 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    callback_cache.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Response cache for Dash callbacks. Finished /_dash-update-component
+# responses are stored as the serialized bytes Dash sent, keyed by the
+# callback output, its input values and the data version, so a hit is
+# answered before Dash dispatches the callback (no pandas work, no Plotly
+# JSON encoding). Backends:
+#
+#   memory   per-process LRU (entry and byte limits)
+#   sqlite   one SQLite file shared by every worker on the host
+#   redis    a Redis server shared by every host (needs the redis package)
+#
+# The shared backends sit behind a small per-process LRU.
+
+# import libraries
+from collections import OrderedDict
+import threading
+import logging
+import sqlite3
+import hashlib
+import time
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# redis is optional; without it the redis backend is unavailable
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# configuration (overridable through environment variables)
+CALLBACK_CACHE = os.environ.get('WC_CALLBACK_CACHE', 'memory').lower()
+CALLBACK_CACHE_SIZE = int(os.environ.get('WC_CALLBACK_CACHE_SIZE', 1024))
+CALLBACK_CACHE_BYTES = int(os.environ.get('WC_CALLBACK_CACHE_BYTES', 64 * 1024 * 1024))
+CALLBACK_CACHE_PATH = os.environ.get('WC_CALLBACK_CACHE_PATH', os.path.join(
+    os.environ.get('WC_CACHE_DIR', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'cache')), 'callbacks.sqlite'))
+CALLBACK_CACHE_TTL = int(os.environ.get('WC_CALLBACK_CACHE_TTL', 24 * 60 * 60))
+REDIS_URL = os.environ.get('WC_REDIS_URL', 'redis://localhost:6379/0')
+
+# responses larger than this are not cached at all
+MAX_ITEM_BYTES = 4 * 1024 * 1024
+
+UPDATE_PATH = '/_dash-update-component'
+
+########################################################
+# Backends
+########################################################
+
+# every backend stores bytes under a string key together with the data
+# version, and can drop everything that is not the current version
+
+
+class MemoryBackend:
+    name = 'memory'
+
+    def __init__(self, maxsize=CALLBACK_CACHE_SIZE, max_bytes=CALLBACK_CACHE_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, version):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._entries[key] = (version, value)
+            self.bytes += len(value)
+            while self._entries and (len(self._entries) > self.maxsize or
+                                     self.bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def purge(self, version):
+        with self._lock:
+            for key in [k for k, (v, _) in self._entries.items() if v != version]:
+                self.bytes -= len(self._entries.pop(key)[1])
+
+    def stats(self):
+        with self._lock:
+            return {'backend': self.name, 'size': len(self._entries), 'maxsize': self.maxsize,
+                    'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'evictions': self.evictions}
+
+# LRU by last access time, trimmed to max_bytes after writes. each thread
+# (and each forked worker) opens its own connection; WAL lets the workers
+# read while one of them writes
+
+
+class SQLiteBackend:
+    name = 'sqlite'
+
+    # only touch the access time of a hit this often, so hot keys do not
+    # turn every read into a write
+    TOUCH_INTERVAL = 60
+
+    # writes between recounts of the stored bytes, which pick up what the
+    # other workers wrote since
+    RECOUNT_INTERVAL = 256
+
+    def __init__(self, path=CALLBACK_CACHE_PATH, max_bytes=CALLBACK_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._bytes = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, '
+                       'version TEXT, value BLOB, size INTEGER, accessed REAL)')
+            db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def get(self, key):
+        db = self._connect()
+        row = db.execute('SELECT value, accessed FROM responses WHERE key = ?',
+                         (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.TOUCH_INTERVAL:
+            db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def _total(self, db):
+        return db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def set(self, key, value, version):
+        # the running byte total only counts this process's writes between
+        # recounts; it is checked against the table before anything is trimmed
+        db = self._connect()
+        old = db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                   (key, version, value, len(value), time.time()))
+        with self._lock:
+            self._writes += 1
+            if self._bytes is None or self._writes % self.RECOUNT_INTERVAL == 0:
+                self._bytes = self._total(db)
+            else:
+                self._bytes += len(value) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._bytes = self._total(db)
+                if self._bytes > self.max_bytes:
+                    self._bytes -= self._trim(db, self._bytes)
+
+    def _trim(self, db, total):
+        # drop the least recently used rows until we are back under 90%;
+        # returns the bytes freed
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        evicted = []
+        for key, size in db.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if freed >= target:
+                break
+            evicted.append((key,))
+            freed += size
+        db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self.evictions += len(evicted)
+        return freed
+
+    def purge(self, version):
+        self._connect().execute('DELETE FROM responses WHERE version != ?', (version,))
+        with self._lock:
+            self._bytes = None
+
+    def stats(self):
+        size, total = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {'backend': self.name, 'path': self.path, 'size': size, 'bytes': total,
+                'max_bytes': self.max_bytes, 'evictions': self.evictions}
+
+# entries expire after ttl; size limits and eviction are left to the server
+# (maxmemory with an allkeys-lru policy). versions are part of the key, so
+# purge has nothing to do
+
+
+class RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url=REDIS_URL, ttl=CALLBACK_CACHE_TTL, prefix='wc:callback:'):
+        if redis is None:
+            raise ImportError("the redis callback cache needs the 'redis' package")
+        self.url = url
+        self.ttl = ttl
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, version):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def purge(self, version):
+        pass
+
+    def stats(self):
+        info = self.client.info('memory')
+        return {'backend': self.name, 'url': self.url, 'ttl': self.ttl,
+                'bytes': info.get('used_memory'),
+                'max_bytes': info.get('maxmemory')}
+
+
+def make_backend(kind=CALLBACK_CACHE):
+    if kind == 'memory':
+        return MemoryBackend()
+    if kind == 'sqlite':
+        return SQLiteBackend()
+    if kind == 'redis':
+        return RedisBackend()
+    raise ValueError(f"Unknown callback cache backend '{kind}'")
+
+########################################################
+# Cache
+########################################################
+
+# callback key: output id, input/state values and data version (plus any
+# setting that changes the response shape, e.g. map patches)
+
+
+def callback_key(body, version, variant=''):
+    request = {
+        'output': body.get('output'),
+        'inputs': [(i.get('id'), i.get('property'), i.get('value'))
+                   for i in body.get('inputs', [])],
+        'state': [(s.get('id'), s.get('property'), s.get('value'))
+                  for s in body.get('state', [])],
+        'version': version,
+        'variant': variant
+    }
+    encoded = json.dumps(request, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CallbackCache:
+    def __init__(self, backend, local=None):
+        # a shared backend gets a small per-process LRU in front of it
+        self.backend = backend
+        self.local = local
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.local_hits += 1
+                return value
+
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # a shared cache that is down only costs the cache
+            value = None
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Callback cache read failed: {str(e)}")
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        if self.local is not None:
+            self.local.set(key, value, None)
+        return value
+
+    def set(self, key, value, version):
+        if len(value) > MAX_ITEM_BYTES:
+            return
+        if self.local is not None:
+            self.local.set(key, value, version)
+        try:
+            self.backend.set(key, value, version)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Callback cache write failed: {str(e)}")
+
+    def purge(self, version):
+        # drop responses for every other data version
+        for backend in (self.local, self.backend):
+            if backend is not None:
+                try:
+                    backend.purge(version)
+                except Exception as e:
+                    logger.warning(f"Callback cache purge failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {'hits': self.hits, 'local_hits': self.local_hits,
+                     'misses': self.misses, 'errors': self.errors,
+                     'hit_ratio': self.hits / total if total else 0.0}
+        try:
+            stats['backend'] = self.backend.stats()
+        except Exception as e:
+            stats['backend'] = {'backend': self.backend.name, 'error': str(e)}
+        if self.local is not None:
+            stats['local'] = self.local.stats()
+        return stats
+
+
+def make_cache(kind=CALLBACK_CACHE):
+    # None when the cache is turned off
+    if kind in ('off', 'none', '0', ''):
+        return None
+    try:
+        backend = make_backend(kind)
+    except ImportError as e:
+        logger.warning(f"{str(e)}, caching callback responses in memory instead")
+        kind, backend = 'memory', MemoryBackend()
+    local = MemoryBackend(maxsize=128, max_bytes=8 * 1024 * 1024) if kind != 'memory' else None
+    logger.info(f"Caching callback responses in {kind}")
+    return CallbackCache(backend, local)
+
+########################################################
+# Flask integration
+########################################################
+
+# answer cacheable callbacks from the cache before Dash dispatches them and
+# store the responses Dash produces for the misses. `outputs` are the
+# callback output ids to cache, get_version returns the served data version
+# and a callback can opt a response out with skip() (e.g. error fallbacks)
+
+
+def skip():
+    import flask
+    if flask.has_request_context():
+        flask.g.callback_cache_skip = True
+
+
+def init_app(server, cache, get_version, outputs, variant=''):
+    import flask
+
+    @server.before_request
+    def cached_callback():
+        request = flask.request
+        if request.method != 'POST' or not request.path.endswith(UPDATE_PATH):
+            return None
+        body = request.get_json(silent=True) or {}
+        if body.get('output') not in outputs:
+            return None
+
+        version = get_version()
+        key = callback_key(body, version, variant)
+        flask.g.callback_cache = (key, version)
+        value = cache.get(key)
+        if value is None:
+            return None
+        flask.g.callback_cache_hit = True
+        response = flask.Response(value, mimetype='application/json')
+        response.headers['X-Callback-Cache'] = 'hit'
+        return response
+
+    @server.after_request
+    def store_callback(response):
+        pending = getattr(flask.g, 'callback_cache', None)
+        if pending is None or getattr(flask.g, 'callback_cache_hit', False):
+            return response
+        response.headers['X-Callback-Cache'] = 'miss'
+        if (response.status_code == 200 and not response.direct_passthrough
+                and 'Content-Encoding' not in response.headers
+                and not getattr(flask.g, 'callback_cache_skip', False)):
+            cache.set(pending[0], response.get_data(), pending[1])
+        return response
+
+    return cache
@@ -0,0 +1,164 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    compact.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Compact read-only records for the serving path. Rows stay in Arrow arrays
+# (interned dictionary codes for country names, int16 years, int32
+# attendance, offsets + values for list columns), which are the memory-mapped
+# snapshot buffers when the data was read from the cache, so forked workers
+# share those pages. A record is a small view that reads its values on
+# access instead of one python object per cell held for the process
+# lifetime.
+
+# import libraries
+from collections.abc import Mapping
+import pyarrow as pa
+import numpy as np
+import sys
+
+# one row of a CompactTable; list values come back as tuples and missing
+# values as None
+
+
+class Record(Mapping):
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.getters[key](self._index)
+
+    def __iter__(self):
+        return iter(self._table.names)
+
+    def __len__(self):
+        return len(self._table.names)
+
+    def __repr__(self):
+        return f"Record({dict(self)})"
+
+
+def _strings(array):
+    # utf-8 slices straight out of the string buffers (no arrow scalars)
+    _, offsets, data = array.buffers()
+    offsets = memoryview(np.frombuffer(offsets, dtype=np.int32)[array.offset:array.offset + len(array) + 1])
+    data = memoryview(data) if data is not None else memoryview(b'')
+
+    def text(index):
+        return str(data[offsets[index]:offsets[index + 1]], 'utf-8')
+    return text
+
+
+def _getter(array):
+    # fast value lookup for one column: numpy views of the arrow buffers for
+    # numbers, dictionary codes into interned names, offsets into the values
+    # of list columns; anything else goes through arrow scalars
+    # memoryviews index straight to python ints (no numpy scalars)
+    nulls = memoryview(array.is_null().to_numpy(zero_copy_only=False)) if array.null_count else None
+
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+        values = memoryview(array.fill_null(0).to_numpy() if nulls is not None
+                            else array.to_numpy())
+
+        def get(index):
+            return values[index]
+    elif pa.types.is_dictionary(array.type):
+        codes = memoryview(array.indices.fill_null(0).to_numpy())
+        names = tuple(sys.intern(name) if isinstance(name, str) else name
+                      for name in array.dictionary.to_pylist())
+
+        def get(index):
+            return names[codes[index]]
+    elif pa.types.is_string(array.type):
+        text = _strings(array)
+
+        def get(index):
+            return text(index)
+    elif pa.types.is_list(array.type) and not array.values.null_count and (
+            pa.types.is_integer(array.type.value_type) or pa.types.is_string(array.type.value_type)):
+        offsets = memoryview(array.offsets.to_numpy())
+        if pa.types.is_string(array.type.value_type):
+            text = _strings(array.values)
+
+            def get(index):
+                return tuple(text(i) for i in range(offsets[index], offsets[index + 1]))
+        else:
+            values = memoryview(array.values.to_numpy())
+
+            def get(index):
+                return tuple(values[offsets[index]:offsets[index + 1]].tolist())
+    else:
+        def get(index):
+            value = array[index].as_py()
+            return tuple(value) if isinstance(value, list) else value
+
+    if nulls is None:
+        return get
+    return lambda index: None if nulls[index] else get(index)
+
+# columnar table of arrow arrays with a value getter per column
+
+
+class CompactTable:
+    def __init__(self, table):
+        self.names = tuple(table.column_names)
+        self.num_rows = table.num_rows
+        self._columns = {}
+        for name in self.names:
+            column = table.column(name)
+            # a single chunk (snapshot reads) is used as is, without a copy
+            self._columns[name] = (column.chunk(0) if column.num_chunks == 1
+                                   else pa.concat_arrays(column.chunks) if column.num_chunks
+                                   else pa.array([], type=column.type))
+        # one value lookup function per column, index -> value
+        self.getters = {name: _getter(array) for name, array in self._columns.items()}
+
+    @classmethod
+    def from_pandas(cls, df):
+        # arrow-backed columns are wrapped without copying; categoricals
+        # become dictionary arrays (codes + one copy of each name)
+        return cls(pa.Table.from_pandas(df, preserve_index=False))
+
+    def value(self, index, name):
+        return self.getters[name](index)
+
+    def column(self, name):
+        return self._columns[name]
+
+    def to_table(self):
+        # the columns as an arrow table again (no copy)
+        return pa.Table.from_arrays(list(self._columns.values()), names=list(self.names))
+
+    def row(self, index):
+        return Record(self, index)
+
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def __len__(self):
+        return self.num_rows
+
+# read-only mapping from keys to row views, given each key's row position
+
+
+class RecordIndex(Mapping):
+    def __init__(self, table, positions):
+        self._table = table
+        self._positions = dict(positions)
+
+    def __getitem__(self, key):
+        return self._table.row(self._positions[key])
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def position(self, key):
+        return self._positions[key]
@@ -0,0 +1,136 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    countries.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Country name -> ISO Alpha-3 resolution from a prebuilt alias table
+# (src/data/country_codes.csv), so the scraper and the map never search the
+# pycountry database at runtime.
+#
+#   python src/countries.py   # rebuild the alias table from pycountry
+
+# import libraries
+from functools import lru_cache
+import logging
+import csv
+import os
+
+logger = logging.getLogger(__name__)
+
+ALIASES_PATH = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), 'data', 'country_codes.csv')
+
+# teams listed under historical or football-only names, resolved to the
+# country the map shows them as
+HISTORICAL_NAMES = {
+    'West Germany': 'DEU',
+    'East Germany': 'DEU',
+    'Soviet Union': 'RUS',
+    'USSR': 'RUS',
+    'Czechoslovakia': 'CZE',
+    'Yugoslavia': 'SRB',
+    'Serbia and Montenegro': 'SRB',
+    'FR Yugoslavia': 'SRB',
+    'Dutch East Indies': 'IDN',
+    'Zaire': 'COD',
+    'England': 'GBR',
+    'Scotland': 'GBR',
+    'Wales': 'GBR',
+    'Northern Ireland': 'GBR',
+    'Republic of Ireland': 'IRL',
+    'South Korea': 'KOR',
+    'North Korea': 'PRK',
+    'Russia': 'RUS',
+    'Iran': 'IRN',
+    'Ivory Coast': 'CIV',
+    'United States': 'USA',
+    'Czech Republic': 'CZE',
+    'Turkey': 'TUR',
+    'Bolivia': 'BOL',
+    'Venezuela': 'VEN',
+    'Vietnam': 'VNM',
+    'Syria': 'SYR',
+    'Tanzania': 'TZA',
+    'Cape Verde': 'CPV',
+    'Holland': 'NLD',
+    'Korea Republic': 'KOR',
+    'Korea DPR': 'PRK',
+    'IR Iran': 'IRN',
+    'China PR': 'CHN',
+    'USA': 'USA'
+}
+
+
+def _key(name):
+    return ' '.join(str(name).split()).casefold()
+
+########################################################
+# Resolution
+########################################################
+
+# the alias table is read once per process
+
+
+@lru_cache(maxsize=1)
+def load_aliases(path=ALIASES_PATH):
+    with open(path, encoding='utf-8', newline='') as f:
+        aliases = {_key(row['Name']): row['ISO_Code'] for row in csv.DictReader(f)}
+    logger.info(f"Loaded {len(aliases)} country aliases from {path}")
+    return aliases
+
+# ISO Alpha-3 code for a country or team name (None if unknown)
+
+
+@lru_cache(maxsize=None)
+def iso3(name):
+    if name is None or name != name:
+        return None
+    code = load_aliases().get(_key(name))
+    if code is None:
+        logger.warning(f"No ISO Alpha-3 code for '{name}'")
+    return code
+
+# codes for a whole column, resolving each distinct name once
+
+
+def iso3_codes(names):
+    return names.map({name: iso3(name) for name in names.dropna().unique()})
+
+########################################################
+# Building the alias table
+########################################################
+
+# every pycountry name, official name, common name and code, plus the
+# historical names above (which win on conflicts)
+
+
+def build_aliases():
+    import pycountry
+
+    aliases = {}
+    for country in pycountry.countries:
+        for attr in ('name', 'official_name', 'common_name', 'alpha_2', 'alpha_3'):
+            value = getattr(country, attr, None)
+            if value:
+                aliases.setdefault(_key(value), (value, country.alpha_3))
+    for name, code in HISTORICAL_NAMES.items():
+        aliases[_key(name)] = (name, code)
+    return sorted(aliases.values(), key=lambda item: (item[1], item[0]))
+
+
+def write_aliases(path=ALIASES_PATH):
+    rows = build_aliases()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'ISO_Code'])
+        writer.writerows(rows)
+    load_aliases.cache_clear()
+    iso3.cache_clear()
+    return len(rows)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(f"Wrote {write_aliases()} aliases to {ALIASES_PATH}")
@@ -0,0 +1,169 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    datastore.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from derived import compute_derived_stats
+from countries import iso3_codes
+from compact import CompactTable, RecordIndex
+from matches import MatchCube, load_matches
+from storage import from_arrow
+import pandas as pd
+
+# the columns the map figure and patches are built from
+MAP_COLUMNS = ['Country', 'ISO_Code', 'Wins', 'RunnerUps', 'TotalFinals']
+
+# read-only view of the loaded data with lookup indexes built once at load
+# time, so callbacks never scan or copy the tables. records are views over
+# the arrow columns (see compact.py), not per-row python objects, and only
+# the arrow columns are kept: the DataFrames are derived from them when
+# something needs one (the api and timeline, once per data version)
+
+
+@dataclass(frozen=True)
+class WorldCupData:
+    version: str
+    finals_table: CompactTable
+    nation_table: CompactTable
+    matches_table: CompactTable
+    countries: tuple
+    years: tuple
+    by_country: RecordIndex
+    by_year: RecordIndex
+    by_iso: RecordIndex
+    positions_by_country: MappingProxyType
+    years_by_country: MappingProxyType
+    countries_by_year: MappingProxyType
+    stats: MappingProxyType
+    cube: MatchCube
+
+    @classmethod
+    def build(cls, finals_df, nation_df, version=None):
+        nation_df = nation_df.reset_index(drop=True)
+        finals_df = finals_df.reset_index(drop=True)
+
+        # the map matches countries by ISO Alpha-3 code; older snapshots
+        # without a code fall back to the alias table
+        nation_df = nation_df.assign(ISO_Code=nation_df['ISO_Code'].fillna(
+            iso3_codes(nation_df['Country'].astype(str))))
+
+        nation_table = CompactTable.from_pandas(nation_df)
+        finals_table = CompactTable.from_pandas(finals_df)
+
+        positions = {c: i for i, c in enumerate(nation_df['Country'].astype(str))}
+        year_positions = {int(y): i for i, y in enumerate(finals_df['Year'])}
+        iso_positions = {code: i for i, code in enumerate(nation_df['ISO_Code']) if code}
+        by_country = RecordIndex(nation_table, positions)
+
+        # appearances come from the nation table so renamed teams (England,
+        # West Germany, ...) resolve to the same names the map uses
+        years_by_country = {}
+        countries_by_year = {}
+        for name, r in by_country.items():
+            years = tuple(sorted(r['YearsWon'] + r['YearsRunnerUp']))
+            years_by_country[name] = years
+            for year in years:
+                countries_by_year.setdefault(year, []).append(name)
+
+        # match-level aggregates (country x year x stage), built once
+        matches = load_matches(finals_df)
+        cube = MatchCube.build(matches, nation_df)
+
+        return cls(
+            version=version,
+            finals_table=finals_table,
+            nation_table=nation_table,
+            matches_table=CompactTable.from_pandas(matches),
+            countries=tuple(positions),
+            years=tuple(sorted(year_positions)),
+            by_country=by_country,
+            by_year=RecordIndex(finals_table, year_positions),
+            by_iso=RecordIndex(nation_table, iso_positions),
+            positions_by_country=MappingProxyType(positions),
+            years_by_country=MappingProxyType(years_by_country),
+            countries_by_year=MappingProxyType(
+                {year: tuple(names) for year, names in countries_by_year.items()}),
+            stats=MappingProxyType(compute_derived_stats(finals_df, nation_df)),
+            cube=cube
+        )
+
+    @property
+    def finals_df(self):
+        return from_arrow(self.finals_table.to_table())
+
+    @property
+    def nation_df(self):
+        return from_arrow(self.nation_table.to_table())
+
+    @property
+    def matches(self):
+        return from_arrow(self.matches_table.to_table())
+
+    @cached_property
+    def map_df(self):
+        # one small row per nation, sliced on every map request: plain
+        # python strings are faster to take and list than arrow ones here
+        return from_arrow(self.nation_table.to_table().select(MAP_COLUMNS)).astype(
+            {'ISO_Code': object})
+
+    def country(self, name):
+        return self.by_country.get(name)
+
+    def final(self, year):
+        if year is None:
+            return None
+        return self.by_year.get(int(year))
+
+    def years_of(self, country):
+        # years the country played a final, () for unknown countries
+        return self.years_by_country.get(country, ())
+
+    def map_countries(self, selected_country=None, selected_year=None, stage='Final'):
+        # countries highlighted on the map for a selection (None means all),
+        # answered from the match cube
+        if not selected_country and not selected_year:
+            return None
+        countries = self.countries
+        if selected_country:
+            countries = (selected_country,) if selected_country in self.by_country else ()
+        if selected_year:
+            played = set(self.cube.countries_in(selected_year, stage))
+            countries = tuple(c for c in countries if c in played)
+        return countries
+
+    def map_rows(self, selected_country=None, selected_year=None):
+        countries = self.map_countries(selected_country, selected_year)
+        if countries is None:
+            return self.map_df
+        return self.map_df.take([self.positions_by_country[c] for c in countries])
+
+    def client_payload(self):
+        # compact, json-ready copy of the indexes for clientside callbacks
+        def plain(record, keys):
+            out = {}
+            for key in keys:
+                val = record[key]
+                if isinstance(val, tuple):
+                    val = list(val)
+                elif val is pd.NA:
+                    val = None
+                out[key] = val
+            return out
+
+        return {
+            'version': self.version,
+            'countries': {name: plain(r, ['ISO_Code', 'Wins', 'RunnerUps', 'TotalFinals',
+                                            'YearsWon', 'YearsRunnerUp'])
+                          for name, r in self.by_country.items()},
+            'finals': {str(year): plain(r, ['Winners', 'Runners-up', 'CleanedScore', 'Venue',
+                                             'Location', 'Attendance', 'Notes'])
+                       for year, r in self.by_year.items()},
+            'countries_by_year': {str(year): list(names)
+                                  for year, names in self.countries_by_year.items()}
+        }
@@ -0,0 +1,137 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    derived.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+import pyarrow.compute as pc
+import pyarrow as pa
+import pandas as pd
+import numpy as np
+
+# RE2 patterns for the arrow compute kernels
+# "4–2", "0–0", "3-3" (en dash or hyphen)
+SCORE_PATTERN = r'(?P<home>\d+)\s*[–-]\s*(?P<away>\d+)'
+# "(4–2 pen.)" after the score, footnote references like "[n 3]"
+PENALTY_PATTERN = r'\((?P<penalties>\d+[–-]\d+)\s*pen\.\)'
+FOOTNOTE_PATTERN = r'\[.*?\]'
+EXTRA_TIME = '(a.e.t.)'
+
+# host countries listed under historical names in 'Location'
+HOST_RENAMES = {'West Germany': 'Germany'}
+
+########################################################
+# Score columns
+########################################################
+
+# split the raw Wikipedia score ("0–0 (a.e.t.) (3–2 pen.)") into structured
+# columns with arrow compute kernels over the whole column (no per-row
+# python); the first number is the winner's goals as listed on Wikipedia,
+# and CleanedScore/Notes keep the shape the csv snapshot has always stored
+
+
+def parse_scores(score):
+    try:
+        text = pa.array(score, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        text = pa.array(score.astype(str).where(score.notna(), None), type=pa.string())
+
+    extra_time = pc.fill_null(pc.match_substring(text, EXTRA_TIME), False)
+    penalties = pc.struct_field(pc.extract_regex(text, PENALTY_PATTERN), [0])
+
+    cleaned = pc.replace_substring(text, EXTRA_TIME, '')
+    cleaned = pc.replace_substring_regex(cleaned, PENALTY_PATTERN, '')
+    cleaned = pc.utf8_trim_whitespace(pc.replace_substring_regex(cleaned, FOOTNOTE_PATTERN, ''))
+
+    goals = pc.extract_regex(cleaned, SCORE_PATTERN)
+
+    def strings(array):
+        return array.to_numpy(zero_copy_only=False).astype(object)
+
+    def goal_counts(index):
+        goal = pc.cast(pc.struct_field(goals, [index]), pa.int16())
+        return pd.arrays.IntegerArray(pc.fill_null(goal, 0).to_numpy(),
+                                      pc.is_null(goal).to_numpy(zero_copy_only=False))
+
+    return pd.DataFrame({
+        'CleanedScore': strings(cleaned),
+        'Notes': _notes(extra_time, penalties),
+        'HomeGoals': goal_counts(0),
+        'AwayGoals': goal_counts(1),
+        'ExtraTime': extra_time.to_numpy(zero_copy_only=False),
+        'PenaltyScore': strings(penalties)
+    }, index=score.index)
+
+# Notes as an arrow-backed list array: 'extra time' and/or "(4–2 pen.)" in
+# that order, taken row-major from an (extra time, penalties) matrix; rows
+# without notes are missing rather than empty lists, like the csv snapshot
+
+
+def _notes(extra_time, penalties):
+    pen_notes = pc.binary_join_element_wise('(', penalties, ' pen.)', '')
+    matrix = np.column_stack([
+        np.where(extra_time.to_numpy(zero_copy_only=False), 'extra time', None).astype(object),
+        pen_notes.to_numpy(zero_copy_only=False)])
+    present = matrix != None  # noqa: E711  (elementwise)
+    counts = present.sum(axis=1)
+    offsets = pa.array(np.concatenate(([0], np.cumsum(counts))).astype(np.int32))
+    lists = pa.ListArray.from_arrays(offsets, pa.array(matrix[present], type=pa.string()),
+                                     mask=pa.array(counts == 0))
+    return pd.arrays.ArrowExtensionArray(lists)
+
+# add the structured score columns plus totals used by the summary
+
+
+def add_score_columns(finals_df):
+    scores = parse_scores(finals_df['Score'])
+    return finals_df.assign(
+        HomeGoals=scores['HomeGoals'],
+        AwayGoals=scores['AwayGoals'],
+        TotalGoals=scores['HomeGoals'] + scores['AwayGoals'],
+        ExtraTime=scores['ExtraTime'],
+        PenaltyScore=scores['PenaltyScore'],
+        Penalties=scores['PenaltyScore'].notna()
+    )
+
+########################################################
+# Derived statistics
+########################################################
+
+# compute every aggregate the historical summary shows, once per data load
+
+
+def compute_derived_stats(finals_df, nation_df, top_n=5):
+    finals = add_score_columns(finals_df)
+
+    # host nation from "City, Country"
+    host = finals['Location'].astype(str).str.rsplit(
+        ',', n=1).str[-1].str.strip().replace(HOST_RENAMES)
+    host_wins = finals.loc[finals['Winners'].astype(
+        str) == host, 'Year'].astype(int).tolist()
+
+    # per-decade goals and attendance
+    decades = finals.assign(Decade=(finals['Year'].astype(int) // 10) * 10)
+    by_decade = decades.groupby('Decade').agg(
+        Finals=('Year', 'size'),
+        Goals=('TotalGoals', 'sum'),
+        AvgAttendance=('Attendance', 'mean')
+    ).reset_index()
+    by_decade['GoalsPerFinal'] = by_decade['Goals'] / by_decade['Finals']
+
+    attendance = finals['Attendance'].astype('Float64')
+    top_attendance = finals.loc[attendance.idxmax()]
+
+    return {
+        'top_countries': nation_df.nlargest(top_n, 'Wins')[['Country', 'Wins', 'RunnerUps']].reset_index(drop=True),
+        'total_finals': len(finals),
+        'total_countries': len(nation_df),
+        'avg_goals': float(finals['TotalGoals'].mean()),
+        'extra_time_finals': int(finals['ExtraTime'].sum()),
+        'penalty_finals': int(finals['Penalties'].sum()),
+        'host_wins': host_wins,
+        'by_decade': by_decade,
+        'avg_attendance': float(attendance.mean()),
+        'highest_attendance': (int(top_attendance['Year']), int(top_attendance['Attendance']))
+    }
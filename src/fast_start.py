@@ -0,0 +1,121 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    fast_start.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Fast-startup entry point. Only the standard library is imported up front,
+# so the server can bind its port right away; dash, plotly, pandas and the
+# data are loaded by importing app.py on a background thread. Until that
+# finishes /healthz answers 200, /readyz answers 503 and every other path
+# gets a small self-refreshing loading page.
+#
+#   WC_FAST_START=1 gunicorn --config gunicorn.conf.py
+#   python src/fast_start.py
+
+# import libraries
+import threading
+import logging
+import time
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+LOADING_PAGE = b'''<!DOCTYPE html>
+<html>
+    <head>
+        <meta charset="utf-8">
+        <meta http-equiv="refresh" content="2">
+        <title>FIFA World Cup Dashboard</title>
+        <style>
+            body { font-family: sans-serif; color: #2c3e50; text-align: center; margin-top: 20vh; }
+        </style>
+    </head>
+    <body>
+        <h1>FIFA World Cup Dashboard</h1>
+        <p>Loading the World Cup data, this page will refresh automatically&hellip;</p>
+    </body>
+</html>
+'''
+
+# WSGI application that hands requests to the Dash server once app.py has
+# been imported, and answers with the loading state until then
+
+
+class LazyApp:
+    def __init__(self, module='app'):
+        self.module = module
+        self.server = None
+        self.error = None
+        self.started = None
+        self.loaded = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            app = __import__(self.module)
+            app.start_refresher()
+            self.server = app.server
+            self.loaded = time.perf_counter() - start
+            logger.info(f"Dashboard loaded in {self.loaded:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Error loading the dashboard: {str(e)}")
+
+    def start(self):
+        # threads do not survive fork, so a forked worker starts its own load
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.started = time.time()
+                threading.Thread(target=self._load, name='app-loader',
+                                 daemon=True).start()
+
+    def _respond(self, start_response, status, body, content_type, headers=()):
+        start_response(status, [('Content-Type', content_type),
+                                ('Content-Length', str(len(body))),
+                                ('Cache-Control', 'no-store'), *headers])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        server = self.server
+        if server is not None:
+            return server(environ, start_response)
+
+        self.start()
+        path = environ.get('PATH_INFO', '/')
+        if path == '/healthz':
+            return self._respond(start_response, '200 OK',
+                                 json.dumps({'status': 'ok'}).encode(), 'application/json')
+
+        status = '500 Internal Server Error' if self.error else '503 Service Unavailable'
+        if path == '/readyz':
+            body = {'status': 'error' if self.error else 'loading',
+                    'error': self.error,
+                    'loading_for': time.time() - self.started}
+            return self._respond(start_response, status, json.dumps(body).encode(),
+                                 'application/json', [('Retry-After', '2')])
+        return self._respond(start_response, status, LOADING_PAGE,
+                             'text/html; charset=utf-8', [('Retry-After', '2')])
+
+
+application = LazyApp()
+
+
+if __name__ == '__main__':
+    from wsgiref.simple_server import make_server, WSGIServer
+    from socketserver import ThreadingMixIn
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    logging.basicConfig(level=logging.INFO)
+    port = int(os.environ.get('PORT', 8050))
+    application.start()
+    with make_server('0.0.0.0', port, application, ThreadingWSGIServer) as httpd:
+        logger.info(f"Serving on port {port}")
+        httpd.serve_forever()
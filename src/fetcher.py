@@ -0,0 +1,233 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    fetcher.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# HTTP fetch layer for the Wikipedia pages. One pooled requests.Session is
+# shared by a small thread pool, every response is kept in an on-disk page
+# cache with its ETag/Last-Modified validators so an unchanged page costs a
+# 304, and transient failures (connection errors, timeouts, 429/5xx) are
+# retried a bounded number of times with exponential backoff.
+#
+#   python src/fetcher.py --years 2018 2022 --top-scorers
+#   WC_WIKIPEDIA_BASE=http://127.0.0.1:8765/wiki/ python src/fetcher.py
+
+# import libraries
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+import requests
+import metrics
+import threading
+import logging
+import hashlib
+import time
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# configuration (overridable through environment variables); point
+# WC_WIKIPEDIA_BASE at a local fixture server to run without the network
+WIKIPEDIA_BASE = os.environ.get('WC_WIKIPEDIA_BASE', 'https://en.wikipedia.org/wiki/')
+FETCH_WORKERS = int(os.environ.get('WC_FETCH_WORKERS', 4))
+FETCH_TIMEOUT = float(os.environ.get('WC_FETCH_TIMEOUT', 30))
+FETCH_RETRIES = int(os.environ.get('WC_FETCH_RETRIES', 3))
+FETCH_BACKOFF = float(os.environ.get('WC_FETCH_BACKOFF', 0.5))
+
+USER_AGENT = "FIFA-World-Cup-Dashboard/1.0 (https://github.com/zakirangwala/FIFA-World-Cup-Dashboard)"
+
+# statuses worth another attempt; anything else fails straight away
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+FINALS_PAGE = 'List_of_FIFA_World_Cup_finals'
+TOP_SCORERS_PAGE = 'FIFA_World_Cup_top_goalscorers'
+
+FETCH_SECONDS = metrics.histogram(
+    'http_fetch_duration_seconds', 'Time spent fetching pages, including retries')
+
+
+def page_url(title, base=WIKIPEDIA_BASE):
+    return base + title
+
+
+def tournament_page(year):
+    return f"{year}_FIFA_World_Cup"
+
+
+class RetryableStatus(requests.HTTPError):
+    pass
+
+# one fetched page; not_modified means the body came from the page cache
+# after the server answered 304
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    content: bytes
+    etag: str = None
+    last_modified: str = None
+    not_modified: bool = False
+    attempts: int = 1
+    elapsed: float = 0.0
+
+########################################################
+# Page cache
+########################################################
+
+# raw bodies plus their validators, one pair of files per url
+
+
+class PageCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+        base = os.path.join(self.directory, key)
+        return base + '.html', base + '.json'
+
+    def get(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, content, etag, last_modified):
+        body_path, meta_path = self._paths(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                'fetched': time.time()}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # body first, so a validator never points at a missing body
+            for path, data, mode in ((body_path, content, 'wb'),
+                                     (meta_path, json.dumps(meta), 'w')):
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {str(e)}")
+
+########################################################
+# Fetching
+########################################################
+
+
+def make_session(pool_size=FETCH_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class Fetcher:
+    def __init__(self, cache_dir=None, workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT,
+                 retries=FETCH_RETRIES, backoff=FETCH_BACKOFF, session=None):
+        self.cache = PageCache(cache_dir) if cache_dir else None
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or make_session(workers)
+
+    def _get(self, url, headers):
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableStatus(f"{response.status_code} from {url}", response=response)
+        response.raise_for_status()
+        return response
+
+    def fetch(self, url):
+        # conditional GET when the page cache has validators for this url
+        start = time.perf_counter()
+        meta, cached = self.cache.get(url) if self.cache else (None, None)
+        headers = {}
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        retrying = Retrying(
+            stop=stop_after_attempt(max(self.retries, 1)),
+            wait=wait_exponential(multiplier=self.backoff, max=30),
+            retry=retry_if_exception_type(
+                (requests.ConnectionError, requests.Timeout, RetryableStatus)),
+            reraise=True)
+        try:
+            response = retrying(self._get, url, headers)
+        except Exception:
+            FETCH_SECONDS.observe(time.perf_counter() - start, status='error')
+            raise
+        attempts = retrying.statistics.get('attempt_number', 1)
+        elapsed = time.perf_counter() - start
+        FETCH_SECONDS.observe(elapsed, status=str(response.status_code))
+
+        if response.status_code == 304:
+            return FetchResult(url, 304, cached, meta.get('etag'), meta.get('last_modified'),
+                               not_modified=True, attempts=attempts, elapsed=elapsed)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if self.cache:
+            self.cache.put(url, response.content, etag, last_modified)
+        return FetchResult(url, response.status_code, response.content, etag, last_modified,
+                           attempts=attempts, elapsed=elapsed)
+
+    def fetch_all(self, urls):
+        # fetch urls concurrently; returns ({url: FetchResult}, {url: error})
+        # so one failing page does not lose the others
+        results, errors = {}, {}
+        if not urls:
+            return results, errors
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls)),
+                                thread_name_prefix='fetch') as pool:
+            futures = {url: pool.submit(self.fetch, url) for url in urls}
+            for url, future in futures.items():
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    errors[url] = e
+                    logger.error(f"Error fetching {url}: {str(e)}")
+        return results, errors
+
+
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(
+        description='Fetch the Wikipedia pages concurrently (conditional requests)')
+    parser.add_argument('--years', type=int, nargs='*', default=[],
+                        help='tournament pages to fetch as well')
+    parser.add_argument('--top-scorers', action='store_true',
+                        help='fetch the top goalscorers page as well')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'wc_pages'),
+                        help='page cache directory (run twice to see 304s)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    titles = [FINALS_PAGE] + [tournament_page(year) for year in args.years]
+    if args.top_scorers:
+        titles.append(TOP_SCORERS_PAGE)
+
+    start = time.perf_counter()
+    results, errors = Fetcher(args.cache_dir).fetch_all([page_url(title) for title in titles])
+    for url, result in results.items():
+        print(f"{result.status}  {len(result.content):>9,} B  {result.elapsed * 1000:>7.0f}ms  "
+              f"attempts={result.attempts}  {url}")
+    for url, error in errors.items():
+        print(f"ERR  {str(error)}  {url}")
+    print(f"{len(results)} fetched, {len(errors)} failed in {time.perf_counter() - start:.2f}s")
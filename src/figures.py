@@ -0,0 +1,174 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    figures.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from collections import OrderedDict
+import plotly.express as px
+import numpy as np
+import dash
+import threading
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# configuration (overridable through environment variables)
+FIGURE_CACHE_SIZE = int(os.environ.get('WC_FIGURE_CACHE_SIZE', 512))
+WARM_FIGURES = os.environ.get(
+    'WC_WARM_FIGURES', '0').lower() in ('1', 'true', 'yes')
+MAP_PATCH = os.environ.get('WC_MAP_PATCH', '1').lower() in ('1', 'true', 'yes')
+
+# build the choropleth figure for a selection
+
+
+def build_map_figure(data, selected_country=None, selected_year=None):
+    # choropleth data for the selection (hover text is precomputed)
+    map_data = data.map_rows(selected_country, selected_year)
+
+    fig = px.choropleth(
+        map_data,
+        locations='ISO_Code',
+        locationmode='ISO-3',
+        color='TotalFinals',
+        color_continuous_scale=[
+            [0, 'lightgrey'],     # For countries with no appearances
+            [0.2, '#ffffcc'],     # Light yellow for few appearances
+            [0.4, '#a1dab4'],     # Light green
+            [0.6, '#41b6c4'],     # Turquoise
+            [0.8, '#2c7fb8'],     # Blue
+            [1.0, '#253494']      # Dark blue for most appearances
+        ],
+        scope='world',
+        hover_name='Country',
+        custom_data=['Wins', 'RunnerUps', 'TotalFinals']
+    )
+
+    fig.update_layout(
+        title={
+            'text': 'FIFA World Cup Final Appearances by Country (1930-2022)',
+            'y': 0.95,
+            'x': 0.5,
+            'xanchor': 'center',
+            'yanchor': 'top',
+            'font': {'size': 24}
+        },
+        geo=dict(
+            showframe=False,
+            showcoastlines=True,
+            projection_type='equirectangular',
+            showland=True,
+            landcolor='lightgray',
+            showocean=True,
+            oceancolor='aliceblue'
+        ),
+        coloraxis_colorbar=dict(
+            title='Finals Appearances',
+            ticksuffix='',
+            len=0.75,
+            title_font={'size': 14},
+            tickfont={'size': 12}
+        ),
+        margin=dict(l=0, r=0, t=50, b=0)
+    )
+
+    # update hover template to show country first and avoid duplicates
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br><br>" +
+        "World Cup Wins: %{customdata[0]}<br>" +
+        "Runner-up Appearances: %{customdata[1]}<br>" +
+        "Total Finals: %{customdata[2]}" +
+        "<extra></extra>"
+    )
+
+    return fig
+
+# partial update for the map: the base figure (every country) is sent once
+# in the layout and selections only replace the per-location arrays
+
+
+def build_map_patch(data, selected_country=None, selected_year=None):
+    map_data = data.map_rows(selected_country, selected_year)
+
+    patch = dash.Patch()
+    patch['data'][0]['locations'] = map_data['ISO_Code'].tolist()
+    patch['data'][0]['hovertext'] = map_data['Country'].tolist()
+    patch['data'][0]['z'] = map_data['TotalFinals'].tolist()
+    patch['data'][0]['customdata'] = np.column_stack(
+        [map_data[col].to_numpy() for col in ('Wins', 'RunnerUps', 'TotalFinals')]).tolist()
+    return patch
+
+# bounded LRU cache of serialized map figures, keyed by (country, year) and
+# tied to the data snapshot version
+
+
+class FigureCache:
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        # a new data snapshot invalidates every cached figure
+        if version != self.version:
+            self._figures.clear()
+            self.version = version
+
+    def get_json(self, data, selected_country=None, selected_year=None):
+        key = (selected_country, None if selected_year is None else int(selected_year))
+
+        with self._lock:
+            self._check_version(data.version)
+            fig_json = self._figures.get(key)
+            if fig_json is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig_json
+            self.misses += 1
+
+        # build outside the lock so other selections are not blocked
+        fig_json = build_map_figure(data, *key).to_json()
+
+        with self._lock:
+            if data.version == self.version:
+                self._figures[key] = fig_json
+                self._figures.move_to_end(key)
+                while len(self._figures) > self.maxsize:
+                    self._figures.popitem(last=False)
+                    self.evictions += 1
+        return fig_json
+
+    def get(self, data, selected_country=None, selected_year=None):
+        return json.loads(self.get_json(data, selected_country, selected_year))
+
+    def warm(self, data):
+        # build every (country, year) combination, including the empty ones
+        for country in (None,) + data.countries:
+            for year in (None,) + data.years:
+                self.get_json(data, country, year)
+        logger.info(f"Warmed figure cache with {len(self._figures)} figures")
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._figures),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
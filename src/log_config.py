@@ -0,0 +1,135 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    log_config.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Non-blocking logging: every logger hands its records to a QueueHandler and
+# a QueueListener thread does the formatting and the file/console writes, so
+# disk I/O never sits on the request path.
+#
+# Size-based rotation is only safe with a single process writing the file.
+# Forked workers (and WC_LOG_ROTATION=external) append through a
+# WatchedFileHandler instead, which reopens the file after an external tool
+# such as logrotate has rotated it.
+
+# import libraries
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+import threading
+import logging
+import atexit
+import queue
+import sys
+import os
+
+# configuration (overridable through environment variables)
+LOG_DIR = os.environ.get('WC_LOG_DIR', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'logs'))
+LOG_LEVEL = os.environ.get('WC_LOG_LEVEL', 'WARNING').upper()
+LOG_MAX_BYTES = int(os.environ.get('WC_LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.environ.get('WC_LOG_BACKUPS', 5))
+# 'size' rotates at LOG_MAX_BYTES (single process), 'external' leaves
+# rotation to another tool (gunicorn.conf.py picks this for its workers)
+LOG_ROTATION = os.environ.get('WC_LOG_ROTATION', 'size').lower()
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# per-module levels; WC_LOG_LEVELS overrides them, e.g. "scraper=DEBUG,app=WARNING"
+DEFAULT_LEVELS = {
+    'scraper': 'WARNING',
+    'snapshot': 'INFO',
+    'figures': 'INFO',
+    'refresher': 'INFO',
+    'app': 'INFO'
+}
+
+_listener = None
+_log_path = None
+_lock = threading.Lock()
+
+
+def parse_levels(spec):
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _file_handler(path, rotation):
+    if rotation == 'size':
+        return RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                   encoding='utf-8')
+    return WatchedFileHandler(path, encoding='utf-8')
+
+# a fresh queue, writer thread and handlers, with the root logger feeding
+# the queue
+
+
+def _start_listener(path, rotation):
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if path is not None:
+        try:
+            handlers.append(_file_handler(path, rotation))
+        except OSError as e:
+            print(f"Could not open log file {path}: {str(e)}", file=sys.stderr)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(records))
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _after_fork():
+    # a forked worker inherits the queue but not the writer thread; it gets
+    # a listener of its own, and never rotates the file it shares with the
+    # other processes
+    global _listener
+    if _listener is None:
+        return
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+    _listener = _start_listener(_log_path, 'external')
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+# route all logging through a queue to one background writer; safe to call
+# more than once (later calls only update the levels)
+
+
+def setup_logging(log_file='app.log', levels=None, log_dir=LOG_DIR):
+    global _listener, _log_path
+
+    levels = {**DEFAULT_LEVELS, **(levels or {}),
+              **parse_levels(os.environ.get('WC_LOG_LEVELS'))}
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            _log_path = os.path.join(log_dir, log_file)
+        except OSError as e:
+            print(f"Could not open log file in {log_dir}: {str(e)}", file=sys.stderr)
+
+        _listener = _start_listener(_log_path, LOG_ROTATION)
+        logging.getLogger().setLevel(LOG_LEVEL)
+        atexit.register(_stop_listener)
+        os.register_at_fork(after_in_child=_after_fork)
+        return _listener
@@ -0,0 +1,190 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    matches.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Match-level data engine. Matches (the finals table, plus any match table
+# at WC_MATCHES_PATH) are turned into one row per team per match and
+# aggregated once at load time into a dense country x year x stage cube, so
+# any filter combination is answered by slicing NumPy arrays instead of
+# filtering DataFrames per request.
+#
+# Match tables are csv files with the columns
+#   Year, Stage, Team1, Team2, Goals1, Goals2[, ExtraTime, Penalties1, Penalties2]
+
+# import libraries
+from countries import iso3_codes
+from derived import parse_scores
+import pandas as pd
+import numpy as np
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MATCHES_PATH = os.environ.get('WC_MATCHES_PATH')
+
+# known stages in tournament order; anything else is appended after them
+STAGES = ('Group stage', 'Second group stage', 'Round of 16', 'Quarter-finals',
+          'Semi-finals', 'Third place', 'Final')
+
+METRICS = ('matches', 'wins', 'draws', 'losses', 'goals_for', 'goals_against')
+
+MATCH_COLUMNS = ['Year', 'Stage', 'Team1', 'Team2', 'Goals1', 'Goals2',
+                 'ExtraTime', 'Penalties1', 'Penalties2']
+
+########################################################
+# Match tables
+########################################################
+
+# the finals as matches; Wikipedia lists the winner first, including the
+# penalty score of shoot-outs
+
+
+def matches_from_finals(finals_df):
+    scores = parse_scores(finals_df['Score'])
+    penalties = scores['PenaltyScore'].str.extract(r'(\d+)\s*[–-]\s*(\d+)')
+    return pd.DataFrame({
+        'Year': finals_df['Year'].astype(int).to_numpy(),
+        'Stage': 'Final',
+        'Team1': finals_df['Winners'].astype(str).to_numpy(),
+        'Team2': finals_df['Runners-up'].astype(str).to_numpy(),
+        'Goals1': scores['HomeGoals'].to_numpy(),
+        'Goals2': scores['AwayGoals'].to_numpy(),
+        'ExtraTime': scores['ExtraTime'].to_numpy(),
+        'Penalties1': pd.to_numeric(penalties[0]).astype('Int16').to_numpy(),
+        'Penalties2': pd.to_numeric(penalties[1]).astype('Int16').to_numpy()
+    })
+
+
+def read_matches(path):
+    matches = pd.read_csv(path)
+    for col in ('ExtraTime', 'Penalties1', 'Penalties2'):
+        if col not in matches.columns:
+            matches[col] = False if col == 'ExtraTime' else pd.NA
+    matches['ExtraTime'] = matches['ExtraTime'].fillna(False).astype(bool)
+    for col in ('Goals1', 'Goals2', 'Penalties1', 'Penalties2'):
+        matches[col] = pd.to_numeric(matches[col], errors='coerce').astype('Int16')
+    return matches[MATCH_COLUMNS]
+
+# every match we know about; finals from the scraped table win over the same
+# final in an extra match table
+
+
+def load_matches(finals_df, path=MATCHES_PATH):
+    matches = matches_from_finals(finals_df)
+    if path:
+        extra = read_matches(path)
+        extra = extra[~((extra['Stage'] == 'Final') & extra['Year'].isin(matches['Year']))]
+        matches = pd.concat([matches, extra], ignore_index=True)
+        logger.info(f"Loaded {len(extra)} matches from {path}")
+    return matches
+
+# teams play under historical names (England, West Germany, ...); resolve
+# them through their ISO code to the names the nation table uses
+
+
+def team_names(teams, nation_df):
+    by_iso = dict(zip(nation_df['ISO_Code'], nation_df['Country'].astype(str)))
+    codes = iso3_codes(teams)
+    return codes.map(by_iso).fillna(teams)
+
+# one row per team per match with the result from that team's side
+
+
+def team_rows(matches, nation_df=None):
+    goals1 = matches['Goals1'].astype('float64').fillna(0).to_numpy()
+    goals2 = matches['Goals2'].astype('float64').fillna(0).to_numpy()
+    pens1 = matches['Penalties1'].astype('float64').fillna(-1).to_numpy()
+    pens2 = matches['Penalties2'].astype('float64').fillna(-1).to_numpy()
+
+    # +1 team1 won, -1 team2 won, 0 draw (shoot-outs decide drawn matches)
+    outcome = np.sign(goals1 - goals2)
+    outcome = np.where(outcome == 0, np.sign(pens1 - pens2), outcome)
+
+    teams1 = matches['Team1'].astype(str)
+    teams2 = matches['Team2'].astype(str)
+    if nation_df is not None:
+        teams1, teams2 = team_names(teams1, nation_df), team_names(teams2, nation_df)
+
+    return pd.DataFrame({
+        'Country': np.concatenate([teams1.to_numpy(), teams2.to_numpy()]),
+        'Year': np.concatenate([matches['Year'].to_numpy()] * 2).astype(int),
+        'Stage': np.concatenate([matches['Stage'].astype(str).to_numpy()] * 2),
+        'GoalsFor': np.concatenate([goals1, goals2]),
+        'GoalsAgainst': np.concatenate([goals2, goals1]),
+        'Outcome': np.concatenate([outcome, -outcome])
+    })
+
+########################################################
+# Aggregation cube
+########################################################
+
+# dense country x year x stage x metric array with axis lookups; slicing
+# with None means "all" along that axis
+
+
+class MatchCube:
+    def __init__(self, countries, years, stages, values):
+        self.countries = tuple(countries)
+        self.years = tuple(years)
+        self.stages = tuple(stages)
+        self.values = values
+        self.values.flags.writeable = False
+        self._country_index = {c: i for i, c in enumerate(self.countries)}
+        self._year_index = {y: i for i, y in enumerate(self.years)}
+        self._stage_index = {s: i for i, s in enumerate(self.stages)}
+
+    @classmethod
+    def build(cls, matches, nation_df=None):
+        rows = team_rows(matches, nation_df)
+
+        countries = pd.Categorical(rows['Country'])
+        years = pd.Categorical(rows['Year'])
+        present = set(rows['Stage'])
+        stages = pd.Categorical(rows['Stage'], categories=[s for s in STAGES if s in present] +
+                                sorted(present - set(STAGES)))
+
+        metrics = np.column_stack([
+            np.ones(len(rows)),
+            rows['Outcome'] > 0,
+            rows['Outcome'] == 0,
+            rows['Outcome'] < 0,
+            rows['GoalsFor'],
+            rows['GoalsAgainst']
+        ]).astype(np.int32)
+
+        values = np.zeros((len(countries.categories), len(years.categories),
+                           len(stages.categories), len(METRICS)), dtype=np.int32)
+        np.add.at(values, (countries.codes, years.codes, stages.codes), metrics)
+        return cls(countries.categories, [int(y) for y in years.categories],
+                   stages.categories, values)
+
+    def _index(self, lookup, key):
+        # None -> whole axis, unknown key -> empty selection
+        if key is None:
+            return slice(None)
+        index = lookup.get(key)
+        return slice(index, index + 1) if index is not None else slice(0, 0)
+
+    def select(self, country=None, year=None, stage=None):
+        return self.values[self._index(self._country_index, country),
+                           self._index(self._year_index, None if year is None else int(year)),
+                           self._index(self._stage_index, stage)]
+
+    def totals(self, country=None, year=None, stage=None):
+        sums = self.select(country, year, stage).sum(axis=(0, 1, 2))
+        return dict(zip(METRICS, (int(v) for v in sums)))
+
+    def by_country(self, year=None, stage=None):
+        # per-country totals for a year/stage filter, teams that played only
+        sums = self.select(None, year, stage).sum(axis=(1, 2))
+        played = sums[:, 0] > 0
+        return pd.DataFrame(sums[played], columns=METRICS,
+                            index=pd.Index(np.asarray(self.countries)[played], name='Country'))
+
+    def countries_in(self, year=None, stage=None):
+        sums = self.select(None, year, stage)[..., 0].sum(axis=(1, 2))
+        return tuple(c for c, n in zip(self.countries, sums) if n > 0)
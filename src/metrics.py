@@ -0,0 +1,497 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    metrics.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from contextlib import contextmanager
+from functools import wraps
+import itertools
+import threading
+import secrets
+import fcntl
+import logging
+import bisect
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# latency buckets in seconds, payload buckets in bytes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (128, 256, 512, 1024, 4096, 16384,
+                65536, 262144, 1048576, 4194304)
+
+# multi-process mode: with WC_METRICS_DIR set (gunicorn.conf.py sets it for
+# its workers) every process writes its histograms and gauge readings to
+# <dir>/<pid>-<token>.json about once a second, and /metrics merges the files
+# of all processes. the random token keeps a new worker that reuses a pid
+# from overwriting the dead worker's file; the histograms of exited workers
+# are folded into <dir>/aggregate.json, so counters never go backwards and
+# the directory does not grow with recycled workers. gauges are reported per
+# live worker with a `worker` label
+METRICS_DIR = os.environ.get('WC_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('WC_METRICS_FLUSH_INTERVAL', 1))
+
+AGGREGATE_FILE = 'aggregate.json'
+LOCK_FILE = '.lock'
+
+########################################################
+# Metric types
+########################################################
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(val)}"'
+                          for key, val in sorted(labels.items())) + '}'
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(series, counts=list(series['counts']))
+                    for key, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def render(self, merged=None):
+        # merged: series summed over every process (multi-process mode)
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_by_key = self._series if merged is None else merged
+            for key, series in sorted(series_by_key.items()):
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), series['counts']):
+                    cumulative += count
+                    lines.append(
+                        f"{self.name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(
+                    f"{self.name}_sum{_labels(labels)} {series['sum']}")
+                lines.append(
+                    f"{self.name}_count{_labels(labels)} {series['count']}")
+        return lines
+
+
+class Gauge:
+    # gauges are read from a callback at scrape time, e.g. cache statistics
+    def __init__(self, name, help_text, collect):
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+
+    def values(self):
+        try:
+            return list(self.collect())
+        except Exception as e:
+            logger.warning(f"Could not collect {self.name}: {str(e)}")
+            return []
+
+    def render(self, values=None):
+        # values: (labels, value) pairs of every live process (multi-process
+        # mode), otherwise this process's own readings
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} gauge"]
+        for labels, value in self.values() if values is None else values:
+            lines.append(f"{self.name}{_labels(labels)} {value}")
+        return lines
+
+########################################################
+# Registry
+########################################################
+
+
+_metrics = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def histogram(name, help_text, buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help_text, buckets))
+
+
+def gauge(name, help_text, collect):
+    # re-registering replaces the collector (e.g. after a data reload)
+    with _registry_lock:
+        _metrics[name] = Gauge(name, help_text, collect)
+        return _metrics[name]
+
+
+def render_metrics():
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    if METRICS_DIR:
+        return _render_processes(metrics)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+########################################################
+# Multi-process mode
+########################################################
+
+
+def _process_state(gauges=True):
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    state = {'pid': os.getpid(), 'histograms': {}, 'gauges': {}}
+    for metric in metrics:
+        if isinstance(metric, Histogram):
+            state['histograms'][metric.name] = [
+                [list(key), series['counts'], series['sum'], series['count']]
+                for key, series in metric.snapshot().items()]
+        elif gauges:
+            state['gauges'][metric.name] = [[labels, value] for labels, value in metric.values()]
+    return state
+
+# this process's state file name: pid plus a token drawn once per process
+# (a forked child draws its own)
+
+
+_state_name = None
+_state_pid = None
+
+
+def _state_file():
+    global _state_name, _state_pid
+    if _state_pid != os.getpid():
+        _state_pid = os.getpid()
+        _state_name = f"{_state_pid}-{secrets.token_hex(4)}.json"
+    return _state_name
+
+
+def _file_pid(name):
+    try:
+        return int(name.split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+@contextmanager
+def _dir_lock():
+    # folding and reading the files is serialized across processes, so a
+    # dead worker's totals are never counted twice or missed by a scrape
+    with open(os.path.join(METRICS_DIR, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_json(path, state):
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_process_state(gauges=True):
+    # this process's metrics, swapped in atomically for the other processes.
+    # the first write of a process folds in any file left under its pid: a
+    # pid is only reused once its previous owner has exited
+    if not METRICS_DIR:
+        return
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        first = _state_pid != os.getpid()
+        name = _state_file()
+        if first:
+            with _dir_lock():
+                _fold([n for n in os.listdir(METRICS_DIR)
+                       if n.endswith('.json') and n != name and _file_pid(n) == os.getpid()])
+        _write_json(os.path.join(METRICS_DIR, name), _process_state(gauges))
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write process metrics: {str(e)}")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge_histograms(histograms, state):
+    for name, series_list in state['histograms'].items():
+        merged = histograms.setdefault(name, {})
+        for key, counts, total, count in series_list:
+            key = tuple(tuple(pair) for pair in key)
+            series = merged.get(key)
+            if series is None:
+                merged[key] = {'counts': list(counts), 'sum': total, 'count': count}
+            else:
+                series['counts'] = [a + b for a, b in zip(series['counts'], counts)]
+                series['sum'] += total
+                series['count'] += count
+    return histograms
+
+
+def _fold(names):
+    # add the histograms of exited processes to the aggregate and drop their
+    # files (call with the directory lock held)
+    if not names:
+        return
+    aggregate_path = os.path.join(METRICS_DIR, AGGREGATE_FILE)
+    histograms = {}
+    aggregate = _read_json(aggregate_path)
+    if aggregate:
+        _merge_histograms(histograms, aggregate)
+    for name in names:
+        state = _read_json(os.path.join(METRICS_DIR, name))
+        if state:
+            _merge_histograms(histograms, state)
+    _write_json(aggregate_path, {'histograms': {
+        name: [[list(key), series['counts'], series['sum'], series['count']]
+               for key, series in merged.items()]
+        for name, merged in histograms.items()}})
+    for name in names:
+        try:
+            os.remove(os.path.join(METRICS_DIR, name))
+        except OSError:
+            pass
+
+
+def _read_process_states():
+    # (aggregate of exited processes, [state of every live process])
+    with _dir_lock():
+        names = [name for name in os.listdir(METRICS_DIR)
+                 if name.endswith('.json') and name != AGGREGATE_FILE]
+        dead = [name for name in names if not _alive(_file_pid(name) or 0)]
+        _fold(dead)
+        states = [_read_json(os.path.join(METRICS_DIR, name))
+                  for name in names if name not in dead]
+        return (_read_json(os.path.join(METRICS_DIR, AGGREGATE_FILE)),
+                [state for state in states if state])
+
+
+def _render_processes(metrics):
+    write_process_state()
+    histograms = {}
+    gauges = {}
+    aggregate, states = _read_process_states()
+    if aggregate:
+        _merge_histograms(histograms, aggregate)
+    for state in states:
+        _merge_histograms(histograms, state)
+        for name, values in state['gauges'].items():
+            gauges.setdefault(name, []).extend(
+                (dict(labels, worker=state['pid']), value) for labels, value in values)
+
+    lines = []
+    for metric in metrics:
+        if isinstance(metric, Histogram):
+            lines.extend(metric.render(histograms.get(metric.name, {})))
+        else:
+            lines.extend(metric.render(gauges.get(metric.name, [])))
+    return '\n'.join(lines) + '\n'
+
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _flush_forever():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        write_process_state()
+
+
+def start_flusher():
+    # one flusher thread per process; threads do not survive fork, so a
+    # worker starts its own on its first request
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        threading.Thread(target=_flush_forever, name='metrics-flusher', daemon=True).start()
+
+
+def _before_fork():
+    # observations made before forking (e.g. scraping while preloading) are
+    # reported once, by the parent, not again by every child
+    write_process_state(gauges=False)
+
+
+def _after_fork_in_child():
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    for metric in metrics:
+        if isinstance(metric, Histogram):
+            metric.reset()
+
+
+if METRICS_DIR:
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
+
+
+CALLBACK_SECONDS = histogram(
+    'dash_callback_duration_seconds', 'Time spent in Dash callbacks')
+CALLBACK_BYTES = histogram(
+    'dash_callback_response_bytes', 'Size of Dash callback responses', SIZE_BUCKETS)
+SCRAPER_PHASE_SECONDS = histogram(
+    'scraper_phase_duration_seconds', 'Time spent in each get_world_cup_data() phase')
+
+########################################################
+# Timers
+########################################################
+
+
+@contextmanager
+def timer(metric, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - start, **labels)
+
+
+def phase(name):
+    return timer(SCRAPER_PHASE_SECONDS, phase=name)
+
+# decorator timing a Dash callback (errors are labelled separately)
+
+
+def timed_callback(name):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = 'ok'
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                CALLBACK_SECONDS.observe(time.perf_counter() - start,
+                                         callback=name, status=status)
+        return wrapper
+    return decorator
+
+########################################################
+# Flask integration
+########################################################
+
+# per-request profiling is opt-in: WC_PROFILING=1 enables the hook and a
+# request then asks for a profile with the 'X-Profile' header
+PROFILING = os.environ.get('WC_PROFILING', '0').lower() in ('1', 'true', 'yes')
+PROFILE_DIR = os.environ.get('WC_PROFILE_DIR', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'logs', 'profiles'))
+
+
+_profile_ids = itertools.count(1)
+
+
+def _start_profiler(kind):
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return 'pyinstrument', profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed, using cProfile")
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return 'cprofile', profiler
+
+
+def _stop_profiler(kind, profiler, label):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    # unique across workers and within the same second
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_profile_ids)}"
+    if kind == 'pyinstrument':
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, f"{stamp}-{label}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, f"{stamp}-{label}.prof")
+        profiler.dump_stats(path)
+    return path
+
+
+def init_app(server):
+    import flask
+
+    @server.before_request
+    def start_request():
+        start_flusher()
+        flask.g.profiler = None
+        if PROFILING and flask.request.headers.get('X-Profile'):
+            flask.g.profiler = _start_profiler(
+                flask.request.headers['X-Profile'].lower())
+
+    @server.after_request
+    def finish_request(response):
+        if flask.request.path.endswith('/_dash-update-component'):
+            body = flask.request.get_json(silent=True) or {}
+            CALLBACK_BYTES.observe(response.calculate_content_length() or 0,
+                                   output=body.get('output', 'unknown'))
+
+        if getattr(flask.g, 'profiler', None):
+            kind, profiler = flask.g.profiler
+            label = flask.request.path.strip('/').replace('/', '_') or 'index'
+            path = _stop_profiler(kind, profiler, label)
+            response.headers['X-Profile-Path'] = path
+            logger.info(f"Wrote profile for {flask.request.path} to {path}")
+        return response
+
+    @server.route('/metrics')
+    def metrics():
+        return flask.Response(render_metrics(),
+                              mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,132 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    refresher.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from snapshot import make_fetcher, refresh_world_cup_data, CACHE_DIR, OFFLINE
+import metrics
+import threading
+import logging
+import random
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# configuration (overridable through environment variables); an interval of
+# 0 disables the background refresh. offline processes still pick up
+# snapshots written to the cache by other processes, they just never scrape
+REFRESH_INTERVAL = int(os.environ.get('WC_REFRESH_INTERVAL', 6 * 60 * 60))
+REFRESH_JITTER = float(os.environ.get('WC_REFRESH_JITTER', 0.1))
+
+REFRESH_SECONDS = metrics.histogram(
+    'data_refresh_duration_seconds', 'Time spent refreshing the World Cup data')
+
+# background thread that re-checks the data on a schedule. the new dataset is
+# loaded, validated and built entirely on this thread; `swap(finals_df,
+# nation_df, manifest)` then publishes it (a plain reference swap) and
+# `touch(manifest)` records a check that found no new data. any error keeps
+# the current data in place
+
+
+class DataRefresher:
+    def __init__(self, current_version, swap, touch=None, interval=REFRESH_INTERVAL,
+                 jitter=REFRESH_JITTER, cache_dir=CACHE_DIR):
+        self.current_version = current_version
+        self.swap = swap
+        self.touch = touch
+        self.interval = interval
+        self.jitter = jitter
+        self.cache_dir = cache_dir
+        self.last_success = time.time()
+        self.last_error = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._fetcher = None
+
+    def refresh(self):
+        # one refresh, also usable without the thread (e.g. from a script)
+        with self._lock:
+            start = time.perf_counter()
+            result = 'error'
+            try:
+                finals_df, nation_df, manifest = refresh_world_cup_data(
+                    self.current_version, ttl=self.ttl(), cache_dir=self.cache_dir,
+                    fetcher=self.fetcher())
+
+                if finals_df is None or manifest['version'] == self.current_version:
+                    result = 'unchanged'
+                    if self.touch and manifest:
+                        self.touch(manifest)
+                else:
+                    self.swap(finals_df, nation_df, manifest)
+                    logger.info(
+                        f"Swapped in snapshot {manifest['version']} (was {self.current_version})")
+                    self.current_version = manifest['version']
+                    result = 'updated'
+
+                self.last_success = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(
+                    f"Data refresh failed, keeping snapshot {self.current_version}: {str(e)}")
+            finally:
+                REFRESH_SECONDS.observe(time.perf_counter() - start, result=result)
+            return result
+
+    def fetcher(self):
+        # one fetcher (pooled session, page cache) for every refresh, made on
+        # first use so a preloaded master never opens connections its forked
+        # workers would share
+        if self._fetcher is None and not OFFLINE:
+            self._fetcher = make_fetcher(self.cache_dir)
+        return self._fetcher
+
+    def ttl(self):
+        # the shortest jittered wait, so every scheduled check finds a
+        # snapshot from the previous period stale (with the full interval an
+        # early wakeup would skip it and the real period would drift towards
+        # twice the interval)
+        return self.interval * (1 - self.jitter)
+
+    def _wait(self):
+        # spread the workers of one deployment so they do not all scrape at
+        # once; the first one to finish writes the shared snapshot cache
+        delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+        return self._stop.wait(max(delay, 1))
+
+    def _run(self):
+        while not self._wait():
+            self.refresh()
+
+    def start(self):
+        if self.interval <= 0:
+            logger.info("Background data refresh is disabled")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='data-refresher', daemon=True)
+        self._thread.start()
+        logger.info(f"Refreshing data every {self.interval}s in the background")
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        return {
+            'version': self.current_version,
+            'interval': self.interval,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'last_success': self.last_success,
+            'last_error': self.last_error
+        }
@@ -6,204 +6,239 @@
 # --------------------------------------------------
 
 # import libraries
+from countries import iso3_codes
+from derived import parse_scores
+from fetcher import FINALS_PAGE, Fetcher, page_url
+from metrics import phase
+from lxml import etree
+from io import BytesIO, StringIO
+import pyarrow.compute as pc
+import pyarrow as pa
 import pandas as pd
-import pycountry
+import numpy as np
 import logging
 import re
+import os
 
-# Configure logging when run directly
-if __name__ == '__main__':
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/scraper.log'),
-            logging.StreamHandler()
-        ]
-    )
-
-# get the world cup data
+WIKIPEDIA_URL = page_url(FINALS_PAGE)
 
+# an item of a comma separated year list such as "1958, 1962, 1970"
+YEAR_ITEM_PATTERN = re.compile(r'^\d+$')
 
-def get_world_cup_data():
-    # Get logger for this file
-    logger = logging.getLogger(__name__)
+# header cells that identify the two tables we need
+TABLE_SIGNATURES = {
+    'finals': ('Winners', 'Runners-up'),
+    'nations': ('Team', 'Winners')
+}
 
-    ########################################################
-    # Phase 1 : Load and clean the data
-    ########################################################
+# fetch the raw page (url can also be a local html file, e.g. a fixture);
+# pass a Fetcher with a page cache to make the request conditional
 
-    # load Wikipedia page
-    url = "https://en.wikipedia.org/wiki/List_of_FIFA_World_Cup_finals"
-    tables = pd.read_html(url)
 
-    logger.info("Loaded Wikipedia page")
+def fetch_page(url=WIKIPEDIA_URL, fetcher=None):
+    with phase('fetch'):
+        if os.path.exists(url):
+            with open(url, 'rb') as f:
+                return f.read()
+        return (fetcher or Fetcher()).fetch(url).content
 
-    # find the correct FIFA World Cup finals table
-    finals_df = None
-    for table in tables:
-        if 'Winners' in table.columns and 'Runners-up' in table.columns:
-            finals_df = table
-            break
 
-    if finals_df is None:
-        raise Exception(
-            "Could not find the correct FIFA World Cup finals table.")
-
-    logger.info("Found 'FIFA World Cup finals' table")
-
-    # standardize column names (some tables might have footnotes or merged columns)
-    finals_df.columns = [col if not isinstance(
-        col, tuple) else col[1] for col in finals_df.columns]
-    finals_df = finals_df.rename(columns={
-        'Year': 'Year',
-        'Winners': 'Winners',
-        'Runners-up': 'Runners-up',
-        'Score': 'Score',
-        'Venue': 'Venue',
-        'Attendance': 'Attendance'
-    })
-
-    # clean data
-    finals_df = finals_df.dropna(subset=['Year', 'Winners', 'Runners-up'])
-    finals_df['Year'] = finals_df['Year'].astype(
-        str).str.extract(r'(\d{4})')
-
-    # treat 'West Germany' and 'Germany' as the same
-    finals_df['Winners'] = finals_df['Winners'].replace(
-        'West Germany', 'Germany')
-    finals_df['Runners-up'] = finals_df['Runners-up'].replace(
-        'West Germany', 'Germany')
-
-    logger.info("Cleaned Finals table")
-
-    # find "Results by nation" table: look for one with 'Team', 'Winners', etc.
-    nation_df = None
-    for table in tables:
-        if 'Team' in table.columns and 'Winners' in table.columns:
-            nation_df = table
+def _header_names(table):
+    # text of the leading header-only rows, without footnote markers
+    names = set()
+    for row in table.iter('tr'):
+        cells = [cell for cell in row if cell.tag in ('th', 'td')]
+        if not cells or any(cell.tag == 'td' for cell in cells):
             break
+        names.update(re.sub(r'\[.*?\]', '', ''.join(cell.itertext())).strip()
+                     for cell in cells)
+    return names
 
-    if nation_df is None:
-        raise Exception("Could not find the 'Results by nation' table.")
-
-    logger.info("Found 'Results by nation' table")
-
-    # Clean and rename columns
-    nation_df = nation_df.rename(columns={
-        'Team': 'Country',
-        'Winners': 'Wins',
-        'Runners-up': 'RunnerUps',
-        'Total finals': 'TotalFinals',
-        'Years won': 'YearsWon',
-        'Years runners-up': 'YearsRunnerUp'
-    })
-
-    logger.info("Cleaned Results by Nation table")
-
-    # Fix country name issues
-    nation_df['Country'] = nation_df['Country'].replace({
-        'West Germany': 'Germany',
-        'Soviet Union': 'Russia',
-        'Czechoslovakia': 'Czech Republic',
-        'Yugoslavia': 'Serbia',
-        'England': 'United Kingdom'
-    })
-
-    logger.info("Fixed country name issues for ISO Alpha-3 codes")
-
-    # add ISO Alpha-3 codes
-    def get_country_code(name):
-        try:
-            return pycountry.countries.lookup(name).alpha_3
-        except:
-            overrides = {
-                'Germany': 'DEU',
-                'Russia': 'RUS',
-                'Czech Republic': 'CZE',
-                'Serbia': 'SRB',
-                'United Kingdom': 'GBR'
-            }
-            return overrides.get(name, None)
-
-    nation_df['ISO_Code'] = nation_df['Country'].apply(get_country_code)
-
-    logger.info("Added ISO codes")
-
-    # Fill NaNs for countries with no wins or runner-ups
-    nation_df[['Wins', 'RunnerUps', 'TotalFinals']] = nation_df[[
-        'Wins', 'RunnerUps', 'TotalFinals']].fillna(0).astype(int)
-    nation_df[['YearsWon', 'YearsRunnerUp']] = nation_df[[
-        'YearsWon', 'YearsRunnerUp']].fillna('—')
-
-    logger.info("Filled NaNs for countries with no wins or runner-ups")
-
-    # Set display options for better readability
-    pd.set_option('display.max_columns', None)
-    pd.set_option('display.width', None)
-    pd.set_option('display.max_rows', 10)
-    pd.set_option('display.max_colwidth', None)
-
-    # # log the dataframes
-    # logging.info("Show DataFrames")
-    # logging.info("\nNation DF:\n%s", nation_df.to_string())
-    # logging.info("\nFinals DF:\n%s", finals_df.to_string())
-
-    ########################################################
-    # Phase 2 : Preprocess the data
-    ########################################################
+# stream the page and keep only the tables matching the signatures, instead
+# of turning every table on the page into a DataFrame
 
-    # replace '—' with None
-    logger.info("Cleaning YearsWon and YearsRunnerUp columns...")
-    nation_df['YearsWon'] = nation_df['YearsWon'].replace('—', None)
-    nation_df['YearsRunnerUp'] = nation_df['YearsRunnerUp'].replace('—', None)
 
-    # convert to lists of ints
-    def parse_years(val):
-        if pd.isna(val):
-            return []
-        return [int(y.strip()) for y in val.split(',') if y.strip().isdigit()]
+def find_tables(page, signatures=TABLE_SIGNATURES):
+    found = {}
+    for _, table in etree.iterparse(BytesIO(page), events=('end',), tag='table',
+                                    html=True, recover=True, no_network=True):
+        names = _header_names(table)
+        for key, signature in signatures.items():
+            if key not in found and all(name in names for name in signature):
+                found[key] = etree.tostring(
+                    table, encoding='unicode', method='html')
 
-    # apply the parse_years function to the YearsWon and YearsRunnerUp columns
-    nation_df['YearsWon'] = nation_df['YearsWon'].apply(parse_years)
-    nation_df['YearsRunnerUp'] = nation_df['YearsRunnerUp'].apply(parse_years)
-
-    # clean 'Score' column in finals_df and create 'Notes'
-    logger.info("Normalizing Score and extracting match notes...")
-
-    def clean_score(score):
-        if pd.isna(score):
-            return None, None
+        if len(found) == len(signatures):
+            break
 
-        notes = []
-        # extract extra time or penalties
-        if '(a.e.t.)' in score:
-            notes.append('extra time')
-            score = score.replace('(a.e.t.)', '')
+        # free tables we are done with (nested tables belong to their parent)
+        if next(table.iterancestors('table'), None) is None:
+            table.clear()
+            while table.getprevious() is not None:
+                del table.getparent()[0]
+    return found
+
+# "1958, 1962" -> [1958, 1962] for a whole column with arrow compute
+# kernels; missing values become empty lists, non-numeric items are skipped.
+# the result stays an arrow-backed list column (like the stored snapshot)
+# instead of one python list per row
+
+
+def parse_years(years):
+    try:
+        text = pa.array(years, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # non-string cells, e.g. a lone year read as a number
+        text = pa.array(years.astype(str).where(years.notna(), None), type=pa.string())
+    parts = pc.split_pattern(text, ',')
+    items = pc.utf8_trim_whitespace(pc.list_flatten(parts))
+    rows = pc.list_parent_indices(parts)
+    keep = pc.match_substring_regex(items, YEAR_ITEM_PATTERN.pattern)
+
+    values = pc.cast(pc.filter(items, keep), pa.int16())
+    counts = np.bincount(pc.filter(rows, keep).to_numpy(), minlength=len(text))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+    lists = pa.ListArray.from_arrays(offsets, values)
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=years.index)
+
+# get the world cup data; pass an already fetched page to re-parse it
+# without fetching it again
+
+
+def get_world_cup_data(url=WIKIPEDIA_URL, page=None):
+    # Get logger for this file
+    logger = logging.getLogger(__name__)
 
-        # extract penalty scores using regex
-        pen_match = re.search(r'\((\d+[–-]\d+)\s*pen\.\)', score)
-        if pen_match:
-            notes.append(f"({pen_match.group(1)} pen.)")
-            score = re.sub(r'\(\d+[–-]\d+\s*pen\.\)', '', score)
+    ########################################################
+    # Phase 1 : Load and clean the data
+    ########################################################
 
-        # remove any references like [n 3]
-        score = re.sub(r'\[.*?\]', '', score)
+    # load Wikipedia page
+    if page is None:
+        page = fetch_page(url)
 
-        # if no notes were found, set to None instead of empty list
-        return score.strip(), notes if notes else None
+    logger.info("Loaded Wikipedia page")
 
-    finals_df[['CleanedScore', 'Notes']] = finals_df['Score'].apply(
-        lambda x: pd.Series(clean_score(x)))
+    with phase('table_detection'):
+        # find the FIFA World Cup finals and results by nation tables
+        tables = find_tables(page)
+
+        if 'finals' not in tables:
+            raise Exception(
+                "Could not find the correct FIFA World Cup finals table.")
+
+        finals_df = pd.read_html(StringIO(tables['finals']))[0]
+
+        logger.info("Found 'FIFA World Cup finals' table")
+
+    with phase('cleaning'):
+        # standardize column names (some tables might have footnotes or merged columns)
+        finals_df.columns = [col if not isinstance(
+            col, tuple) else col[1] for col in finals_df.columns]
+        finals_df = finals_df.rename(columns={
+            'Year': 'Year',
+            'Winners': 'Winners',
+            'Runners-up': 'Runners-up',
+            'Score': 'Score',
+            'Venue': 'Venue',
+            'Attendance': 'Attendance'
+        })
+
+        # clean data
+        finals_df = finals_df.dropna(subset=['Year', 'Winners', 'Runners-up'])
+        finals_df['Year'] = finals_df['Year'].astype(
+            str).str.extract(r'(\d{4})')
+
+        # treat 'West Germany' and 'Germany' as the same
+        finals_df['Winners'] = finals_df['Winners'].replace(
+            'West Germany', 'Germany')
+        finals_df['Runners-up'] = finals_df['Runners-up'].replace(
+            'West Germany', 'Germany')
+
+        logger.info("Cleaned Finals table")
+
+    with phase('table_detection'):
+        # "Results by nation" table: the one with 'Team', 'Winners', etc.
+        if 'nations' not in tables:
+            raise Exception("Could not find the 'Results by nation' table.")
+
+        nation_df = pd.read_html(StringIO(tables['nations']))[0]
+
+        logger.info("Found 'Results by nation' table")
+
+    with phase('cleaning'):
+        # Clean and rename columns
+        nation_df = nation_df.rename(columns={
+            'Team': 'Country',
+            'Winners': 'Wins',
+            'Runners-up': 'RunnerUps',
+            'Total finals': 'TotalFinals',
+            'Years won': 'YearsWon',
+            'Years runners-up': 'YearsRunnerUp'
+        })
+
+        logger.info("Cleaned Results by Nation table")
+
+        # Fix country name issues
+        nation_df['Country'] = nation_df['Country'].replace({
+            'West Germany': 'Germany',
+            'Soviet Union': 'Russia',
+            'Czechoslovakia': 'Czech Republic',
+            'Yugoslavia': 'Serbia',
+            'England': 'United Kingdom'
+        })
+
+        logger.info("Fixed country name issues")
+
+    with phase('iso_lookup'):
+        # add ISO Alpha-3 codes from the prebuilt alias table
+        nation_df['ISO_Code'] = iso3_codes(nation_df['Country'])
+
+        logger.info("Added ISO codes")
+
+    with phase('cleaning'):
+        # Fill NaNs for countries with no wins or runner-ups
+        nation_df[['Wins', 'RunnerUps', 'TotalFinals']] = nation_df[[
+            'Wins', 'RunnerUps', 'TotalFinals']].fillna(0).astype(int)
+        nation_df[['YearsWon', 'YearsRunnerUp']] = nation_df[[
+            'YearsWon', 'YearsRunnerUp']].fillna('—')
+
+        logger.info("Filled NaNs for countries with no wins or runner-ups")
 
-    # drop 'Ref.' column if it exists
-    if 'Ref.' in finals_df.columns:
-        logger.info("Dropping 'Ref.' column...")
-        finals_df.drop(columns=['Ref.'], inplace=True)
+    ########################################################
+    # Phase 2 : Preprocess the data
+    ########################################################
 
-    # log the dataframes
-    logger.info("\nFinals DF:\n%s", finals_df.to_string())
-    logger.info("\nNation DF:\n%s", nation_df.to_string())
+    with phase('cleaning'):
+        # replace '—' with None
+        logger.info("Cleaning YearsWon and YearsRunnerUp columns...")
+        nation_df['YearsWon'] = nation_df['YearsWon'].replace('—', None)
+        nation_df['YearsRunnerUp'] = nation_df['YearsRunnerUp'].replace('—', None)
+
+        # convert to lists of ints
+        nation_df['YearsWon'] = parse_years(nation_df['YearsWon'])
+        nation_df['YearsRunnerUp'] = parse_years(nation_df['YearsRunnerUp'])
+
+    with phase('score_parsing'):
+        # clean 'Score' column in finals_df and create 'Notes'
+        logger.info("Normalizing Score and extracting match notes...")
+
+        # CleanedScore and Notes plus HomeGoals, AwayGoals, ExtraTime and
+        # PenaltyScore, all extracted column-wise
+        finals_df = finals_df.join(parse_scores(finals_df['Score']))
+
+        # drop 'Ref.' column if it exists
+        if 'Ref.' in finals_df.columns:
+            logger.info("Dropping 'Ref.' column...")
+            finals_df.drop(columns=['Ref.'], inplace=True)
+
+    # log the dataframes (rendering them is expensive, so only when DEBUG is
+    # actually enabled for this logger)
+    if logger.isEnabledFor(logging.DEBUG):
+        with pd.option_context('display.max_columns', None, 'display.width', None,
+                               'display.max_colwidth', None):
+            logger.debug("\nFinals DF:\n%s", finals_df.to_string())
+            logger.debug("\nNation DF:\n%s", nation_df.to_string())
 
     # write the dataframes to csv
     # finals_df.to_csv('data/world_cup_finals.csv', index=False)
@@ -215,4 +250,6 @@ def get_world_cup_data():
 
 
 if __name__ == '__main__':
+    from log_config import setup_logging
+    setup_logging('scraper.log', {'scraper': 'DEBUG'})
     get_world_cup_data()
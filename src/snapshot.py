@@ -0,0 +1,279 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    snapshot.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from storage import (FINALS_SCHEMA, NATIONS_SCHEMA, is_complete_table, normalize_tables,
+                     read_csv_tables, read_table, tables_hash, validate_tables, write_table)
+import tempfile
+import logging
+import shutil
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEED_DIR = os.path.join(BASE_DIR, 'data')
+SEED_FINALS = os.path.join(SEED_DIR, 'world_cup_finals.csv')
+SEED_NATIONS = os.path.join(SEED_DIR, 'world_country_stats.csv')
+
+# configuration (overridable through environment variables)
+CACHE_DIR = os.environ.get('WC_CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+CACHE_TTL = int(os.environ.get('WC_CACHE_TTL', 7 * 24 * 60 * 60))
+OFFLINE = os.environ.get('WC_OFFLINE', '0').lower() in ('1', 'true', 'yes')
+
+MANIFEST = 'current.json'
+FINALS_FILE = 'finals.arrow'
+NATIONS_FILE = 'nations.arrow'
+SOURCE_FILE = 'source.html'
+PAGES_DIR = 'pages'
+
+########################################################
+# Snapshot cache
+########################################################
+
+
+def read_manifest(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, MANIFEST)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(manifest, ttl=CACHE_TTL):
+    return time.time() - manifest.get('created', 0) > ttl
+
+
+def read_snapshot(manifest, cache_dir=CACHE_DIR):
+    version_dir = os.path.join(cache_dir, manifest['version'])
+    return (read_table(os.path.join(version_dir, FINALS_FILE)),
+            read_table(os.path.join(version_dir, NATIONS_FILE)))
+
+
+def write_manifest(manifest, cache_dir=CACHE_DIR):
+    # swap the manifest atomically so readers never see a partial file
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST))
+
+
+def snapshot_complete(version_dir):
+    # both tables are present and readable; a writer that crashed between
+    # the two files must not make the version look finished
+    return (is_complete_table(os.path.join(version_dir, FINALS_FILE), FINALS_SCHEMA) and
+            is_complete_table(os.path.join(version_dir, NATIONS_FILE), NATIONS_SCHEMA))
+
+
+def _write_version(finals_df, nation_df, version_dir, cache_dir=CACHE_DIR):
+    # write both tables into a private directory and move it into place, so
+    # concurrent writers (per-worker refreshers, the fast-start loader) never
+    # write the same files and a version directory only holds whole tables
+    tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(version_dir)}.", dir=cache_dir)
+    try:
+        write_table(finals_df, os.path.join(tmp_dir, FINALS_FILE), FINALS_SCHEMA)
+        write_table(nation_df, os.path.join(tmp_dir, NATIONS_FILE), NATIONS_SCHEMA)
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # an incomplete directory (or another writer's copy of the same
+            # content) is already there; replace its tables file by file
+            for name in (FINALS_FILE, NATIONS_FILE):
+                os.replace(os.path.join(tmp_dir, name), os.path.join(version_dir, name))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def write_snapshot(finals_df, nation_df, source, created=None, cache_dir=CACHE_DIR, page=None):
+    manifest = {
+        'version': tables_hash(finals_df, nation_df),
+        'created': time.time() if created is None else created,
+        'source': source
+    }
+
+    try:
+        version_dir = os.path.join(cache_dir, manifest['version'])
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # identical content is already on disk under the same version
+        if not snapshot_complete(version_dir):
+            _write_version(finals_df, nation_df, version_dir, cache_dir)
+
+        # keep the raw page so the tables can be re-parsed without a refetch
+        if page is not None:
+            tmp_path = os.path.join(version_dir, f"{SOURCE_FILE}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(page)
+            os.replace(tmp_path, os.path.join(version_dir, SOURCE_FILE))
+
+        write_manifest(manifest, cache_dir)
+        logger.info(f"Wrote snapshot {manifest['version']} ({source})")
+    except OSError as e:
+        # a read-only filesystem should not stop the app from serving
+        logger.warning(f"Could not write snapshot: {str(e)}")
+
+    return manifest
+
+
+def seed_snapshot(cache_dir=CACHE_DIR):
+    # the shipped csv files are the fallback snapshot; they are written with
+    # created=0 so an online process still tries to scrape fresh data
+    finals_df, nation_df = read_csv_tables(SEED_FINALS, SEED_NATIONS)
+    manifest = write_snapshot(finals_df, nation_df, 'seed',
+                              created=0, cache_dir=cache_dir)
+    return finals_df, nation_df, manifest
+
+
+# load the world cup data from the snapshot cache, scraping only when needed
+
+
+def load_world_cup_data(offline=OFFLINE, ttl=CACHE_TTL, cache_dir=CACHE_DIR):
+    manifest = read_manifest(cache_dir)
+
+    # use the cached snapshot if it is fresh (or we are not allowed to scrape)
+    if manifest and (offline or not is_stale(manifest, ttl)):
+        try:
+            finals_df, nation_df = read_snapshot(manifest, cache_dir)
+            logger.info(f"Loaded snapshot {manifest['version']} from cache")
+            return finals_df, nation_df, manifest
+        except Exception as e:
+            logger.warning(f"Could not read cached snapshot: {str(e)}")
+            manifest = None
+
+    if offline:
+        logger.info("Offline mode: loading seed snapshot")
+        return seed_snapshot(cache_dir)
+
+    try:
+        finals_df, nation_df, manifest = scrape_snapshot(cache_dir, manifest)
+        if finals_df is None:
+            finals_df, nation_df = read_snapshot(manifest, cache_dir)
+        return finals_df, nation_df, manifest
+    except Exception as e:
+        logger.error(f"Error scraping World Cup data: {str(e)}")
+
+        # keep serving the stale snapshot rather than failing startup
+        if manifest:
+            try:
+                finals_df, nation_df = read_snapshot(manifest, cache_dir)
+                logger.warning(
+                    f"Serving stale snapshot {manifest['version']}")
+                return finals_df, nation_df, manifest
+            except Exception as e:
+                logger.warning(f"Could not read cached snapshot: {str(e)}")
+
+        logger.warning("Falling back to seed snapshot")
+        return seed_snapshot(cache_dir)
+
+
+def _same_source(manifest, page, cache_dir=CACHE_DIR):
+    try:
+        return read_source(manifest, cache_dir) == page
+    except OSError:
+        return False
+
+# a fetcher whose page cache lives next to the snapshots; long-running
+# callers keep one so every scrape reuses its pooled session
+
+
+def make_fetcher(cache_dir=CACHE_DIR):
+    # requests and tenacity are only imported when something will be fetched
+    from fetcher import Fetcher
+    return Fetcher(os.path.join(cache_dir, PAGES_DIR))
+
+# scrape, validate and store a new snapshot (errors are raised to the caller).
+# the page is fetched conditionally; when Wikipedia answers 304 and the page
+# is the one `manifest` was built from, only the manifest's age is reset and
+# (None, None, manifest) is returned
+
+
+def scrape_snapshot(cache_dir=CACHE_DIR, manifest=None, fetcher=None):
+    # the scraper (lxml, the cleaning pipeline) is only imported when needed,
+    # so starting from a cached snapshot does not pay for it
+    from metrics import phase
+    from scraper import WIKIPEDIA_URL, get_world_cup_data
+
+    with phase('fetch'):
+        result = (fetcher or make_fetcher(cache_dir)).fetch(WIKIPEDIA_URL)
+    page = result.content
+
+    if result.not_modified and manifest and _same_source(manifest, page, cache_dir):
+        manifest = dict(manifest, created=time.time())
+        try:
+            write_manifest(manifest, cache_dir)
+        except OSError as e:
+            logger.warning(f"Could not write snapshot manifest: {str(e)}")
+        logger.info(f"Wikipedia page not modified, snapshot {manifest['version']} is current")
+        return None, None, manifest
+
+    finals_df, nation_df = normalize_tables(*get_world_cup_data(page=page))
+    validate_tables(finals_df, nation_df)
+    manifest = write_snapshot(finals_df, nation_df, 'scrape',
+                              cache_dir=cache_dir, page=page)
+    return finals_df, nation_df, manifest
+
+# scheduled refresh: pick up a snapshot another process already wrote, or
+# scrape once the current one is older than ttl (never when offline). unlike
+# load_world_cup_data() this never falls back to the seed; a failed scrape
+# raises so the caller keeps serving what it has
+
+
+def refresh_world_cup_data(current_version, ttl=CACHE_TTL, cache_dir=CACHE_DIR, offline=OFFLINE,
+                           fetcher=None):
+    manifest = read_manifest(cache_dir)
+
+    if offline and not manifest:
+        return None, None, None
+
+    if manifest and (offline or not is_stale(manifest, ttl)):
+        if manifest['version'] == current_version:
+            return None, None, manifest
+        finals_df, nation_df = read_snapshot(manifest, cache_dir)
+        validate_tables(finals_df, nation_df)
+        logger.info(f"Loaded snapshot {manifest['version']} from cache")
+        return finals_df, nation_df, manifest
+
+    finals_df, nation_df, manifest = scrape_snapshot(cache_dir, manifest, fetcher)
+    if finals_df is None and manifest['version'] != current_version:
+        finals_df, nation_df = read_snapshot(manifest, cache_dir)
+    return finals_df, nation_df, manifest
+
+# re-run the parsing/cleaning pipeline on the page saved with a snapshot
+
+
+def read_source(manifest, cache_dir=CACHE_DIR):
+    with open(os.path.join(cache_dir, manifest['version'], SOURCE_FILE), 'rb') as f:
+        return f.read()
+
+
+def reparse_snapshot(manifest, cache_dir=CACHE_DIR):
+    from scraper import get_world_cup_data
+    return normalize_tables(*get_world_cup_data(page=read_source(manifest, cache_dir)))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Load (and if needed refresh) the World Cup data snapshot')
+    parser.add_argument('--reparse', action='store_true',
+                        help='re-parse the saved page of the current snapshot')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.reparse:
+        manifest = read_manifest()
+        finals_df, nation_df = reparse_snapshot(manifest)
+        manifest = write_snapshot(finals_df, nation_df, 'reparse',
+                                  created=manifest['created'], page=read_source(manifest))
+    else:
+        finals_df, nation_df, manifest = load_world_cup_data()
+    print(json.dumps(manifest, indent=2))
@@ -0,0 +1,252 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    static_site.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from plotly.io.json import to_json_plotly
+import argparse
+import logging
+import json
+import html
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(BASE_DIR), 'build', 'static')
+
+# plotly.js release bundled with plotly==5.18
+PLOTLY_JS = 'https://cdn.plot.ly/plotly-2.27.0.min.js'
+
+# exported payloads kept in memory per StaticPayloads instance
+MAX_PAYLOADS = 1024
+
+########################################################
+# Payload keys and files
+########################################################
+
+
+def _slug(value):
+    return re.sub(r'[^a-z0-9]+', '-', str(value).lower()).strip('-')
+
+# a country's part of a payload key: its ISO code, or its slugged name
+
+
+def country_key(data, country):
+    record = data.country(country)
+    iso = record['ISO_Code'] if record else None
+    return _slug(iso or country)
+
+# file name for a (country, year) selection, e.g. "bra-1994" or "all-all"
+
+
+def payload_key(data, selected_country=None, selected_year=None):
+    country = country_key(data, selected_country) if selected_country else 'all'
+    year = str(int(selected_year)) if selected_year else 'all'
+    return f"{country}-{year}"
+
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(payload if isinstance(payload, str) else to_json_plotly(payload))
+
+########################################################
+# Rendering dash components to plain HTML
+########################################################
+
+
+def _css(style):
+    # camelCase style keys -> kebab-case css properties
+    return '; '.join(re.sub(r'([A-Z])', r'-\1', key).lower() + f": {val}"
+                     for key, val in style.items())
+
+
+def render_html(component):
+    if component is None:
+        return ''
+    if isinstance(component, (list, tuple)):
+        return ''.join(render_html(c) for c in component)
+    if not hasattr(component, 'to_plotly_json'):
+        return html.escape(str(component))
+
+    tag = type(component).__name__.lower()
+    attrs = ''
+    if getattr(component, 'id', None):
+        attrs += f' id="{html.escape(str(component.id))}"'
+    if getattr(component, 'style', None):
+        attrs += f' style="{html.escape(_css(component.style))}"'
+    children = getattr(component, 'children', None)
+    return f"<{tag}{attrs}>{render_html(children)}</{tag}>"
+
+########################################################
+# Static export
+########################################################
+
+
+SHELL = '''<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>FIFA World Cup Dashboard</title>
+    <script src="{plotly_js}"></script>
+    <style>
+        body {{ font-family: sans-serif; margin: 8px; }}
+        table {{ border-collapse: collapse; width: 100%; margin: 10px 0; }}
+        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
+        th {{ background-color: #2c3e50; color: white; }}
+        tr:nth-child(even) {{ background-color: #f9f9f9; }}
+        tr:hover {{ background-color: #f5f5f5; }}
+        select {{ width: 100%; padding: 6px; }}
+    </style>
+</head>
+<body>
+    <h1 style="text-align: center; color: #2c3e50; margin-bottom: 30px">FIFA World Cup Dashboard</h1>
+    <div id="world-map" style="width: 100%; height: 60vh"></div>
+    <div style="margin-top: 20px; margin-bottom: 20px">
+        <div style="width: 30%; display: inline-block; margin-right: 20px">
+            <label>Select Country:</label><select id="country-dropdown"><option value=""></option></select>
+        </div>
+        <div style="width: 30%; display: inline-block">
+            <label>Select Year:</label><select id="year-dropdown"><option value=""></option></select>
+        </div>
+    </div>
+    <div style="margin-top: 20px; padding: 20px; border: 1px solid #ddd; border-radius: 5px">
+        <h3 style="color: #2c3e50">Statistics</h3>
+        <div id="stats-panel" style="display: flex; flex-wrap: wrap; gap: 20px"></div>
+    </div>
+    <div style="margin-top: 20px; padding: 20px; border: 1px solid #ddd; border-radius: 5px">
+        <h3 style="color: #2c3e50; margin-bottom: 20px">Historical Summary</h3>
+        <div style="display: flex; flex-wrap: wrap; gap: 20px">
+            <div style="flex: 1; min-width: 300px; padding: 15px; background-color: #f8f9fa; border-radius: 5px; margin-right: 20px">
+                <h4 style="color: #2c3e50">Most Successful Countries</h4><div id="top-countries"></div>
+            </div>
+            <div style="flex: 1; min-width: 300px; padding: 15px; background-color: #f8f9fa; border-radius: 5px">
+                <h4 style="color: #2c3e50">Tournament Facts</h4><div id="tournament-facts"></div>
+            </div>
+            <div style="flex: 1; min-width: 300px; padding: 15px; background-color: #f8f9fa; border-radius: 5px">
+                <h4 style="color: #2c3e50">Finals by Decade</h4><div id="decade-summary"></div>
+            </div>
+        </div>
+    </div>
+    <script>
+        const getJSON = (path) => fetch(path).then((r) => r.json());
+        getJSON('manifest.json').then((manifest) => {{
+            const country = document.getElementById('country-dropdown');
+            const year = document.getElementById('year-dropdown');
+            manifest.countries.forEach((c) => country.add(new Option(c.label, c.key)));
+            manifest.years.forEach((y) => year.add(new Option(y.label, y.key)));
+
+            const update = () => {{
+                const key = (country.value || 'all') + '-' + (year.value || 'all');
+                getJSON('map/' + key + '.json').then((fig) =>
+                    Plotly.react('world-map', fig.data, fig.layout));
+                getJSON('stats/' + key + '.json').then((stats) => {{
+                    document.getElementById('stats-panel').innerHTML = stats.html;
+                }});
+            }};
+            country.addEventListener('change', update);
+            year.addEventListener('change', update);
+            update();
+
+            getJSON('summary.json').then((summary) => {{
+                document.getElementById('top-countries').innerHTML = summary.html[0];
+                document.getElementById('tournament-facts').innerHTML = summary.html[1];
+                document.getElementById('decade-summary').innerHTML = summary.html[2];
+            }});
+        }});
+    </script>
+</body>
+</html>
+'''
+
+
+def export_static(app_module, out_dir=DEFAULT_OUT_DIR):
+    # run every callback combination and write the outputs as static files
+    data = app_module.data
+    countries = (None,) + data.countries
+    years = (None,) + data.years
+
+    for country in countries:
+        for year in years:
+            key = payload_key(data, country, year)
+            write_json(os.path.join(out_dir, 'map', f"{key}.json"),
+                       app_module.figure_cache.get_json(data, country, year))
+
+            stats = app_module.update_stats(country, year)
+            write_json(os.path.join(out_dir, 'stats', f"{key}.json"),
+                       {'children': stats, 'html': render_html(stats)})
+
+    summary = app_module.update_historical_summary(None)
+    write_json(os.path.join(out_dir, 'summary.json'),
+               {'children': list(summary),
+                'html': [render_html(part) for part in summary]})
+
+    manifest = {
+        'version': data.version,
+        'countries': [{'label': c, 'key': country_key(data, c)} for c in data.countries],
+        'years': [{'label': str(y), 'key': str(y)} for y in data.years]
+    }
+    write_json(os.path.join(out_dir, 'manifest.json'), json.dumps(manifest))
+
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(SHELL.format(plotly_js=PLOTLY_JS))
+
+    logger.info(
+        f"Exported {len(countries) * len(years)} selections to {out_dir}")
+    return manifest
+
+########################################################
+# Static mode: answer callbacks from exported payloads
+########################################################
+
+
+class StaticPayloads:
+    def __init__(self, out_dir, version):
+        self.out_dir = out_dir
+        # payloads read so far; the instance (and its cache) is replaced on
+        # every data swap, so nothing outlives the snapshot it belongs to
+        self._payloads = {}
+        with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+            self.version = json.load(f)['version']
+
+        # payloads exported from another snapshot would show stale data
+        self.enabled = self.version == version
+        if not self.enabled:
+            logger.warning(
+                f"Static payloads in {out_dir} are for snapshot {self.version}, not {version}; ignoring them")
+
+    def get(self, kind, key):
+        if not self.enabled:
+            return None
+        try:
+            return self._payloads[(kind, key)]
+        except KeyError:
+            pass
+
+        path = os.path.join(self.out_dir, kind, f"{key}.json")
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except OSError:
+            payload = None
+        if len(self._payloads) < MAX_PAYLOADS:
+            self._payloads[(kind, key)] = payload
+        return payload
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Export the dashboard as static JSON payloads and an HTML shell')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR,
+                        help='output directory')
+    args = parser.parse_args()
+
+    # importing the app loads the data and registers the callbacks
+    import app
+    logging.getLogger(__name__).setLevel(logging.INFO)
+    export_static(app, args.out)
@@ -0,0 +1,230 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    storage.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pandas as pd
+import hashlib
+import ast
+import os
+
+########################################################
+# Typed schemas for the processed tables
+########################################################
+
+# country names are dictionary encoded (pandas categoricals), list columns
+# are stored natively instead of as stringified python lists
+COUNTRY = pa.dictionary(pa.int32(), pa.string())
+
+FINALS_SCHEMA = pa.schema([
+    ('Year', pa.int16()),
+    ('Winners', COUNTRY),
+    ('Score', pa.string()),
+    ('Runners-up', COUNTRY),
+    ('Venue', pa.string()),
+    ('Location', pa.string()),
+    ('Attendance', pa.int32()),
+    ('CleanedScore', pa.string()),
+    ('Notes', pa.list_(pa.string()))
+])
+
+NATIONS_SCHEMA = pa.schema([
+    ('Country', COUNTRY),
+    ('Wins', pa.int16()),
+    ('RunnerUps', pa.int16()),
+    ('TotalFinals', pa.int16()),
+    ('YearsWon', pa.list_(pa.int16())),
+    ('YearsRunnerUp', pa.list_(pa.int16())),
+    ('ISO_Code', pa.string())
+])
+
+LIST_COLUMNS = {
+    'finals': ['Notes'],
+    'nations': ['YearsWon', 'YearsRunnerUp']
+}
+
+
+def _types_mapper(arrow_type):
+    # keep list and string columns arrow-backed (no per-row python objects,
+    # and no copy out of a memory-mapped snapshot) and use the nullable
+    # integer dtype so missing attendance does not turn into floats
+    if pa.types.is_list(arrow_type) or arrow_type == pa.string():
+        return pd.ArrowDtype(arrow_type)
+    if arrow_type == pa.int32():
+        return pd.Int32Dtype()
+    return None
+
+
+def _to_list(val):
+    # missing lists become empty lists so callers can rely on truthiness
+    if val is None or (not isinstance(val, (list, tuple)) and pd.isna(val)):
+        return []
+    return list(val)
+
+########################################################
+# DataFrame <-> Arrow conversion
+########################################################
+
+
+def to_arrow(df, schema):
+    df = df.reset_index(drop=True)
+    columns = []
+    for field in schema:
+        col = df[field.name]
+        if pa.types.is_list(field.type):
+            if isinstance(col.dtype, pd.ArrowDtype) and not col.isna().any():
+                # already arrow-backed (cache reads, vectorized scrapes)
+                columns.append(pa.chunked_array(
+                    col.array.__arrow_array__()).cast(field.type))
+            else:
+                columns.append(pa.array([_to_list(v) for v in col],
+                                        type=field.type))
+        elif pa.types.is_dictionary(field.type):
+            values = pa.array(col.astype(object).where(col.notna(), None),
+                              type=pa.string())
+            columns.append(values.dictionary_encode())
+        elif pa.types.is_integer(field.type):
+            values = pd.to_numeric(col, errors='coerce').round()
+            columns.append(pa.array(values.astype('Int64'), type=field.type))
+        else:
+            columns.append(pa.array(col.astype(object).where(col.notna(), None),
+                                    type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def from_arrow(table):
+    return table.to_pandas(types_mapper=_types_mapper)
+
+
+def normalize_tables(finals_df, nation_df):
+    # round-trip through the arrow schemas so every source (scrape, csv seed,
+    # cache) hands the app identically typed DataFrames
+    return (from_arrow(to_arrow(finals_df, FINALS_SCHEMA)),
+            from_arrow(to_arrow(nation_df, NATIONS_SCHEMA)))
+
+
+# sanity checks on normalized tables before they replace the served data;
+# raises ValueError describing the first problem found
+
+
+def validate_tables(finals_df, nation_df):
+    for name, df, schema in (('finals', finals_df, FINALS_SCHEMA),
+                             ('nations', nation_df, NATIONS_SCHEMA)):
+        missing = [field.name for field in schema if field.name not in df.columns]
+        if missing:
+            raise ValueError(f"{name} table is missing columns: {missing}")
+        if df.empty:
+            raise ValueError(f"{name} table is empty")
+
+    for col in ('Year', 'Winners', 'Runners-up'):
+        if finals_df[col].isna().any():
+            raise ValueError(f"finals table has missing values in '{col}'")
+    if finals_df['Year'].duplicated().any():
+        raise ValueError("finals table has duplicate years")
+    if nation_df['Country'].isna().any() or nation_df['Country'].duplicated().any():
+        raise ValueError("nations table has missing or duplicate countries")
+
+    # every final has exactly one winner and one runner-up in the nation table
+    for col in ('Wins', 'RunnerUps'):
+        if int(nation_df[col].sum()) != len(finals_df):
+            raise ValueError(f"nations '{col}' add up to {int(nation_df[col].sum())}, "
+                             f"expected {len(finals_df)} finals")
+
+
+def tables_hash(finals_df, nation_df):
+    # hash the arrow ipc stream so identical data always gets the same version
+    digest = hashlib.sha256()
+    for df, schema in ((finals_df, FINALS_SCHEMA), (nation_df, NATIONS_SCHEMA)):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(to_arrow(df, schema))
+        digest.update(sink.getvalue())
+    return digest.hexdigest()[:16]
+
+########################################################
+# Arrow IPC / Parquet files
+########################################################
+
+
+def write_table(df, path, schema):
+    # written next to the target and swapped in atomically: another process
+    # may have the old file memory-mapped, and truncating it in place would
+    # hand that reader a torn file (or SIGBUS)
+    table = to_arrow(df, schema)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if path.endswith('.parquet'):
+            pq.write_table(table, tmp_path)
+        else:
+            # uncompressed ipc files can be memory-mapped and read zero-copy
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_table(table)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_table(path):
+    if path.endswith('.parquet'):
+        return from_arrow(pq.read_table(path))
+    with pa.memory_map(path, 'r') as source:
+        return from_arrow(pa.ipc.open_file(source).read_all())
+
+
+def is_complete_table(path, schema):
+    # the file exists, has its footer (a truncated ipc/parquet file does not)
+    # and holds the expected columns
+    try:
+        if path.endswith('.parquet'):
+            found = pq.read_schema(path)
+        else:
+            with pa.memory_map(path, 'r') as source:
+                found = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowException):
+        return False
+    return found.names == schema.names
+
+########################################################
+# CSV import / export (compatibility with src/data/*.csv)
+########################################################
+
+
+def _parse_list(val):
+    # list columns are stored as python list literals, e.g. "[1958, 1962]"
+    if pd.isna(val) or val == '':
+        return []
+    return ast.literal_eval(val)
+
+
+def read_csv_tables(finals_path, nations_path):
+    finals_df = pd.read_csv(finals_path)
+    finals_df['Notes'] = finals_df['Notes'].apply(_parse_list)
+
+    nation_df = pd.read_csv(nations_path)
+    for col in LIST_COLUMNS['nations']:
+        nation_df[col] = nation_df[col].apply(_parse_list)
+
+    return normalize_tables(finals_df, nation_df)
+
+
+def write_csv_tables(finals_df, nation_df, finals_path, nations_path):
+    finals_df = finals_df.copy()
+    nation_df = nation_df.copy()
+
+    # write list columns the way the shipped csv files store them
+    finals_df['Notes'] = [str(v) if v else '' for v in finals_df['Notes']]
+    for col in LIST_COLUMNS['nations']:
+        nation_df[col] = [str(list(v)) for v in nation_df[col]]
+
+    finals_df.to_csv(finals_path, index=False)
+    nation_df.to_csv(nations_path, index=False)
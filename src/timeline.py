@@ -0,0 +1,127 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    timeline.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Animated timeline of cumulative titles and finals appearances. The
+# per-year state is computed in one pass over the finals in year order, and
+# each frame only records the countries whose totals changed that year (the
+# winner and the runner-up), so the browser downloads the deltas once and
+# rebuilds every frame itself (see assets/clientside.js). Timelines are
+# built once per data version and kept in a small cache.
+
+# import libraries
+from figures import build_map_figure
+from matches import team_names
+from versioned import VersionedCache
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+# configuration (overridable through environment variables)
+TIMELINE_INTERVAL = int(os.environ.get('WC_TIMELINE_INTERVAL', 800))  # ms per frame
+
+# one pass over the finals in year order: running totals per country, and a
+# frame per final with [country index, wins, runner-ups] for the countries
+# whose totals changed (`countries` fixes the index order)
+
+
+def cumulative_frames(finals_df, nation_df, countries):
+    position = {country: i for i, country in enumerate(countries)}
+    finals = finals_df.sort_values('Year')
+    winners = team_names(finals['Winners'].astype(str), nation_df)
+    runners_up = team_names(finals['Runners-up'].astype(str), nation_df)
+
+    wins = [0] * len(countries)
+    finals_played = [0] * len(countries)
+    frames = []
+    for year, winner, runner_up in zip(finals['Year'], winners, runners_up):
+        changed = []
+        for team, won in ((winner, True), (runner_up, False)):
+            i = position.get(team)
+            if i is None:
+                logger.warning(f"{year} finalist {team} is not in the nation table")
+                continue
+            wins[i] += int(won)
+            finals_played[i] += 1
+            changed.append(i)
+        frames.append({
+            'year': int(year),
+            'winner': winner,
+            'runner_up': runner_up,
+            'changes': [[i, wins[i], finals_played[i] - wins[i]] for i in changed]
+        })
+    return frames
+
+# one data version's timeline: the countries in map order, the delta frames
+# and the base map figure the frames are drawn on
+
+
+class Timeline:
+    def __init__(self, data):
+        self.version = data.version
+        self.countries = [str(c) for c in data.map_df['Country']]
+        self.iso = list(data.map_df['ISO_Code'])
+        self.frames = cumulative_frames(data.finals_df, data.nation_df, self.countries)
+        max_finals = max((w + r for frame in self.frames for _, w, r in frame['changes']),
+                         default=0)
+        self.figure = self._base_figure(data, max_finals)
+
+    def _base_figure(self, data, max_finals):
+        # the full map with every country at zero and a fixed colour range,
+        # so colours mean the same thing in every frame
+        figure = json.loads(build_map_figure(data).to_json())
+        trace = figure['data'][0]
+        if list(trace['locations']) != self.iso:
+            raise ValueError("map figure locations do not match the timeline countries")
+        trace['z'] = [0] * len(self.iso)
+        trace['customdata'] = [[0, 0, 0] for _ in self.iso]
+        figure['layout']['coloraxis'].update(cmin=0, cmax=max_finals)
+        figure['layout']['title']['text'] = 'FIFA World Cup Finals Appearances Over Time'
+        # keep zoom/pan while the frames play
+        figure['layout']['uirevision'] = 'timeline'
+        # room for the final under the title
+        figure['layout']['margin']['t'] = 90
+        return figure
+
+    def payload(self, figure=True):
+        payload = {
+            'version': self.version,
+            'years': [frame['year'] for frame in self.frames],
+            'countries': self.countries,
+            'iso': self.iso,
+            'frames': self.frames
+        }
+        if figure:
+            payload['figure'] = self.figure
+        return payload
+
+    def states(self):
+        # full per-frame totals rebuilt from the deltas, [(wins, runner-ups)]
+        # per country (what the browser does)
+        wins = [0] * len(self.countries)
+        runner_ups = [0] * len(self.countries)
+        for frame in self.frames:
+            for i, w, r in frame['changes']:
+                wins[i], runner_ups[i] = w, r
+            yield frame['year'], list(zip(wins, runner_ups))
+
+# timelines for the current data version and the one before it
+
+
+class TimelineCache(VersionedCache):
+    def build(self, data):
+        timeline = Timeline(data)
+        logger.info(f"Built timeline with {len(timeline.frames)} frames for {data.version}")
+        return timeline
+
+
+timeline_cache = TimelineCache()
+
+
+def get_timeline(data):
+    return timeline_cache.get(data)
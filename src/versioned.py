@@ -0,0 +1,43 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    versioned.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Cache for values built once per data version (API responses, timelines).
+# The current version and the one before it are kept, so requests still in
+# flight during a data swap do not rebuild. Subclasses implement build().
+
+# import libraries
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
+
+
+class VersionedCache(ABC):
+    def __init__(self, keep=2):
+        self.keep = keep
+        self.builds = 0
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def build(self, data):
+        # the value for one data version
+        pass
+
+    def get(self, data):
+        with self._lock:
+            value = self._versions.get(data.version)
+            if value is not None:
+                return value
+
+        # build outside the lock so readers of other versions are not blocked
+        value = self.build(data)
+        with self._lock:
+            self._versions[data.version] = value
+            self.builds += 1
+            while len(self._versions) > self.keep:
+                self._versions.popitem(last=False)
+        return value
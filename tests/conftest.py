@@ -0,0 +1,22 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    conftest.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# Shared setup for the test suite: the dashboard modules import each other
+# from src/, the reference implementations and page fixtures live in
+# benchmarks/, and nothing may scrape the live page.
+#
+#   python -m pytest -q
+
+# import libraries
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+os.environ.setdefault('WC_OFFLINE', '1')
@@ -0,0 +1,83 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_api.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from datastore import WorldCupData
+from snapshot import SEED_FINALS, SEED_NATIONS
+from storage import read_csv_tables
+import api
+import flask
+import gzip
+import json
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client():
+    finals_df, nation_df = read_csv_tables(SEED_FINALS, SEED_NATIONS)
+    data = WorldCupData.build(finals_df, nation_df, 'test')
+    server = flask.Flask(__name__)
+    api.init_app(server, lambda: data)
+    return server.test_client()
+
+
+def test_collection_and_lookups(client):
+    response = client.get('/api/finals')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['version'] == 'test'
+    assert len(response.get_json()['finals']) == 22
+
+    final = client.get('/api/finals/2022').get_json()
+    assert (final['Year'], final['Winners']) == (2022, 'Argentina')
+    assert client.get('/api/nations/bra').get_json() == client.get('/api/nations/Brazil').get_json()
+
+
+def test_unknown_year_and_country(client):
+    response = client.get('/api/finals/1900')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'No final in 1900'}
+    assert client.get('/api/nations/Atlantis').status_code == 404
+
+
+def test_gzip_is_chosen_when_accepted(client):
+    plain = client.get('/api/finals')
+    response = client.get('/api/finals', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.get_etag()[0] == f"{plain.get_etag()[0]}-gzip"
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+    refused = client.get('/api/finals', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_matching_etag_gets_304(client):
+    etag = client.get('/api/finals', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get('/api/finals', headers={'Accept-Encoding': 'gzip',
+                                                  'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_other_representation_etag_gets_200(client):
+    # a gzip etag does not validate the uncompressed body, nor the reverse
+    etag = client.get('/api/finals', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get('/api/finals', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+    identity = client.get('/api/finals').headers['ETag']
+    response = client.get('/api/finals', headers={'Accept-Encoding': 'gzip',
+                                                  'If-None-Match': identity})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+    other = client.get('/api/finals', headers={'If-None-Match': '"test-0000000000000000"'})
+    assert other.status_code == 200
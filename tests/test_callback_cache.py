@@ -0,0 +1,129 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_callback_cache.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from callback_cache import (UPDATE_PATH, CallbackCache, MemoryBackend, SQLiteBackend,
+                            callback_key, init_app, skip)
+import flask
+import json
+import pytest
+
+# the outputs app.py caches, and a request body as Dash sends it for the map
+# callback (two dropdown inputs, no state)
+OUTPUTS = {'world-map.figure', 'stats-panel.children'}
+
+
+def _body(output='world-map.figure', country='Brazil', year=2002, changed='country-dropdown'):
+    component, prop = output.split('.')
+    return {
+        'output': output,
+        'outputs': {'id': component, 'property': prop},
+        'inputs': [{'id': 'country-dropdown', 'property': 'value', 'value': country},
+                   {'id': 'year-dropdown', 'property': 'value', 'value': year}],
+        'changedPropIds': [f"{changed}.value"]
+    }
+
+
+BODY = _body()
+
+
+def test_callback_key_is_stable():
+    # the same request in any key order maps to one key; what triggered the
+    # callback does not change the response
+    reordered = json.loads(json.dumps(BODY, sort_keys=True))
+    assert callback_key(BODY, 'v1') == callback_key(reordered, 'v1')
+    assert callback_key(BODY, 'v1') == callback_key(_body(changed='year-dropdown'), 'v1')
+
+
+def test_callback_key_depends_on_output_inputs_version_and_variant():
+    key = callback_key(BODY, 'v1')
+    assert callback_key(_body('stats-panel.children'), 'v1') != key
+    assert callback_key(_body(country='Italy'), 'v1') != key
+    assert callback_key(_body(year=None), 'v1') != key
+    assert callback_key(dict(BODY, inputs=BODY['inputs'][::-1]), 'v1') != key
+    assert callback_key(BODY, 'v2') != key
+    assert callback_key(BODY, 'v1', 'patch=True,static=False') != key
+
+
+@pytest.fixture
+def server():
+    # a stand-in for the Dash endpoint that counts its calls and falls back
+    # (opting out of the cache) for an unknown country
+    server = flask.Flask(__name__)
+    server.calls = 0
+
+    @server.route(UPDATE_PATH, methods=['POST'])
+    def update():
+        server.calls += 1
+        country = flask.request.get_json()['inputs'][0]['value']
+        if country == 'Atlantis':
+            skip()
+        return flask.jsonify({'country': country, 'call': server.calls})
+
+    server.cache = init_app(server, CallbackCache(MemoryBackend()), lambda: 'v1', OUTPUTS)
+    return server
+
+
+def _post(client, body):
+    return client.post(UPDATE_PATH, json=body)
+
+
+def test_miss_then_hit(server):
+    client = server.test_client()
+    first = _post(client, BODY)
+    second = _post(client, BODY)
+    assert first.headers['X-Callback-Cache'] == 'miss'
+    assert second.headers['X-Callback-Cache'] == 'hit'
+    assert second.data == first.data
+    assert server.calls == 1
+    assert server.cache.stats()['hits'] == 1
+    assert server.cache.stats()['misses'] == 1
+
+
+def test_outputs_are_cached_separately_and_triggers_share_a_hit(server):
+    client = server.test_client()
+    _post(client, BODY)
+    assert _post(client, _body('stats-panel.children')).headers['X-Callback-Cache'] == 'miss'
+    # the year dropdown firing with the same values is answered from the cache
+    response = _post(client, _body(changed='year-dropdown'))
+    assert response.headers['X-Callback-Cache'] == 'hit'
+    assert server.calls == 2
+
+
+def test_uncached_output_is_passed_through(server):
+    client = server.test_client()
+    body = _body('timeline-map.figure')
+    assert 'X-Callback-Cache' not in _post(client, body).headers
+    _post(client, body)
+    assert server.calls == 2
+
+
+def test_skip_keeps_response_out_of_the_cache(server):
+    client = server.test_client()
+    body = _body(country='Atlantis')
+    assert _post(client, body).headers['X-Callback-Cache'] == 'miss'
+    assert _post(client, body).headers['X-Callback-Cache'] == 'miss'
+    assert server.calls == 2
+
+
+def test_sqlite_byte_total_and_trim(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'callbacks.sqlite'), max_bytes=10_000)
+    for i in range(8):
+        backend.set(f"k{i}", b'x' * 1000, 'v1')
+    backend.set('k0', b'x' * 500, 'v1')
+    assert backend._bytes == backend.stats()['bytes'] == 7500
+
+    for i in range(8, 12):
+        backend.set(f"k{i}", b'x' * 1000, 'v1')
+    assert backend.evictions > 0
+    assert backend._bytes == backend.stats()['bytes'] <= 10_000
+    assert backend.get('k11') == b'x' * 1000
+
+    backend.purge('v2')
+    assert backend.stats()['bytes'] == 0
+    backend.set('k0', b'x' * 100, 'v2')
+    assert backend._bytes == 100
@@ -0,0 +1,72 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_cleaning.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# The vectorized cleaning steps must give exactly what the original per-row
+# apply() cleaning (benchmarks/reference.py) gave, on the checked-in csvs.
+
+# import libraries
+from snapshot import SEED_FINALS, SEED_NATIONS
+from reference import clean_scores, clean_years, plain_values
+from derived import parse_scores
+from scraper import parse_years
+import pandas as pd
+import ast
+import pytest
+
+
+@pytest.fixture(scope='module')
+def finals():
+    return pd.read_csv(SEED_FINALS)
+
+
+@pytest.fixture(scope='module')
+def nations():
+    return pd.read_csv(SEED_NATIONS)
+
+
+def _stored_notes(value):
+    return ast.literal_eval(value) if isinstance(value, str) and value else None
+
+
+def test_parse_scores_matches_reference(finals):
+    expected = clean_scores(finals['Score'])
+    actual = parse_scores(finals['Score'])[['CleanedScore', 'Notes']]
+    assert plain_values(actual) == plain_values(expected)
+
+
+def test_parse_scores_matches_stored_columns(finals):
+    actual = parse_scores(finals['Score'])
+    assert plain_values(actual['CleanedScore']) == finals['CleanedScore'].tolist()
+    assert plain_values(actual['Notes']) == [_stored_notes(v) for v in finals['Notes']]
+
+
+def test_parse_scores_edge_cases():
+    score = pd.Series(['1–1 (a.e.t.) (3–2 pen.)', '0–0 (5–3 pen.) [n 3]', '3-3', None, '4–2'],
+                      index=[10, 11, 12, 13, 14])
+    actual = parse_scores(score)
+    assert list(actual.index) == [10, 11, 12, 13, 14]
+    assert plain_values(actual[['CleanedScore', 'Notes']]) == plain_values(clean_scores(score))
+    assert plain_values(actual['HomeGoals']) == [1, 0, 3, None, 4]
+    assert plain_values(actual['AwayGoals']) == [1, 0, 3, None, 2]
+    assert actual['ExtraTime'].tolist() == [True, False, False, False, False]
+    assert plain_values(actual['PenaltyScore']) == ['3–2', '5–3', None, None, None]
+
+
+@pytest.mark.parametrize('column', ['YearsWon', 'YearsRunnerUp'])
+def test_parse_years_matches_reference(nations, column):
+    # the lists as the page shows them: "1958, 1962" or a dash
+    stored = [ast.literal_eval(v) for v in nations[column]]
+    page = pd.Series([', '.join(map(str, years)) or '—' for years in stored])
+
+    expected = clean_years(page)
+    actual = parse_years(page.replace('—', None))
+    assert plain_values(actual) == plain_values(expected) == stored
+
+
+def test_parse_years_mixed_cells():
+    years = pd.Series(['1958, 1962', None, 1966, float('nan'), '1930, n/a'], dtype=object)
+    assert plain_values(parse_years(years)) == [[1958, 1962], [], [1966], [], [1930]]
@@ -0,0 +1,56 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_countries.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from countries import HISTORICAL_NAMES, _key, build_aliases, iso3, iso3_codes, load_aliases
+from snapshot import SEED_FINALS, SEED_NATIONS
+from storage import read_csv_tables
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('name, code', [
+    ('West Germany', 'DEU'),
+    ('Czechoslovakia', 'CZE'),
+    ('Soviet Union', 'RUS'),
+    ('Yugoslavia', 'SRB'),
+    ('England', 'GBR'),
+    ('Zaire', 'COD'),
+    ('Dutch East Indies', 'IDN'),
+    ('Holland', 'NLD')
+])
+def test_historical_names_resolve_to_iso3(name, code):
+    assert iso3(name) == code
+
+
+def test_lookup_ignores_case_and_spacing():
+    assert iso3('  west   GERMANY ') == 'DEU'
+    assert iso3('brazil') == 'BRA'
+    assert iso3('BRA') == 'BRA'
+
+
+def test_unknown_and_missing_names():
+    assert iso3('Atlantis') is None
+    assert iso3(None) is None
+    assert iso3(float('nan')) is None
+
+
+def test_every_finalist_resolves():
+    # every team in the seed finals and every nation has a code, and the
+    # nations keep the codes stored with them
+    finals_df, nation_df = read_csv_tables(SEED_FINALS, SEED_NATIONS)
+    teams = pd.concat([finals_df['Winners'], finals_df['Runners-up']]).astype(str)
+    assert iso3_codes(teams).notna().all()
+    assert iso3_codes(nation_df['Country'].astype(str)).tolist() == nation_df['ISO_Code'].tolist()
+
+
+def test_shipped_table_is_up_to_date():
+    # src/data/country_codes.csv is what build_aliases() generates
+    pytest.importorskip('pycountry')
+    assert load_aliases() == {_key(name): code for name, code in build_aliases()}
+    for name, code in HISTORICAL_NAMES.items():
+        assert load_aliases()[_key(name)] == code
@@ -0,0 +1,25 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_datastore.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from datastore import WorldCupData
+from snapshot import SEED_FINALS, SEED_NATIONS
+from storage import read_csv_tables
+
+
+def test_years_and_countries_indexes():
+    data = WorldCupData.build(*read_csv_tables(SEED_FINALS, SEED_NATIONS), 'test')
+    assert data.years_of('Brazil') == (1950, 1958, 1962, 1970, 1994, 1998, 2002)
+    assert data.years_of('Atlantis') == ()
+    assert data.countries_by_year[2022] == ('Argentina', 'France')
+
+    # every final has its two finalists, and the indexes agree
+    assert sorted(data.countries_by_year) == list(data.years)
+    for year, countries in data.countries_by_year.items():
+        assert len(countries) == 2
+        assert all(year in data.years_of(country) for country in countries)
+    assert data.client_payload()['countries_by_year']['2022'] == ['Argentina', 'France']
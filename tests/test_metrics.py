@@ -0,0 +1,73 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_metrics.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+import metrics
+import json
+import os
+import pytest
+
+TEST_SECONDS = metrics.histogram('test_duration_seconds', 'Histogram used by the tests')
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    # multi-process mode in a fresh directory, as a process that has not
+    # written its state yet
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path))
+    monkeypatch.setattr(metrics, '_state_pid', None)
+    TEST_SECONDS.reset()
+    yield tmp_path
+    TEST_SECONDS.reset()
+
+
+def _worker_file(path, pid, token, count):
+    # the state file of another worker with `count` observations of 0.2s
+    counts = [0] * (len(TEST_SECONDS.buckets) + 1)
+    counts[TEST_SECONDS.buckets.index(0.25)] = count
+    state = {'pid': pid, 'gauges': {},
+             'histograms': {TEST_SECONDS.name: [[[], counts, 0.2 * count, count]]}}
+    with open(path / f"{pid}-{token}.json", 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+
+def _count(text):
+    for line in text.splitlines():
+        if line.startswith(f"{TEST_SECONDS.name}_count"):
+            return int(line.split()[-1])
+    return 0
+
+
+def _dead_pid():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return pid
+
+
+def test_reused_pid_keeps_the_dead_workers_totals(metrics_dir):
+    # an exited worker's file under the pid this process now has
+    _worker_file(metrics_dir, os.getpid(), 'deadbeef', 5)
+    TEST_SECONDS.observe(0.01)
+
+    assert _count(metrics.render_metrics()) == 6
+    assert not (metrics_dir / f"{os.getpid()}-deadbeef.json").exists()
+    assert _count(metrics.render_metrics()) == 6
+
+
+def test_exited_workers_are_folded_into_the_aggregate(metrics_dir):
+    for token in ('aaaa0001', 'aaaa0002'):
+        _worker_file(metrics_dir, _dead_pid(), token, 3)
+    TEST_SECONDS.observe(0.01)
+
+    assert _count(metrics.render_metrics()) == 7
+    assert sorted(name for name in os.listdir(metrics_dir) if name.endswith('.json')) == \
+        sorted([metrics.AGGREGATE_FILE, metrics._state_file()])
+
+    TEST_SECONDS.observe(0.01)
+    assert _count(metrics.render_metrics()) == 8
@@ -0,0 +1,63 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_scraper.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from scraper import fetch_page, find_tables, get_world_cup_data
+from snapshot import SEED_FINALS, SEED_NATIONS
+from storage import normalize_tables, read_csv_tables, tables_hash
+from io import StringIO
+import pandas as pd
+import fixtures
+
+# the saved fixture page is built from the seed snapshot, so scraping it
+# must give the seed tables back
+
+
+def test_fixture_page_scrapes_to_seed_snapshot():
+    finals_df, nation_df = normalize_tables(*get_world_cup_data(page=fetch_page(fixtures.FIXTURE)))
+    seed_finals, seed_nations = read_csv_tables(SEED_FINALS, SEED_NATIONS)
+
+    assert list(finals_df.columns) == list(seed_finals.columns)
+    assert list(nation_df.columns) == list(seed_nations.columns)
+    assert tables_hash(finals_df, nation_df) == tables_hash(seed_finals, seed_nations)
+
+
+def test_fixture_page_is_up_to_date():
+    # benchmarks/fixtures.py regenerates the saved page from the seed csvs
+    with open(fixtures.FIXTURE, encoding='utf-8') as f:
+        assert f.read() == fixtures.build_page()
+
+
+# find_tables keeps only the two tables the scraper needs
+
+
+def test_find_tables_selects_finals_and_nations_tables():
+    tables = find_tables(fixtures.build_page(filler=50).encode('utf-8'))
+
+    assert set(tables) == {'finals', 'nations'}
+    assert '<caption>List of FIFA World Cup finals</caption>' in tables['finals']
+    assert '<caption>Results by nation</caption>' in tables['nations']
+    assert len(pd.read_html(StringIO(tables['finals']))[0]) == 22
+    assert len(pd.read_html(StringIO(tables['nations']))[0]) == 13
+
+
+def test_find_tables_ignores_footnotes_and_body_cells():
+    page = b"""<html><body>
+    <table><tr><th>Team</th><th>Apps</th></tr><tr><td>Winners</td><td>Runners-up</td></tr></table>
+    <table><tr><th>Year</th><th>Winners[a]</th><th>Runners-up [n 1]</th></tr>
+           <tr><td>1930</td><td>Uruguay</td><td>Argentina</td></tr></table>
+    </body></html>"""
+    tables = find_tables(page)
+
+    # the first table only mentions the names in body cells
+    assert set(tables) == {'finals'}
+    assert '1930' in tables['finals']
+
+
+def test_find_tables_missing_table():
+    page = b"<html><body><table><tr><th>Record</th></tr><tr><td>1</td></tr></table></body></html>"
+    assert find_tables(page) == {}
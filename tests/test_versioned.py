@@ -0,0 +1,39 @@
+# --------------------------------------------------
+# Assignment: Assignment 7
+# File:    test_versioned.py
+# Author:  Zaki Rangwala (210546860)
+# Version: 2025-04-01
+# --------------------------------------------------
+
+# import libraries
+from types import SimpleNamespace
+from versioned import VersionedCache
+import pytest
+
+
+class Built(VersionedCache):
+    def build(self, data):
+        return ('built', data.version, self.builds)
+
+
+def test_builds_once_per_version_and_keeps_two():
+    cache = Built()
+    v1, v2, v3 = (SimpleNamespace(version=v) for v in ('v1', 'v2', 'v3'))
+    first = cache.get(v1)
+    assert cache.get(v1) is first
+    cache.get(v2)
+    assert cache.get(v1) is first
+    assert cache.builds == 2
+
+    # a third version evicts the oldest
+    cache.get(v3)
+    assert cache.get(v1) is not first
+    assert cache.builds == 4
+
+
+def test_subclass_without_build_cannot_be_created():
+    class Incomplete(VersionedCache):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -1,4 +1,10 @@
-from src.app import server
+import os
+import sys
+
+# the dashboard modules import each other from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from app import server  # noqa: E402
 
 if __name__ == "__main__":
     server.run()